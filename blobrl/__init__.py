@@ -1,2 +1,20 @@
-from .logger import Logger, Record
-from .trainer import Trainer
+import importlib
+
+# module of each public name, imported only when the name is used
+_modules = {"Logger": ".logger", "Record": ".logger", "Flattener": ".flattener", "split_batch": ".flattener",
+            "Recorder": ".recorder", "Checkpointer": ".checkpointer", "Trainer": ".trainer",
+            "DistributedTrainer": ".distributed_trainer", "Sweep": ".sweep"}
+
+__all__ = list(_modules)
+
+
+def __getattr__(name):
+    if name in _modules:
+        value = getattr(importlib.import_module(_modules[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module " + __name__ + " has no attribute " + name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,6 +1,19 @@
-from .agent_interface import AgentInterface
-from .agent_constant import AgentConstant
-from .agent_random import AgentRandom
-from .dqn import DQN
-from .double_dqn import DoubleDQN
-from .categorical_dqn import CategoricalDQN
+import importlib
+
+# module of each public name, imported only when the name is used
+_modules = {"AgentInterface": ".agent_interface", "AgentConstant": ".agent_constant", "AgentRandom": ".agent_random",
+            "DQN": ".dqn", "DoubleDQN": ".double_dqn", "CategoricalDQN": ".categorical_dqn", "DRQN": ".drqn"}
+
+__all__ = list(_modules)
+
+
+def __getattr__(name):
+    if name in _modules:
+        value = getattr(importlib.import_module(_modules[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module " + __name__ + " has no attribute " + name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,9 +1,12 @@
 import abc
+from copy import deepcopy
 
 import torch
 
 from gym.spaces import Space
 
+from blobrl.flattener import split_batch
+
 
 class AgentInterface(metaclass=abc.ABCMeta):
 
@@ -32,6 +35,10 @@ class AgentInterface(metaclass=abc.ABCMeta):
             raise TypeError("device need to be torch.device instance")
         self.device = device
 
+        # number of trainings and of transitions used by them, to measure throughput
+        self.updates = 0
+        self.samples = 0
+
     @abc.abstractmethod
     def get_action(self, observation):
         """ Return action choice by the agents
@@ -41,6 +48,14 @@ class AgentInterface(metaclass=abc.ABCMeta):
         """
         pass
 
+    def get_actions(self, observations):
+        """ Return actions choice by the agents for a batch of observations, one by environment
+
+        :param observations: list of observations or observations batched like gym.vector does
+        :return: list of actions
+        """
+        return [self.get_action(observation) for observation in split_batch(self.observation_space, observations)]
+
     @abc.abstractmethod
     def enable_exploration(self):
         """Enable train capacity
@@ -75,12 +90,98 @@ class AgentInterface(metaclass=abc.ABCMeta):
         """
         pass
 
+    def learn_batch(self, observations, actions, rewards, next_observations, dones) -> None:
+        """ learn from a batch of transitions, one by environment
+
+        :param observations: list of observations or observations batched like gym.vector does
+        :param actions: list of actions
+        :type actions: list
+        :param rewards: list of rewards
+        :type rewards: list
+        :param next_observations: list of next observations or next observations batched like gym.vector does
+        :param dones: list of done
+        :type dones: list
+        """
+        for observation, action, reward, next_observation, done in zip(
+                split_batch(self.observation_space, observations), actions, rewards,
+                split_batch(self.observation_space, next_observations), dones):
+            self.learn(observation, action, reward, next_observation, done)
+
+    def remember(self, observation, action, reward, next_observation, done) -> None:
+        """ Store transition without training, agent is trained by update, default learn from it
+
+        :param observation: stat of environment
+        :type observation: gym.Space
+        :param action: action taken by agent
+        :type action: int, float, list
+        :param reward: reward win
+        :type reward: int, float, np.int, np.float
+        :param next_observation:
+        :type next_observation: gym.Space
+        :param done: if env is finished
+        :type done: bool
+        """
+        self.learn(observation, action, reward, next_observation, done)
+
+    def update(self):
+        """ Train agent once on transitions stored by remember, default agent is not trained
+
+        :return: False if agent is not trained
+        :rtype: bool
+        """
+        return False
+
     @abc.abstractmethod
     def episode_finished(self) -> None:
         """ Notified agent when episode is done
         """
         pass
 
+    def get_policy(self):
+        """ Return copy of agent which is only used to choose actions, weights are updated with load_state_dict
+        """
+        return deepcopy(self)
+
+    def state_dict(self):
+        """ Return weights of agent, empty if agent don't have weights
+        """
+        return dict()
+
+    def load_state_dict(self, state_dict):
+        """ Load weights from state_dict
+
+        :param state_dict: weights return by state_dict
+        :type state_dict: dict
+        """
+        pass
+
+    def get_checkpoint(self, memory=False):
+        """ Return copy of what is needed to continue training, default weights of state_dict
+
+        :param memory: if a copy of memory is added
+        :type memory: bool
+        """
+        return {"state_dict": deepcopy(self.state_dict())}
+
+    def set_checkpoint(self, checkpoint):
+        """ Load checkpoint return by get_checkpoint
+
+        :param checkpoint:
+        :type checkpoint: dict
+        """
+        self.load_state_dict(checkpoint["state_dict"])
+
+    def sync_policy(self, policy, state_dict=None):
+        """ Load state_dict in policy if it is not None and update what policy need from agent
+
+        :param policy: agent return by get_policy
+        :type policy: AgentInterface
+        :param state_dict: weights return by state_dict
+        :type state_dict: dict
+        """
+        if state_dict is not None:
+            policy.load_state_dict(state_dict)
+
     @abc.abstractmethod
     def save(self, file_name, dire_name="."):
         """ Save agent at dire_name/file_name
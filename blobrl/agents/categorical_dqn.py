@@ -1,16 +1,17 @@
+import os
+import pickle
+
 import torch
 import torch.nn.functional as F
 import torch.optim as optim
-from gym.spaces import flatten
 
 from blobrl.agents import DQN
-from blobrl.memories import ExperienceReplay
 from blobrl.networks import C51Network
 
 
 class CategoricalDQN(DQN):
 
-    def __init__(self, observation_space, action_space, memory=ExperienceReplay(), network=None, num_atoms=51,
+    def __init__(self, observation_space, action_space, memory=None, network=None, num_atoms=51,
                  r_min=-10, r_max=10, step_train=1, batch_size=32, gamma=1.0,
                  optimizer=None, greedy_exploration=None, device=None):
         """
@@ -32,8 +33,7 @@ class CategoricalDQN(DQN):
         """
         if network is None and optimizer is None:
             network = C51Network(observation_space=observation_space,
-                                 action_space=action_space)
-            num_atoms = 51
+                                 action_space=action_space, num_atoms=num_atoms)
 
             optimizer = optim.Adam(network.parameters())
 
@@ -48,34 +48,35 @@ class CategoricalDQN(DQN):
         self.delta_z = (r_max - r_min) / float(num_atoms - 1)
         self.z = torch.tensor([r_min + i * self.delta_z for i in range(num_atoms)], device=self.device)
 
-    def get_action(self, observation):
-        """ Return action choice by the agents
+    def get_values(self, observations):
+        """ Return expected values over self.z of distributions of network
 
-        :param observation: stat of environment
-        :type observation: gym.Space
+        :param observations: flatten observations
+        :type observations: torch.Tensor
         """
-        if not self.greedy_exploration.be_greedy(self.step) and self.with_exploration:
-            return self.action_space.sample()
-
-        observation = torch.tensor([flatten(self.observation_space, observation)], device=self.device).float()
-
-        prediction = self.network.forward(observation)
+        prediction = self.network.forward(observations)
 
-        def return_values(values):
+        def expected_values(values):
             if isinstance(values, list):
-                return [return_values(v) for v in values]
+                return [expected_values(v) for v in values]
 
-            q_values = values * self.z
-            q_values = torch.sum(q_values, dim=2)
-            return torch.argmax(q_values).detach().item()
+            return torch.sum(values * self.z, dim=2)
 
-        return return_values(prediction)
+        return expected_values(prediction)
 
-    def apply_loss(self, next_prediction, prediction, actions, rewards, next_observations, dones, len_space):
+    def apply_loss(self, next_prediction, prediction, actions, rewards, next_observations, dones, len_space,
+                   weights=None):
+        """ Backward cross entropy between projected target distributions and predicted distributions of each head,
+        return cross entropy of each transition summed over heads, used as priorities
+
+        :param weights: importance sampling weights of PrioritizedReplay, None for uniform memories
+        :type weights: torch.Tensor
+        :return: torch.Tensor of shape (batch,)
+        """
         if isinstance(next_prediction, list):
-            [self.apply_loss(n, p, a, rewards, next_observations, dones, c) for n, p, a, c in
-             zip(next_prediction, prediction, actions.permute(1, 0, *[i for i in range(2, len(actions.shape))]),
-                 len_space)]
+            return sum([self.apply_loss(n, p, a, rewards, next_observations, dones, c, weights) for n, p, a, c in
+                        zip(next_prediction, prediction,
+                            actions.permute(1, 0, *[i for i in range(2, len(actions.shape))]), len_space)])
         else:
 
             q_values_next = next_prediction * self.z
@@ -119,8 +120,69 @@ class CategoricalDQN(DQN):
 
             self.optimizer.zero_grad()
 
-            loss = - prediction.log() * m_prob
-            loss.sum((1, 2)).mean().backward(retain_graph=True)
+            loss = (- prediction.log() * m_prob).sum((1, 2))
+            if weights is None:
+                loss.mean().backward(retain_graph=True)
+            else:
+                (loss * weights).mean().backward(retain_graph=True)
+            return loss.detach()
+
+    def save(self, file_name, dire_name="."):
+        """ Save agent at dire_name/file_name
+
+        :param file_name: name of file for save
+        :type file_name: string
+        :param dire_name: name of directory where we would save it
+        :type file_name: string
+        """
+        os.makedirs(os.path.abspath(dire_name), exist_ok=True)
+
+        dict_save = dict()
+        dict_save["observation_space"] = pickle.dumps(self.observation_space)
+        dict_save["action_space"] = pickle.dumps(self.action_space)
+        dict_save["network_class"] = pickle.dumps(type(self.network))
+        dict_save["network_object"] = pickle.dumps(self.get_network_copy())
+        dict_save["network"] = {key: value.cpu() for key, value in self.network.state_dict().items()}
+        dict_save["step_train"] = pickle.dumps(self.step_train)
+        dict_save["batch_size"] = pickle.dumps(self.batch_size)
+        dict_save["gamma"] = pickle.dumps(self.gamma)
+        dict_save["optimizer"] = pickle.dumps(self.optimizer)
+        dict_save["greedy_exploration"] = pickle.dumps(self.greedy_exploration)
+        dict_save["optimizer_state"] = self.optimizer.state_dict()
+        dict_save["step"] = pickle.dumps(self.step)
+        dict_save["num_atoms"] = pickle.dumps(self.num_atoms)
+        dict_save["r_min"] = pickle.dumps(self.r_min)
+        dict_save["r_max"] = pickle.dumps(self.r_max)
+
+        torch.save(dict_save, os.path.abspath(os.path.join(dire_name, file_name)))
+
+    @classmethod
+    def load(cls, file_name, dire_name=".", device=None):
+        """ load agent form dire_name/file_name
+
+        :param device: torch device to run agent
+        :type: torch.device
+        :param file_name: name of file for load
+        :type file_name: string
+        :param dire_name: name of directory where we would load it
+        :type file_name: string
+        """
+        dict_save = torch.load(os.path.abspath(os.path.join(dire_name, file_name)))
+
+        network = cls.load_network(dict_save)
+
+        return CategoricalDQN(observation_space=pickle.loads(dict_save["observation_space"]),
+                              action_space=pickle.loads(dict_save["action_space"]),
+                              network=network,
+                              num_atoms=pickle.loads(dict_save["num_atoms"]),
+                              r_min=pickle.loads(dict_save["r_min"]),
+                              r_max=pickle.loads(dict_save["r_max"]),
+                              step_train=pickle.loads(dict_save["step_train"]),
+                              batch_size=pickle.loads(dict_save["batch_size"]),
+                              gamma=pickle.loads(dict_save["gamma"]),
+                              optimizer=cls.load_optimizer(dict_save, network),
+                              greedy_exploration=pickle.loads(dict_save["greedy_exploration"]),
+                              device=device)
 
     def __str__(self):
         return 'CategoricalDQN-' + str(self.observation_space) + "-" + str(self.action_space) + "-" + str(
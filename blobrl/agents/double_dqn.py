@@ -8,13 +8,12 @@ import torch.optim as optim
 from gym.spaces import Discrete, MultiDiscrete
 
 from blobrl.agents import DQN
-from blobrl.memories import ExperienceReplay
 
 
 class DoubleDQN(DQN):
     """ from 'Deep Reinforcement Learning with Double Q-learning' in https://arxiv.org/pdf/1509.06461.pdf """
 
-    def __init__(self, observation_space, action_space, memory=ExperienceReplay(), network=None, step_copy=500,
+    def __init__(self, observation_space, action_space, memory=None, network=None, step_copy=500,
                  step_train=1, batch_size=32, gamma=1.0, loss=None, optimizer=None, greedy_exploration=None,
                  device=None):
         """
@@ -39,9 +38,11 @@ class DoubleDQN(DQN):
         self.network_target = deepcopy(self.network)
         self.copy_online_to_target()
         self.step_copy = step_copy
+        self.step_copied = 0
 
         if optimizer is None:
             self.optimizer = optim.Adam(self.network.parameters())
+            self.add_exploration_parameters()
 
         self.network_target.to(self.device)
 
@@ -65,46 +66,106 @@ class DoubleDQN(DQN):
         if (self.step % self.step_copy) == 0:
             self.copy_online_to_target()
 
+    def learn_batch(self, observations, actions, rewards, next_observations, dones) -> None:
+        """ learn from a batch of transitions, one by environment, target network is copied if step reach a
+        multiple of step_copy
+
+        :param observations: list of observations or observations batched like gym.vector does
+        :param actions: list of actions
+        :type actions: list
+        :param rewards: list of rewards
+        :type rewards: list
+        :param next_observations: list of next observations or next observations batched like gym.vector does
+        :param dones: list of done
+        :type dones: list
+        """
+        step = self.step
+        super().learn_batch(observations, actions, rewards, next_observations, dones)
+
+        if self.step // self.step_copy > step // self.step_copy:
+            self.copy_online_to_target()
+
+    def update(self):
+        """ Train once on memory, target network is copied when step reach a multiple of step_copy since last copy
+
+        :return: False if agent is not trained
+        :rtype: bool
+        """
+        if not super().update():
+            return False
+        if self.step // self.step_copy > self.step_copied // self.step_copy:
+            self.copy_online_to_target()
+            self.step_copied = self.step
+        return True
+
     def train(self):
         """
 
         """
-        observations, actions, rewards, next_observations, dones = self.memory.sample(self.batch_size,
-                                                                                      device=self.device)
+        observations, actions, rewards, next_observations, dones, weights = self.sample_memory()
+        rewards, exploration_loss = self.add_intrinsic_rewards(observations, actions, rewards, next_observations)
 
         next_prediction = self.network.forward(next_observations)
         prediction = self.network.forward(observations)
         target_next_prediction = self.network_target.forward(next_observations)
 
         if isinstance(self.action_space, Discrete):
-            self.apply_loss(next_prediction, prediction, actions, rewards, next_observations, dones,
-                            self.action_space.n, target_next_prediction)
+            errors = self.apply_loss(next_prediction, prediction, actions, rewards, next_observations, dones,
+                                     self.action_space.n, target_next_prediction, weights)
         # find space for one_hot encore action in apply loss
         elif isinstance(self.action_space, MultiDiscrete):
-            self.apply_loss(next_prediction, prediction, actions, rewards, next_observations, dones,
-                            self.action_space.nvec, target_next_prediction)
+            errors = self.apply_loss(next_prediction, prediction, actions, rewards, next_observations, dones,
+                                     self.action_space.nvec, target_next_prediction, weights)
+        self.update_priorities(errors)
+        self.backward_exploration(exploration_loss)
         self.optimizer.step()
+        self.updates += 1
+        self.samples += self.batch_size
 
     def apply_loss(self, next_prediction, prediction, actions, rewards, next_observations, dones, len_space,
-                   target_next_prediction):
+                   target_next_prediction, weights=None):
+        """ Backward loss of each head with target of double Q-learning and return absolute TD error of each
+        transition summed over heads
+
+        :param target_next_prediction: prediction of network_target for next observations
+        :param weights: importance sampling weights of PrioritizedReplay, None for uniform memories
+        :type weights: torch.Tensor
+        :return: torch.Tensor of shape (batch,)
+        """
         if isinstance(next_prediction, list):
-            [self.apply_loss(n, p, a, rewards, next_observations, dones, c, t) for n, p, a, c, t in
-             zip(next_prediction, prediction, actions.permute(1, 0, *[i for i in range(2, len(actions.shape))]),
-                 len_space, target_next_prediction)]
+            return sum([self.apply_loss(n, p, a, rewards, next_observations, dones, c, t, weights) for n, p, a, c, t in
+                        zip(next_prediction, prediction,
+                            actions.permute(1, 0, *[i for i in range(2, len(actions.shape))]), len_space,
+                            target_next_prediction)])
         else:
 
             actions_next = torch.argmax(next_prediction.detach(), dim=1)
             actions_next_one_hot = F.one_hot(actions_next.to(torch.int64), num_classes=len_space)
             q_next = target_next_prediction.detach() * actions_next_one_hot
 
-            q = rewards + self.gamma * torch.max(q_next, dim=1)[0] * (1 - dones)
+            q = rewards + self.gamma * q_next.sum(dim=1) * (1 - dones)
 
             actions_one_hot = F.one_hot(actions.to(torch.int64), num_classes=len_space)
-            q_predict = torch.max(prediction * actions_one_hot, dim=1)[0]
+            q_predict = (prediction * actions_one_hot).sum(dim=1)
 
             self.optimizer.zero_grad()
-            loss = self.loss(q_predict, q)
+            loss = self.get_loss(q_predict, q, weights)
             loss.backward(retain_graph=True)
+            return (q - q_predict).detach().abs()
+
+    def get_next_values(self, next_observations):
+        """ Return value of next observations of each head used in target of td_errors like in apply_loss, action
+        chosen by network is evaluated by network_target, or by network for policies which don't have it
+
+        :param next_observations: flatten observations
+        :type next_observations: torch.Tensor
+        :return: list of torch.Tensor of shape (batch,)
+        """
+        network_target = self.network if self.network_target is None else self.network_target
+        actions_next = [values.argmax(dim=1, keepdim=True) for values in
+                        self.heads(self.get_values(next_observations))]
+        target_values = self.heads(network_target.forward(next_observations))
+        return [values.gather(1, a).squeeze(1) for values, a in zip(target_values, actions_next)]
 
     def copy_online_to_target(self):
         """
@@ -112,6 +173,13 @@ class DoubleDQN(DQN):
         """
         self.network_target.load_state_dict(self.network.state_dict())
 
+    def get_policy(self):
+        """ Return copy of agent which is only used to choose actions, without memory, optimizer and target network
+        """
+        policy = super().get_policy()
+        policy.network_target = None
+        return policy
+
     def save(self, file_name, dire_name="."):
         """ Save agent at dire_name/file_name
 
@@ -126,20 +194,53 @@ class DoubleDQN(DQN):
         dict_save["observation_space"] = pickle.dumps(self.observation_space)
         dict_save["action_space"] = pickle.dumps(self.action_space)
         dict_save["network_class"] = pickle.dumps(type(self.network))
-        dict_save["network"] = self.network.state_dict()
+        dict_save["network_object"] = pickle.dumps(self.get_network_copy())
+        dict_save["network"] = {key: value.cpu() for key, value in self.network.state_dict().items()}
         dict_save["step_train"] = pickle.dumps(self.step_train)
         dict_save["batch_size"] = pickle.dumps(self.batch_size)
         dict_save["gamma"] = pickle.dumps(self.gamma)
         dict_save["loss"] = pickle.dumps(self.loss)
         dict_save["optimizer"] = pickle.dumps(self.optimizer)
         dict_save["greedy_exploration"] = pickle.dumps(self.greedy_exploration)
+        dict_save["optimizer_state"] = self.optimizer.state_dict()
+        dict_save["step"] = pickle.dumps(self.step)
         dict_save["step_copy"] = pickle.dumps(self.step_copy)
+        dict_save["network_target"] = {key: value.cpu() for key, value in self.network_target.state_dict().items()}
+        dict_save["step_copied"] = pickle.dumps(self.step_copied)
 
         torch.save(dict_save, os.path.abspath(os.path.join(dire_name, file_name)))
 
+    def get_checkpoint(self, memory=False):
+        """ Return checkpoint like DQN.get_checkpoint with target network and step of its last copy
+
+        :param memory: if a copy of memory is added
+        :type memory: bool
+        """
+        checkpoint = super().get_checkpoint(memory=memory)
+        checkpoint["network_target"] = {key: value.detach().clone() for key, value in
+                                        self.network_target.state_dict().items()}
+        checkpoint["step_copied"] = pickle.dumps(self.step_copied)
+        return checkpoint
+
+    def set_checkpoint(self, checkpoint):
+        """ Load checkpoint like DQN.set_checkpoint, target network is copied from loaded network if checkpoint
+        don't have it
+
+        :param checkpoint:
+        :type checkpoint: dict
+        """
+        super().set_checkpoint(checkpoint)
+        if "network_target" in checkpoint:
+            self.network_target.load_state_dict(checkpoint["network_target"])
+            self.step_copied = pickle.loads(checkpoint["step_copied"])
+        else:
+            self.copy_online_to_target()
+            self.step_copied = self.step
+
     @classmethod
     def load(cls, file_name, dire_name=".", device=None):
-        """ load agent form dire_name/file_name
+        """ load agent form dire_name/file_name, target network, step and step of last copy are loaded if they were
+        saved, so target network is copied with same schedule than saved agent
 
         :param device: torch device to run agent
         :type: torch.device
@@ -150,10 +251,7 @@ class DoubleDQN(DQN):
         """
         dict_save = torch.load(os.path.abspath(os.path.join(dire_name, file_name)))
 
-        network = pickle.loads(dict_save["network_class"])(
-            observation_space=pickle.loads(dict_save["observation_space"]),
-            action_space=pickle.loads(dict_save["action_space"]))
-        network.load_state_dict(dict_save["network"])
+        network = cls.load_network(dict_save)
 
         double_dqn = DoubleDQN(observation_space=pickle.loads(dict_save["observation_space"]),
                                action_space=pickle.loads(dict_save["action_space"]),
@@ -162,11 +260,15 @@ class DoubleDQN(DQN):
                                batch_size=pickle.loads(dict_save["batch_size"]),
                                gamma=pickle.loads(dict_save["gamma"]),
                                loss=pickle.loads(dict_save["loss"]),
-                               optimizer=pickle.loads(dict_save["optimizer"]),
+                               optimizer=cls.load_optimizer(dict_save, network),
                                greedy_exploration=pickle.loads(dict_save["greedy_exploration"]),
                                device=device)
 
         double_dqn.step_copy = pickle.loads(dict_save["step_copy"])
+        if "network_target" in dict_save:
+            double_dqn.network_target.load_state_dict(dict_save["network_target"])
+            double_dqn.step = pickle.loads(dict_save["step"])
+            double_dqn.step_copied = pickle.loads(dict_save["step_copied"])
 
         return double_dqn
 
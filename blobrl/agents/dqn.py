@@ -1,24 +1,33 @@
 import os
 import pickle
+from copy import copy, deepcopy
 
+import numpy as np
 import torch
 import torch.nn.functional as F
 import torch.optim as optim
-from gym.spaces import Discrete, MultiDiscrete, flatten
+from gym.spaces import Discrete, MultiDiscrete
 
 from blobrl.agents import AgentInterface
-from blobrl.explorations import GreedyExplorationInterface, EpsilonGreedy
-from blobrl.memories import MemoryInterface, ExperienceReplay
-from blobrl.networks import SimpleNetwork
+from blobrl.explorations import GreedyExplorationInterface, EpsilonGreedy, NoisyExploration
+from blobrl.explorations.greedy_exploration_interface import greedy_actions
+from blobrl.flattener import Flattener
+from blobrl.memories import MemoryInterface, ExperienceReplay, PrioritizedReplay
+from blobrl.networks import BaseNetwork, SimpleNetwork, set_noisy
+from blobrl.wrappers import LazyFrames
 
 
 class DQN(AgentInterface):
 
     def enable_exploration(self):
         self.with_exploration = True
+        set_noisy(self.network, True)
 
     def disable_exploration(self):
+        """ Disable exploration, NoisyLinear layers of network use only their mean weights
+        """
         self.with_exploration = False
+        set_noisy(self.network, False)
 
     def __init__(self, observation_space, action_space, memory=None, network=None, step_train=1, batch_size=32,
                  gamma=1.00, loss=None, optimizer=None, greedy_exploration=None, device=None):
@@ -66,7 +75,8 @@ class DQN(AgentInterface):
                     type(greedy_exploration)))
         if network is None:
             network = SimpleNetwork(observation_space=observation_space,
-                                    action_space=action_space)
+                                    action_space=action_space,
+                                    noisy=isinstance(greedy_exploration, NoisyExploration))
         if not isinstance(network, torch.nn.Module):
             raise TypeError("network need to be instance of torch.nn.Module, not :" + str(type(network)))
 
@@ -75,6 +85,12 @@ class DQN(AgentInterface):
         self.network = network
         self.network.to(self.device)
 
+        if isinstance(self.network, BaseNetwork):
+            self.flattener = self.network.flattener
+        else:
+            self.flattener = Flattener(self.observation_space)
+        self.observation_buffer = np.empty((1, self.flattener.flatdim), dtype=self.flattener.dtype)
+
         self.memory = memory
 
         self.step_train = step_train
@@ -98,8 +114,20 @@ class DQN(AgentInterface):
         else:
             self.greedy_exploration = greedy_exploration
 
+        self.add_exploration_parameters()
+
         self.with_exploration = True
 
+    def add_exploration_parameters(self):
+        """ Move greedy_exploration on device and add its trainable parameters in optimizer if it is a torch module
+        """
+        if isinstance(self.greedy_exploration, torch.nn.Module):
+            self.greedy_exploration.to(self.device)
+            known = set(id(p) for group in self.optimizer.param_groups for p in group["params"])
+            parameters = [p for p in self.greedy_exploration.parameters() if p.requires_grad and id(p) not in known]
+            if parameters:
+                self.optimizer.add_param_group({"params": parameters})
+
     def get_action(self, observation):
         """ Return action choice by the agents
 
@@ -109,17 +137,74 @@ class DQN(AgentInterface):
         if not self.greedy_exploration.be_greedy(self.step) and self.with_exploration:
             return self.action_space.sample()
 
-        observation = torch.tensor([flatten(self.observation_space, observation)], device=self.device).float()
+        self.flatten_observation(observation, out=self.observation_buffer[0])
+        observation = torch.as_tensor(self.observation_buffer, device=self.device)
+
+        with torch.no_grad():
+            values = self.get_values(observation)
+
+        return self.choose_actions(values)[0]
+
+    def get_actions(self, observations):
+        """ Return actions choice by the agents for a batch of observations, greedy observations are run in one
+        forward pass
+
+        :param observations: list of observations or observations batched like gym.vector does
+        :return: list of actions
+        """
+        observations = self.flattener.flatten_batch(observations)
+        greedy = self.greedy_exploration.be_greedy_batch(self.step, len(observations))
+        if not self.with_exploration:
+            greedy[:] = True
+
+        actions = [None] * len(observations)
+        if greedy.any():
+            with torch.no_grad():
+                values = self.get_values(torch.as_tensor(observations[greedy], device=self.device))
+            for i, action in zip(np.flatnonzero(greedy), self.choose_actions(values)):
+                actions[i] = action
+        for i in np.flatnonzero(~greedy):
+            actions[i] = self.action_space.sample()
+        return actions
+
+    def get_values(self, observations):
+        """ Return values of actions used to choose them
+
+        :param observations: flatten observations
+        :type observations: torch.Tensor
+        """
+        return self.network.forward(observations)
+
+    def choose_actions(self, values):
+        """ Return action of each observation of values, chosen by greedy_exploration if exploration is enabled else
+        argmax of each head
 
-        q_values = self.network.forward(observation)
+        :param values: values of network
+        :type values: torch.Tensor, list
+        :return: list of actions, one by observation
+        """
+        if self.with_exploration:
+            actions = self.greedy_exploration.choose_actions(self.step, values)
+        else:
+            actions = greedy_actions(values)
+
+        # heads are converted once, tuple mark heads in the nested list
+        def to_tuple(values):
+            if isinstance(values, list):
+                return [to_tuple(v) for v in values]
+            return tuple(values.tolist())
 
-        def return_values(values):
+        def return_values(values, i):
             if isinstance(values, list):
-                return [return_values(v) for v in values]
+                return [return_values(v, i) for v in values]
+            return values[i]
 
-            return torch.argmax(values).detach().item()
+        head = values
+        while isinstance(head, list):
+            head = head[0]
 
-        return return_values(q_values)
+        actions = to_tuple(actions)
+        return [return_values(actions, i) for i in range(head.shape[0])]
 
     def learn(self, observation, action, reward, next_observation, done) -> None:
         """ learn from parameters
@@ -136,53 +221,320 @@ class DQN(AgentInterface):
         :param done: if env is finished
         :type done: bool
         """
-        self.memory.append([flatten(self.observation_space, observation)], action, reward,
-                           [flatten(self.observation_space, next_observation)], done)
-        self.step += 1
+        self.remember(observation, action, reward, next_observation, done)
 
         if (self.step % self.step_train) == 0:
             self.train()
 
+    def remember(self, observation, action, reward, next_observation, done) -> None:
+        """ Store transition in memory without training
+
+        :param observation: stat of environment
+        :type observation: gym.Space
+        :param action: action taken by agent
+        :type action: int, float, list
+        :param reward: reward win
+        :type reward: int, float, np.int, np.float
+        :param next_observation:
+        :type next_observation: gym.Space
+        :param done: if env is finished
+        :type done: bool
+        """
+        next_memory_observation = self.get_memory_observation(next_observation)
+        self.memory.append([self.get_memory_observation(observation)], action, reward, [next_memory_observation],
+                           done)
+        self.greedy_exploration.count([next_memory_observation])
+        self.step += 1
+
+    def update(self):
+        """ Train once on memory when it has at least batch_size transitions
+
+        :return: False if agent is not trained
+        :rtype: bool
+        """
+        if self.step < self.batch_size:
+            return False
+        self.train()
+        return True
+
+    def learn_batch(self, observations, actions, rewards, next_observations, dones) -> None:
+        """ learn from a batch of transitions, one by environment, observations are flatten at once and agent is
+        trained each time step reach a multiple of step_train
+
+        :param observations: list of observations or observations batched like gym.vector does
+        :param actions: list of actions
+        :type actions: list
+        :param rewards: list of rewards
+        :type rewards: list
+        :param next_observations: list of next observations or next observations batched like gym.vector does
+        :param dones: list of done
+        :type dones: list
+        """
+        step = self.step
+        self.remember_batch(observations, actions, rewards, next_observations, dones)
+
+        for _ in range(self.step // self.step_train - step // self.step_train):
+            self.train()
+
+    def remember_batch(self, observations, actions, rewards, next_observations, dones, priorities=None) -> None:
+        """ Store a batch of transitions in memory without training, observations are flatten at once
+
+        :param observations: list of observations or observations batched like gym.vector does
+        :param actions: list of actions
+        :type actions: list
+        :param rewards: list of rewards
+        :type rewards: list
+        :param next_observations: list of next observations or next observations batched like gym.vector does
+        :param dones: list of done
+        :type dones: list
+        :param priorities: priorities of transitions, only used if memory is PrioritizedReplay
+        :type priorities: list, np.ndarray
+        """
+        observations = self.flattener.flatten_batch(observations)
+        next_observations = self.flattener.flatten_batch(next_observations)
+        if isinstance(self.memory, PrioritizedReplay):
+            self.memory.extend(observations[:, None], actions, rewards, next_observations[:, None], dones, priorities)
+        else:
+            self.memory.extend(observations[:, None], actions, rewards, next_observations[:, None], dones)
+        self.greedy_exploration.count(next_observations)
+        self.step += len(dones)
+
+    def get_priorities(self, observations, actions, rewards, next_observations, dones):
+        """ Return absolute TD error of each transition of a batch, used as initial priorities
+
+        :param observations: list of observations or observations batched like gym.vector does
+        :param actions: list of actions
+        :type actions: list
+        :param rewards: list of rewards
+        :type rewards: list
+        :param next_observations: list of next observations or next observations batched like gym.vector does
+        :param dones: list of done
+        :type dones: list
+        :return: np.ndarray of shape (batch,)
+        """
+        return self.td_errors(torch.as_tensor(self.flattener.flatten_batch(observations), device=self.device),
+                              torch.as_tensor(np.asarray(actions), device=self.device),
+                              torch.as_tensor(np.asarray(rewards, dtype=np.float32), device=self.device),
+                              torch.as_tensor(self.flattener.flatten_batch(next_observations), device=self.device),
+                              torch.as_tensor(np.asarray(dones, dtype=np.float32), device=self.device)).cpu().numpy()
+
+    def td_errors(self, observations, actions, rewards, next_observations, dones):
+        """ Return absolute one step TD error of each transition with values of get_values, summed over heads
+
+        :param observations: flatten observations
+        :type observations: torch.Tensor
+        :param actions:
+        :type actions: torch.Tensor
+        :param rewards:
+        :type rewards: torch.Tensor
+        :param next_observations: flatten observations
+        :type next_observations: torch.Tensor
+        :param dones:
+        :type dones: torch.Tensor
+        :return: torch.Tensor of shape (batch,)
+        """
+        with torch.no_grad():
+            values = self.heads(self.get_values(observations))
+            next_values = self.get_next_values(next_observations)
+
+        actions = actions.view(actions.shape[0], -1).long()
+        errors = torch.zeros(actions.shape[0], device=actions.device)
+        for i, (q, q_next) in enumerate(zip(values, next_values)):
+            q_target = rewards.view(-1) + self.gamma * q_next * (1 - dones.view(-1))
+            errors += (q_target - q.gather(1, actions[:, i:i + 1]).squeeze(1)).abs()
+        return errors
+
+    def get_next_values(self, next_observations):
+        """ Return value of next observations of each head used in target of td_errors, max of get_values like in
+        apply_loss
+
+        :param next_observations: flatten observations
+        :type next_observations: torch.Tensor
+        :return: list of torch.Tensor of shape (batch,)
+        """
+        return [values.max(dim=1)[0] for values in self.heads(self.get_values(next_observations))]
+
+    @staticmethod
+    def heads(values):
+        """ Return list of values of each head, values of network with many heads are nested lists
+
+        :param values: torch.Tensor or list of values
+        """
+        if isinstance(values, list):
+            return [head for v in values for head in DQN.heads(v)]
+        return [values]
+
+    def update_priorities(self, errors):
+        """ Set priorities of last sampled transitions to their TD error return by apply_loss if memory is
+        PrioritizedReplay
+
+        :param errors: absolute TD error of each sampled transition
+        :type errors: torch.Tensor
+        """
+        if isinstance(self.memory, PrioritizedReplay):
+            self.memory.update_priorities(self.memory.indices, errors.cpu().numpy())
+
     def episode_finished(self) -> None:
         pass
 
+    def get_memory_observation(self, observation):
+        """ Return observation stored by remember, flatten copy of observation, or LazyFrames as it is if memory is
+        ExperienceReplay, so stacked observations of FrameStack share their frames in memory and are stacked only
+        when they are sampled
+
+        :param observation: stat of environment
+        :type observation: gym.Space
+        """
+        if isinstance(observation, LazyFrames) and type(self.memory) is ExperienceReplay and len(
+                self.flattener.layout) == 1:
+            return observation
+        return self.flatten_observation(observation)
+
+    def flatten_observation(self, observation, out=None):
+        """ Return observation as 1D array like network need it, with self.flattener
+
+        :param observation: stat of environment
+        :type observation: gym.Space
+        :param out: buffer where observation is written, a new one is created if None
+        :type out: np.ndarray
+        """
+        return self.flattener.flatten(observation, out=out)
+
     def train(self):
         """
 
         """
-        observations, actions, rewards, next_observations, dones = self.memory.sample(self.batch_size,
-                                                                                      device=self.device)
+        observations, actions, rewards, next_observations, dones, weights = self.sample_memory()
+        rewards, exploration_loss = self.add_intrinsic_rewards(observations, actions, rewards, next_observations)
 
         next_prediction = self.network.forward(next_observations)
 
         prediction = self.network.forward(observations)
 
         if isinstance(self.action_space, Discrete):
-            self.apply_loss(next_prediction, prediction, actions, rewards, next_observations, dones,
-                            self.action_space.n)
+            errors = self.apply_loss(next_prediction, prediction, actions, rewards, next_observations, dones,
+                                     self.action_space.n, weights=weights)
         # find space for one_hot encore action in apply loss
         elif isinstance(self.action_space, MultiDiscrete):
-            self.apply_loss(next_prediction, prediction, actions, rewards, next_observations, dones,
-                            self.action_space.nvec)
+            errors = self.apply_loss(next_prediction, prediction, actions, rewards, next_observations, dones,
+                                     self.action_space.nvec, weights=weights)
+        self.update_priorities(errors)
+        self.backward_exploration(exploration_loss)
         self.optimizer.step()
+        self.updates += 1
+        self.samples += self.batch_size
+
+    def sample_memory(self):
+        """ Sample batch_size transitions from memory with their importance sampling weights, weights are None if
+        memory is not PrioritizedReplay
+
+        :return: observations, actions, rewards, next_observations, dones, weights
+        """
+        batch = self.memory.sample(self.batch_size, device=self.device)
+        if isinstance(self.memory, PrioritizedReplay):
+            return batch
+        return list(batch) + [None]
+
+    def get_loss(self, q_predict, q, weights=None):
+        """ Return loss between predicted and target values, loss of each transition is multiplied by its importance
+        sampling weight if weights is given
+
+        :param q_predict: predicted values of taken actions
+        :type q_predict: torch.Tensor
+        :param q: target values
+        :type q: torch.Tensor
+        :param weights: importance sampling weights of PrioritizedReplay
+        :type weights: torch.Tensor
+        """
+        if weights is None:
+            return self.loss(q_predict, q)
+        loss = copy(self.loss)
+        loss.reduction = "none"
+        return (loss(q_predict, q) * weights).mean()
+
+    def add_intrinsic_rewards(self, observations, actions, rewards, next_observations):
+        """ Add intrinsic rewards of greedy_exploration to rewards
+
+        :param observations:
+        :param actions:
+        :param rewards:
+        :param next_observations:
+        :return: rewards, loss of greedy_exploration or None
+        """
+        intrinsic_rewards, exploration_loss = self.greedy_exploration.intrinsic_reward(observations, actions,
+                                                                                       next_observations)
+        if intrinsic_rewards is not None:
+            rewards = rewards + intrinsic_rewards
+        return rewards, exploration_loss
 
-    def apply_loss(self, next_prediction, prediction, actions, rewards, next_observations, dones, len_space):
+    def backward_exploration(self, exploration_loss):
+        """ Backward loss of greedy_exploration after apply_loss, so it is trained in the optimizer step of agent
+
+        :param exploration_loss: loss from add_intrinsic_rewards
+        :type exploration_loss: torch.Tensor or None
+        """
+        if exploration_loss is not None:
+            exploration_loss.backward()
+
+    def apply_loss(self, next_prediction, prediction, actions, rewards, next_observations, dones, len_space,
+                   weights=None):
+        """ Backward loss of each head and return absolute TD error of each transition summed over heads
+
+        :param weights: importance sampling weights of PrioritizedReplay, None for uniform memories
+        :type weights: torch.Tensor
+        :return: torch.Tensor of shape (batch,)
+        """
         if isinstance(next_prediction, list):
-            [self.apply_loss(n, p, a, rewards, next_observations, dones, c) for n, p, a, c in
-             zip(next_prediction, prediction, actions.permute(1, 0, *[i for i in range(2, len(actions.shape))]),
-                 len_space)]
+            return sum([self.apply_loss(n, p, a, rewards, next_observations, dones, c, weights) for n, p, a, c in
+                        zip(next_prediction, prediction,
+                            actions.permute(1, 0, *[i for i in range(2, len(actions.shape))]), len_space)])
         else:
 
             q = rewards + self.gamma * next_prediction.max(1)[0].detach() * (
                     1 - dones)
 
             actions_one_hot = F.one_hot(actions.to(torch.int64), num_classes=len_space)
-            q_values_predict = prediction * actions_one_hot
-            q_predict = torch.max(q_values_predict, dim=1)
+            q_predict = (prediction * actions_one_hot).sum(dim=1)
 
             self.optimizer.zero_grad()
-            loss = self.loss(q_predict[0], q)
+            loss = self.get_loss(q_predict, q, weights)
             loss.backward(retain_graph=True)
+            return (q - q_predict).detach().abs()
+
+    def get_policy(self):
+        """ Return copy of agent which is only used to choose actions, without memory and optimizer
+        """
+        policy = copy(self)
+        policy.memory = None
+        policy.optimizer = None
+        policy.network = deepcopy(self.network)
+        policy.greedy_exploration = deepcopy(self.greedy_exploration)
+        policy.observation_buffer = self.observation_buffer.copy()
+        return policy
+
+    def state_dict(self):
+        """ Return weights of network
+        """
+        return self.network.state_dict()
+
+    def load_state_dict(self, state_dict):
+        """ Load weights of network
+
+        :param state_dict: weights return by state_dict
+        :type state_dict: dict
+        """
+        self.network.load_state_dict(state_dict)
+
+    def sync_policy(self, policy, state_dict=None):
+        """ Load state_dict in policy if it is not None and copy step, so exploration of policy follow agent
+
+        :param policy: agent return by get_policy
+        :type policy: DQN
+        :param state_dict: weights return by state_dict
+        :type state_dict: dict
+        """
+        super().sync_policy(policy, state_dict)
+        policy.step = self.step
 
     def save(self, file_name, dire_name="."):
         """ Save agent at dire_name/file_name
@@ -198,16 +550,96 @@ class DQN(AgentInterface):
         dict_save["observation_space"] = pickle.dumps(self.observation_space)
         dict_save["action_space"] = pickle.dumps(self.action_space)
         dict_save["network_class"] = pickle.dumps(type(self.network))
-        dict_save["network"] = self.network.cpu().state_dict()
+        dict_save["network_object"] = pickle.dumps(self.get_network_copy())
+        dict_save["network"] = {key: value.cpu() for key, value in self.network.state_dict().items()}
         dict_save["step_train"] = pickle.dumps(self.step_train)
         dict_save["batch_size"] = pickle.dumps(self.batch_size)
         dict_save["gamma"] = pickle.dumps(self.gamma)
         dict_save["loss"] = pickle.dumps(self.loss)
         dict_save["optimizer"] = pickle.dumps(self.optimizer)
         dict_save["greedy_exploration"] = pickle.dumps(self.greedy_exploration)
+        dict_save["optimizer_state"] = self.optimizer.state_dict()
+        dict_save["step"] = pickle.dumps(self.step)
 
         torch.save(dict_save, os.path.abspath(os.path.join(dire_name, file_name)))
 
+    def get_checkpoint(self, memory=False):
+        """ Return copy of weights, optimizer state, exploration and step, which is not changed by training
+
+        :param memory: if a copy of memory is added
+        :type memory: bool
+        """
+        checkpoint = dict()
+        checkpoint["network"] = {key: value.detach().clone() for key, value in self.network.state_dict().items()}
+        checkpoint["optimizer_state"] = deepcopy(self.optimizer.state_dict())
+        checkpoint["greedy_exploration"] = pickle.dumps(self.greedy_exploration)
+        checkpoint["step"] = pickle.dumps(self.step)
+        if memory:
+            checkpoint["memory"] = deepcopy(self.memory)
+        return checkpoint
+
+    def set_checkpoint(self, checkpoint):
+        """ Load checkpoint return by get_checkpoint or saved by save in this agent, so training continue where it
+        stopped, agent need to be created with same network and optimizer classes
+
+        :param checkpoint:
+        :type checkpoint: dict
+        """
+        self.network.load_state_dict(checkpoint["network"])
+        greedy_exploration = pickle.loads(checkpoint["greedy_exploration"])
+        if isinstance(self.greedy_exploration, torch.nn.Module):
+            self.greedy_exploration.load_state_dict(greedy_exploration.state_dict())
+        else:
+            self.greedy_exploration = greedy_exploration
+        self.optimizer.load_state_dict(checkpoint["optimizer_state"])
+        self.step = pickle.loads(checkpoint["step"])
+        if "memory" in checkpoint:
+            self.memory = checkpoint["memory"]
+
+    def load_checkpoint(self, file_name, dire_name="."):
+        """ Load weights, optimizer state, exploration and step saved by save in this agent, so training continue
+        where it stopped, agent need to be created with same network and optimizer classes
+
+        :param file_name: name of file for load
+        :type file_name: string
+        :param dire_name: name of directory where we would load it
+        :type file_name: string
+        """
+        self.set_checkpoint(torch.load(os.path.abspath(os.path.join(dire_name, file_name))))
+
+    def get_network_copy(self):
+        """ Return copy of network on cpu, pickled by save with its constructor arguments like noisy
+        """
+        return deepcopy(self.network).cpu()
+
+    @staticmethod
+    def load_network(dict_save):
+        """ Return network saved by save with its weights, network is built from its class for old saves
+
+        :param dict_save: dict loaded from file written by save
+        :type dict_save: dict
+        """
+        if "network_object" in dict_save:
+            network = pickle.loads(dict_save["network_object"])
+        else:
+            network = pickle.loads(dict_save["network_class"])(
+                observation_space=pickle.loads(dict_save["observation_space"]),
+                action_space=pickle.loads(dict_save["action_space"]))
+        network.load_state_dict(dict_save["network"])
+        return network
+
+    @staticmethod
+    def load_optimizer(dict_save, network):
+        """ Return optimizer saved by save with same class and hyperparameters, on parameters of network
+
+        :param dict_save: dict loaded from file written by save
+        :type dict_save: dict
+        :param network: network loaded by load_network
+        :type network: torch.nn.Module
+        """
+        optimizer = pickle.loads(dict_save["optimizer"])
+        return type(optimizer)(network.parameters(), **optimizer.defaults)
+
     @classmethod
     def load(cls, file_name, dire_name=".", device=None):
         """ load agent form dire_name/file_name
@@ -221,10 +653,7 @@ class DQN(AgentInterface):
         """
         dict_save = torch.load(os.path.abspath(os.path.join(dire_name, file_name)))
 
-        network = pickle.loads(dict_save["network_class"])(
-            observation_space=pickle.loads(dict_save["observation_space"]),
-            action_space=pickle.loads(dict_save["action_space"]))
-        network.load_state_dict(dict_save["network"])
+        network = cls.load_network(dict_save)
 
         return DQN(observation_space=pickle.loads(dict_save["observation_space"]),
                    action_space=pickle.loads(dict_save["action_space"]),
@@ -233,7 +662,7 @@ class DQN(AgentInterface):
                    batch_size=pickle.loads(dict_save["batch_size"]),
                    gamma=pickle.loads(dict_save["gamma"]),
                    loss=pickle.loads(dict_save["loss"]),
-                   optimizer=pickle.loads(dict_save["optimizer"]),
+                   optimizer=cls.load_optimizer(dict_save, network),
                    greedy_exploration=pickle.loads(dict_save["greedy_exploration"]),
                    device=device)
 
@@ -0,0 +1,285 @@
+import os
+import pickle
+
+import torch
+from gym.spaces import Discrete, MultiDiscrete
+
+from blobrl.agents import DQN
+from blobrl.flattener import split_batch
+from blobrl.memories import SequenceReplay
+from blobrl.networks import RecurrentNetwork
+
+
+class DRQN(DQN):
+    """ from 'Deep Recurrent Q-Learning for Partially Observable MDPs' in https://arxiv.org/pdf/1507.06527.pdf
+    with burn-in from 'Recurrent Experience Replay in Distributed Reinforcement Learning'
+    """
+
+    def __init__(self, observation_space, action_space, memory=None, network=None, burn_in=4, step_train=1,
+                 batch_size=32, gamma=1.0, loss=None, optimizer=None, greedy_exploration=None, device=None):
+        """
+
+        :param action_space:
+        :param observation_space:
+        :param memory: memory which sample sequences, default SequenceReplay(sequence_length=burn_in + 8)
+        :type memory: SequenceReplay
+        :param network:
+        :type network: RecurrentNetwork
+        :param burn_in: number of first steps of each sequence only used to initialise hidden state
+        :type burn_in: int
+        :param step_train:
+        :param batch_size:
+        :param gamma:
+        :param loss:
+        :param optimizer:
+        :param greedy_exploration:
+        :param device: torch device to run agent
+        :type: torch.device
+        """
+        if memory is None:
+            memory = SequenceReplay(sequence_length=burn_in + 8)
+        if not isinstance(memory, SequenceReplay):
+            raise TypeError("memory need to be instance of blobrl.memories.SequenceReplay, not :" + str(type(memory)))
+        if not 0 <= burn_in < memory.sequence_length:
+            raise ValueError("burn_in need to be in range [0, memory.sequence_length[ not " + str(burn_in))
+
+        if network is None and optimizer is None:
+            network = RecurrentNetwork(observation_space=observation_space, action_space=action_space)
+        if network is not None and not isinstance(network, RecurrentNetwork):
+            raise TypeError("network need to be instance of blobrl.networks.RecurrentNetwork, not :" + str(
+                type(network)))
+
+        super().__init__(observation_space=observation_space, action_space=action_space, memory=memory,
+                         network=network, step_train=step_train, batch_size=batch_size, gamma=gamma, loss=loss,
+                         optimizer=optimizer, greedy_exploration=greedy_exploration, device=device)
+
+        self.burn_in = burn_in
+        self.hidden = None
+
+    def get_action(self, observation):
+        """ Return action choice by the agents, network is run on each step to keep hidden state up to date
+
+        :param observation: stat of environment
+        :type observation: gym.Space
+        """
+        self.flatten_observation(observation, out=self.observation_buffer[0])
+        observation = torch.as_tensor(self.observation_buffer, device=self.device)
+
+        with torch.no_grad():
+            q_values, self.hidden = self.network.forward(observation, self.hidden)
+
+        if not self.greedy_exploration.be_greedy(self.step) and self.with_exploration:
+            return self.action_space.sample()
+
+        return self.choose_actions(q_values)[0]
+
+    def get_values(self, observations):
+        """ Return values of observations as one step sequences from zero hidden state
+
+        :param observations: flatten observations
+        :type observations: torch.Tensor
+        """
+        return self.network.forward(observations)[0]
+
+    def get_actions(self, observations):
+        """ Return actions for a batch of one observation, hidden state and sequences in memory follow one
+        environment
+
+        :param observations: list of observations or observations batched like gym.vector does
+        :return: list of actions
+        """
+        observations = split_batch(self.observation_space, observations)
+        if len(observations) != 1:
+            raise ValueError("DRQN support only one environment, not " + str(len(observations)))
+        return [self.get_action(observations[0])]
+
+    def learn(self, observation, action, reward, next_observation, done) -> None:
+        """ learn from parameters
+
+        :param observation: stat of environment
+        :type observation: gym.Space
+        :param action: action taken by agent
+        :type action: int, float, list
+        :param reward: reward win
+        :type reward: int, float, np.int, np.float
+        :type reward: int, np.int
+        :param next_observation:
+        :type next_observation: gym.Space
+        :param done: if env is finished
+        :type done: bool
+        """
+        self.remember(observation, action, reward, next_observation, done)
+
+        if (self.step % self.step_train) == 0:
+            self.train()
+
+    def remember(self, observation, action, reward, next_observation, done) -> None:
+        """ Store transition in memory without training, transitions need to be given in order of episodes
+
+        :param observation: stat of environment
+        :type observation: gym.Space
+        :param action: action taken by agent
+        :type action: int, float, list
+        :param reward: reward win
+        :type reward: int, float, np.int, np.float
+        :param next_observation:
+        :type next_observation: gym.Space
+        :param done: if env is finished
+        :type done: bool
+        """
+        next_observation = self.flatten_observation(next_observation)
+        self.memory.append(self.flatten_observation(observation), action, reward, next_observation, done)
+        self.greedy_exploration.count([next_observation])
+        self.step += 1
+
+    def learn_batch(self, observations, actions, rewards, next_observations, dones) -> None:
+        """ learn from a batch of one transition, sequences in memory follow one environment
+
+        :param observations: list of observations or observations batched like gym.vector does
+        :param actions: list of actions
+        :type actions: list
+        :param rewards: list of rewards
+        :type rewards: list
+        :param next_observations: list of next observations or next observations batched like gym.vector does
+        :param dones: list of done
+        :type dones: list
+        """
+        if len(dones) != 1:
+            raise ValueError("DRQN support only one environment, not " + str(len(dones)))
+        self.learn(split_batch(self.observation_space, observations)[0], actions[0], rewards[0],
+                   split_batch(self.observation_space, next_observations)[0], dones[0])
+
+    def episode_finished(self) -> None:
+        """ Reset hidden state
+        """
+        self.hidden = None
+
+    def train(self):
+        """ Train on batch of sequences, burn-in steps and trained steps are each run as one packed sequence
+
+        """
+        observations, actions, rewards, next_observations, dones, lengths = self.memory.sample(self.batch_size,
+                                                                                               device=self.device)
+        batch_size, sequence_length = dones.shape
+
+        # sequences[:, t + 1] is next observation of step t
+        sequences = torch.cat([observations[:, :1], next_observations], dim=1)
+        sequence_lengths = lengths + 1
+
+        hidden = None
+        if self.burn_in > 0:
+            with torch.no_grad():
+                _, hidden = self.network.forward(sequences[:, :self.burn_in], lengths=sequence_lengths.clamp(
+                    max=self.burn_in))
+
+        time = sequence_length + 1 - self.burn_in
+        q_values, _ = self.network.forward(sequences[:, self.burn_in:], hidden,
+                                           lengths=(sequence_lengths - self.burn_in).clamp(min=1))
+
+        steps = torch.arange(self.burn_in, sequence_length, device=self.device)
+        mask = steps < lengths.view(-1, 1)
+        rows = (torch.arange(batch_size, device=self.device).view(-1, 1) * time + steps - self.burn_in)[mask]
+        if rows.numel() == 0:
+            return
+
+        def select(values, index):
+            if isinstance(values, list):
+                return [select(v, index) for v in values]
+            return values.index_select(0, index)
+
+        prediction = select(q_values, rows)
+        next_prediction = select(q_values, rows + 1)
+
+        actions = actions[:, self.burn_in:][mask]
+        rewards = rewards[:, self.burn_in:][mask]
+        dones = dones[:, self.burn_in:][mask]
+        rewards, exploration_loss = self.add_intrinsic_rewards(observations[:, self.burn_in:][mask], actions, rewards,
+                                                               next_observations[:, self.burn_in:][mask])
+
+        if isinstance(self.action_space, Discrete):
+            self.apply_loss(next_prediction, prediction, actions, rewards, None, dones, self.action_space.n)
+        elif isinstance(self.action_space, MultiDiscrete):
+            self.apply_loss(next_prediction, prediction, actions, rewards, None, dones, self.action_space.nvec)
+        self.backward_exploration(exploration_loss)
+        self.optimizer.step()
+        self.updates += 1
+        self.samples += rows.numel()
+
+    def save(self, file_name, dire_name="."):
+        """ Save agent at dire_name/file_name
+
+        :param file_name: name of file for save
+        :type file_name: string
+        :param dire_name: name of directory where we would save it
+        :type file_name: string
+        """
+        os.makedirs(os.path.abspath(dire_name), exist_ok=True)
+
+        dict_save = dict()
+        dict_save["observation_space"] = pickle.dumps(self.observation_space)
+        dict_save["action_space"] = pickle.dumps(self.action_space)
+        dict_save["network_class"] = pickle.dumps(type(self.network))
+        dict_save["network_object"] = pickle.dumps(self.get_network_copy())
+        dict_save["network"] = {key: value.cpu() for key, value in self.network.state_dict().items()}
+        for key in ["linear_dim", "hidden_dim", "cell"]:
+            if hasattr(self.network, key):
+                dict_save[key] = pickle.dumps(getattr(self.network, key))
+        dict_save["step_train"] = pickle.dumps(self.step_train)
+        dict_save["batch_size"] = pickle.dumps(self.batch_size)
+        dict_save["gamma"] = pickle.dumps(self.gamma)
+        dict_save["loss"] = pickle.dumps(self.loss)
+        dict_save["optimizer"] = pickle.dumps(self.optimizer)
+        dict_save["greedy_exploration"] = pickle.dumps(self.greedy_exploration)
+        dict_save["optimizer_state"] = self.optimizer.state_dict()
+        dict_save["step"] = pickle.dumps(self.step)
+        dict_save["burn_in"] = pickle.dumps(self.burn_in)
+        dict_save["sequence_length"] = pickle.dumps(self.memory.sequence_length)
+        dict_save["max_size"] = pickle.dumps(self.memory.max_size)
+
+        torch.save(dict_save, os.path.abspath(os.path.join(dire_name, file_name)))
+
+    @classmethod
+    def load(cls, file_name, dire_name=".", device=None):
+        """ load agent form dire_name/file_name, network is built from linear_dim, hidden_dim and cell for saves
+        without network object
+
+        :param device: torch device to run agent
+        :type: torch.device
+        :param file_name: name of file for load
+        :type file_name: string
+        :param dire_name: name of directory where we would load it
+        :type file_name: string
+        """
+        dict_save = torch.load(os.path.abspath(os.path.join(dire_name, file_name)))
+
+        if "network_object" in dict_save:
+            network = cls.load_network(dict_save)
+        else:
+            network_arguments = {key: pickle.loads(dict_save[key]) for key in ["linear_dim", "hidden_dim", "cell"] if
+                                 key in dict_save}
+            network = pickle.loads(dict_save["network_class"])(
+                observation_space=pickle.loads(dict_save["observation_space"]),
+                action_space=pickle.loads(dict_save["action_space"]), **network_arguments)
+            network.load_state_dict(dict_save["network"])
+
+        memory_arguments = {key: pickle.loads(dict_save[key]) for key in ["max_size", "sequence_length"] if
+                            key in dict_save}
+
+        return DRQN(observation_space=pickle.loads(dict_save["observation_space"]),
+                    action_space=pickle.loads(dict_save["action_space"]),
+                    memory=SequenceReplay(**memory_arguments),
+                    network=network,
+                    burn_in=pickle.loads(dict_save["burn_in"]),
+                    step_train=pickle.loads(dict_save["step_train"]),
+                    batch_size=pickle.loads(dict_save["batch_size"]),
+                    gamma=pickle.loads(dict_save["gamma"]),
+                    loss=pickle.loads(dict_save["loss"]),
+                    optimizer=cls.load_optimizer(dict_save, network),
+                    greedy_exploration=pickle.loads(dict_save["greedy_exploration"]),
+                    device=device)
+
+    def __str__(self):
+        return 'DRQN-' + str(self.observation_space) + "-" + str(self.action_space) + "-" + str(
+            self.network) + "-" + str(self.memory) + "-" + str(self.step_train) + "-" + str(
+            self.step) + "-" + str(self.batch_size) + "-" + str(self.gamma) + "-" + str(self.loss) + "-" + str(
+            self.optimizer) + "-" + str(self.greedy_exploration) + "-" + str(self.burn_in)
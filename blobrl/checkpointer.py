@@ -0,0 +1,158 @@
+import os
+import re
+import tempfile
+import threading
+
+import torch
+
+
+class Checkpointer:
+    prefix = "checkpoint-"
+    extension = ".pt"
+
+    def __init__(self, directory, keep=3):
+        """ Write checkpoints in a background thread, so training don't wait for serialization
+
+        Each checkpoint is written in a temporary file then renamed, so directory never contain a partial checkpoint
+        even if process is killed, only the keep newest checkpoints are kept. If a checkpoint is given while the
+        previous one is not written, only the newest is written.
+
+        :param directory: directory where checkpoints are written
+        :type directory: str
+        :param keep: number of checkpoints kept in directory
+        :type keep: int
+        """
+        if not isinstance(keep, int) or keep < 1:
+            raise ValueError("keep need to be int >= 1 not " + str(keep))
+
+        self.directory = directory
+        self.keep = keep
+
+        self.condition = threading.Condition()
+        self.thread = None
+        self.closing = False
+        self.pending = None
+        self.writing = False
+        self.error = None
+        self.last_file = None
+
+    def save(self, checkpoint, steps):
+        """ Give checkpoint to the background thread which write it in directory/checkpoint-<steps>.pt
+
+        checkpoint need to be a copy which is not changed by training, like agent.get_checkpoint() return.
+
+        :param checkpoint: object saved with torch.save
+        :param steps: number of steps of checkpoint, used in file name
+        :type steps: int
+        """
+        self.raise_error()
+        with self.condition:
+            if self.thread is None:
+                self.closing = False
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            self.pending = (checkpoint, steps)
+            self.condition.notify_all()
+
+    def run(self):
+        """ Write pending checkpoints until close is called and nothing is pending
+        """
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closing:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                (checkpoint, steps), self.pending = self.pending, None
+                self.writing = True
+            try:
+                self.write(checkpoint, steps)
+            except Exception as error:
+                self.error = error
+            finally:
+                with self.condition:
+                    self.writing = False
+                    self.condition.notify_all()
+
+    def write(self, checkpoint, steps):
+        """ Write checkpoint atomically in directory and remove oldest checkpoints
+
+        :param checkpoint: object saved with torch.save
+        :param steps: number of steps of checkpoint
+        :type steps: int
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        file_name = os.path.join(self.directory, self.prefix + str(steps) + self.extension)
+        descriptor, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                torch.save(checkpoint, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_name, file_name)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+        self.last_file = file_name
+
+        for old_file in self.get_checkpoints(self.directory)[:-self.keep]:
+            os.remove(old_file)
+
+    def wait(self):
+        """ Wait until pending checkpoint is written, raise error of background thread if there is one
+        """
+        with self.condition:
+            while self.pending is not None or self.writing:
+                self.condition.wait()
+        self.raise_error()
+
+    def raise_error(self):
+        """ Raise error of background thread once
+        """
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def close(self):
+        """ Write pending checkpoint and stop background thread, next save start it again
+        """
+        with self.condition:
+            thread = self.thread
+            self.closing = True
+            self.condition.notify_all()
+        if thread is not None:
+            thread.join()
+        with self.condition:
+            self.thread = None
+        self.raise_error()
+
+    @classmethod
+    def get_checkpoints(cls, directory):
+        """ Return paths of checkpoints of directory, sorted from oldest to newest steps
+
+        :param directory:
+        :type directory: str
+        """
+        if not os.path.isdir(directory):
+            return []
+        pattern = re.compile(re.escape(cls.prefix) + r"(\d+)" + re.escape(cls.extension) + "$")
+        checkpoints = []
+        for file_name in os.listdir(directory):
+            match = pattern.match(file_name)
+            if match:
+                checkpoints.append((int(match.group(1)), os.path.join(directory, file_name)))
+        return [path for _, path in sorted(checkpoints)]
+
+    @classmethod
+    def get_latest(cls, directory):
+        """ Return path of newest checkpoint of directory, None if there is none
+
+        :param directory:
+        :type directory: str
+        """
+        checkpoints = cls.get_checkpoints(directory)
+        return checkpoints[-1] if checkpoints else None
+
+    def __str__(self):
+        return 'Checkpointer-' + str(self.directory) + '-' + str(self.keep)
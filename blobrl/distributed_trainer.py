@@ -0,0 +1,293 @@
+import queue
+import time
+from argparse import ArgumentParser
+
+import gym
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+from blobrl import Logger, Record
+from blobrl.agents import DQN, DRQN
+from blobrl.explorations import EpsilonGreedy
+from blobrl.memories import PrioritizedReplay
+
+
+def _run_actor(actor_id, environment, policy, epsilon, seed, transitions, weights, version, lock, episodes,
+               max_episode, send_steps):
+    """ Run episodes with policy until max_episode episodes are done by all actors
+
+    Transitions are sent by batches of send_steps with their priorities and the steps per second of the actor,
+    rewards of each episode are sent when it is done. Weights are loaded from shared memory when the learner
+    broadcast new ones.
+
+    :param actor_id: index of actor
+    :type actor_id: int
+    :param environment: name of gym environment or gym.Env
+    :param policy: agent return by DQN.get_policy
+    :type policy: DQN
+    :param epsilon: epsilon of actor
+    :type epsilon: float
+    :param seed: seed of exploration of actor
+    :type seed: int
+    :param transitions: queue of messages read by the learner
+    :param weights: weights of learner in shared memory
+    :type weights: dict
+    :param version: number of broadcast of weights
+    :param lock: lock of weights
+    :param episodes: number of episodes done by all actors
+    :param max_episode: number of episodes to do
+    :type max_episode: int
+    :param send_steps: number of transitions by batch
+    :type send_steps: int
+    """
+    torch.set_num_threads(1)
+    environment = gym.make(environment) if isinstance(environment, str) else environment
+    policy.greedy_exploration = EpsilonGreedy(epsilon, seed=seed)
+    policy.enable_exploration()
+
+    loaded = -1
+    batch = [[], [], [], [], []]
+    start = time.time()
+
+    def send():
+        nonlocal batch, start
+        priorities = policy.get_priorities(*batch)
+        transitions.put(("transitions", actor_id, batch + [priorities], len(batch[4]) / (time.time() - start)))
+        batch = [[], [], [], [], []]
+        start = time.time()
+
+    while episodes.value < max_episode:
+        observation = environment.reset()
+        done = False
+        rewards = []
+        while not done:
+            if version.value != loaded:
+                with lock:
+                    policy.load_state_dict(weights)
+                    loaded = version.value
+
+            action = policy.get_action(observation)
+            next_observation, reward, done, info = environment.step(action)
+            for values, value in zip(batch, (observation, action, reward, next_observation, done)):
+                values.append(value)
+            rewards.append(float(reward))
+            observation = next_observation
+
+            if len(batch[4]) >= send_steps:
+                send()
+        policy.episode_finished()
+
+        with episodes.get_lock():
+            episodes.value += 1
+        transitions.put(("episode", actor_id, rewards, None))
+
+    if batch[4]:
+        send()
+    transitions.put(("done", actor_id, None, None))
+
+
+class DistributedTrainer:
+    """ from 'Distributed Prioritized Experience Replay' in https://arxiv.org/pdf/1803.00933.pdf on one machine
+    """
+
+    def __init__(self, environment, agent, log_dir="./runs", num_actors=2, epsilon=0.4, epsilon_alpha=7.,
+                 send_steps=50, weights_update=50, queue_size=64, replay_ratio=1., seed=None):
+        """ Actors run in processes with staggered epsilons and send transitions with priorities to the learner,
+        which train agent in this process and broadcast its weights in shared memory
+
+        :param environment: name of gym environment or gym.Env, copied in each actor
+        :param agent: DQN or DoubleDQN class or instance, class is created with PrioritizedReplay memory
+        :param log_dir:
+        :param num_actors: number of actor processes
+        :type num_actors: int
+        :param epsilon: epsilon of first actor
+        :type epsilon: float
+        :param epsilon_alpha: epsilon of actor i is epsilon ** (1 + i / (num_actors - 1) * epsilon_alpha)
+        :type epsilon_alpha: float
+        :param send_steps: number of transitions sent together by an actor
+        :type send_steps: int
+        :param weights_update: number of learner updates between two broadcasts of weights
+        :type weights_update: int
+        :param queue_size: maximum number of messages waiting for the learner, actors wait when it is reached
+        :type queue_size: int
+        :param replay_ratio: number of learner updates by step_train transitions received from actors
+        :type replay_ratio: float
+        :param seed: seed of exploration of first actor, actor i use seed + i
+        :type seed: int
+        """
+        for name, value in [("num_actors", num_actors), ("send_steps", send_steps),
+                            ("weights_update", weights_update), ("queue_size", queue_size)]:
+            if not isinstance(value, int) or value < 1:
+                raise ValueError(name + " need to be int >= 1 not " + str(value))
+        if not isinstance(replay_ratio, (int, float)) or replay_ratio <= 0:
+            raise ValueError("replay_ratio need to be number > 0 not " + str(replay_ratio))
+
+        self.environment = environment
+        env = self.get_environment(environment)
+        observation_space, action_space = env.observation_space, env.action_space
+
+        if isinstance(agent, type) and issubclass(agent, DQN) and not issubclass(agent, DRQN):
+            agent = agent(observation_space=observation_space, action_space=action_space,
+                          memory=PrioritizedReplay())
+        if not isinstance(agent, DQN) or isinstance(agent, DRQN):
+            raise TypeError("agent need to be DQN or DoubleDQN class or instance, not :" + str(agent))
+        self.agent = agent
+
+        self.num_actors = num_actors
+        self.epsilons = self.get_epsilons(num_actors, epsilon, epsilon_alpha)
+        self.send_steps = send_steps
+        self.weights_update = weights_update
+        self.queue_size = queue_size
+        self.replay_ratio = replay_ratio
+        self.seed = seed
+
+        self.logger = Logger(log_dir=log_dir)
+        self.steps_per_second = [0.] * num_actors
+
+    @staticmethod
+    def get_environment(arg_env):
+        """
+
+        :param arg_env: name of gym environment or gym.Env
+        """
+        if isinstance(arg_env, str):
+            return gym.make(arg_env)
+        if isinstance(arg_env, gym.Env):
+            return arg_env
+        raise ValueError("this env (" + str(arg_env) + ") is not supported")
+
+    @staticmethod
+    def get_epsilons(num_actors, epsilon=0.4, epsilon_alpha=7.):
+        """ Return epsilon of each actor, epsilon ** (1 + i / (num_actors - 1) * epsilon_alpha)
+
+        :param num_actors: number of actors
+        :type num_actors: int
+        :param epsilon: epsilon of first actor
+        :type epsilon: float
+        :param epsilon_alpha:
+        :type epsilon_alpha: float
+        """
+        if num_actors == 1:
+            return [epsilon]
+        return [epsilon ** (1 + i / (num_actors - 1) * epsilon_alpha) for i in range(num_actors)]
+
+    def broadcast(self, weights, version, lock):
+        """ Copy weights of agent in shared memory and increase version, actors load them on their next step
+
+        :param weights: weights in shared memory
+        :type weights: dict
+        :param version: number of broadcast of weights
+        :param lock: lock of weights
+        """
+        with lock:
+            for key, value in self.agent.state_dict().items():
+                weights[key].copy_(value)
+            version.value += 1
+
+    def train(self, max_episode=1000, progress_bar=True):
+        """ Train agent until actors have done max_episode episodes
+
+        Each episode of actors is logged like Trainer does, steps per second of each actor are logged as
+        Actor_<i>/steps_per_second and kept in self.steps_per_second. Each received transition give
+        replay_ratio / step_train updates to do, an update is done by loop while there is one to do and the update
+        budget is only used when agent is trained.
+
+        :param max_episode: number of episodes done by all actors
+        :type max_episode: int
+        :param progress_bar: show or not progress bar of training
+        :type progress_bar: bool
+        """
+        context = mp.get_context("spawn")
+        transitions = context.Queue(maxsize=self.queue_size)
+        version = context.Value("i", 0)
+        lock = context.Lock()
+        episodes = context.Value("i", 0)
+        weights = {key: value.detach().cpu().clone().share_memory_() for key, value in
+                   self.agent.state_dict().items()}
+
+        self.agent.enable_exploration()
+        policy = self.agent.get_policy()
+        actors = [context.Process(target=_run_actor, daemon=True, args=(
+            i, self.environment, policy, self.epsilons[i], None if self.seed is None else self.seed + i,
+            transitions, weights, version, lock, episodes, max_episode, self.send_steps))
+                  for i in range(self.num_actors)]
+        for actor in actors:
+            actor.start()
+
+        from tqdm.auto import tqdm
+
+        updates = 0
+        pending_updates = 0.
+        running = self.num_actors
+        try:
+            with tqdm(total=max_episode, disable=not progress_bar) as bar:
+                while running > 0:
+                    try:
+                        message = transitions.get_nowait() if pending_updates >= 1 and \
+                            self.agent.step >= self.agent.batch_size else transitions.get(timeout=0.1)
+                    except queue.Empty:
+                        message = None
+                        for i, actor in enumerate(actors):
+                            if actor.exitcode not in (None, 0):
+                                raise RuntimeError("actor " + str(i) + " failed with exit code " + str(
+                                    actor.exitcode))
+
+                    if message is not None:
+                        step = self.agent.step
+                        running -= self.do_message(message, bar)
+                        pending_updates += (self.agent.step - step) * self.replay_ratio / self.agent.step_train
+
+                    if pending_updates >= 1 and self.agent.update():
+                        pending_updates -= 1
+                        updates += 1
+                        if updates % self.weights_update == 0:
+                            self.broadcast(weights, version, lock)
+        finally:
+            for actor in actors:
+                actor.join(timeout=1)
+                if actor.is_alive():
+                    actor.terminate()
+
+    def do_message(self, message, bar=None):
+        """ Store transitions or log episode sent by an actor
+
+        :param message: (kind, actor_id, values, steps per second) send by an actor
+        :type message: tuple
+        :param bar: progress bar updated when an episode is done
+        :type bar: tqdm
+        :return: 1 if the actor is finished else 0
+        """
+        kind, actor_id, values, steps_per_second = message
+        if kind == "transitions":
+            self.agent.remember_batch(*values)
+            self.steps_per_second[actor_id] = steps_per_second
+            self.logger.summary_writer.add_scalar("Actor_" + str(actor_id) + "/steps_per_second",
+                                                  steps_per_second, global_step=self.agent.step)
+        elif kind == "episode":
+            for reward in values:
+                self.logger.add_steps(Record(reward))
+            self.logger.end_episode()
+            if bar is not None:
+                bar.update(1)
+                bar.set_postfix(steps_per_second=int(np.sum(self.steps_per_second)))
+        elif kind == "done":
+            return 1
+        return 0
+
+
+if __name__ == "__main__":
+    from blobrl.trainer import arg_to_agent
+
+    parser = ArgumentParser()
+    parser.add_argument('--agent', type=str, help='name of Agent', nargs='?', const=1, default="dqn")
+    parser.add_argument('--env', type=str, help='name of environment', nargs='?', const=1, default="CartPole-v1")
+    parser.add_argument('--max_episode', type=int, help='number of episode to train', nargs='?', const=1, default=100)
+    parser.add_argument('--num_actors', type=int, help='number of actor processes', nargs='?', const=1, default=2)
+    parser.add_argument('--replay_ratio', type=float, help='number of learner updates by step_train transitions',
+                        nargs='?', const=1, default=1.)
+    args = parser.parse_args()
+
+    trainer = DistributedTrainer(environment=args.env, agent=arg_to_agent(args.agent), num_actors=args.num_actors,
+                                 replay_ratio=args.replay_ratio)
+    trainer.train(max_episode=args.max_episode)
@@ -0,0 +1,119 @@
+import queue
+
+import gym
+import torch
+import torch.multiprocessing as mp
+
+from blobrl.logger import Record
+
+_worker = dict()
+
+
+def _init_worker(environment, policy):
+    """ Create environment and policy of worker process
+
+    :param environment: name of gym environment or gym.Env
+    :param policy: agent return by AgentInterface.get_policy
+    """
+    torch.set_num_threads(1)
+    _worker["environment"] = gym.make(environment) if isinstance(environment, str) else environment
+    _worker["policy"] = policy
+    policy.disable_exploration()
+
+
+def _evaluate_episode(state_dict):
+    """ Run one episode with weights state_dict and return its rewards
+
+    :param state_dict: weights of agent
+    :type state_dict: dict
+    """
+    environment, policy = _worker["environment"], _worker["policy"]
+    policy.load_state_dict(state_dict)
+
+    rewards = []
+    observation = environment.reset()
+    done = False
+    while not done:
+        observation, reward, done, info = environment.step(policy.get_action(observation))
+        rewards.append(float(reward))
+    policy.episode_finished()
+    return rewards
+
+
+class AsyncEvaluator:
+    def __init__(self, environment, agent, num_workers=2, num_episodes=2):
+        """ Evaluate snapshots of agent in a pool of worker processes while training continues
+
+        Each worker has its own environment and policy from agent.get_policy(), each evaluation send weights of
+        agent in shared memory and run num_episodes episodes in parallel.
+
+        :param environment: name of gym environment or gym.Env, copied in each worker
+        :param agent: agent to evaluate
+        :type agent: AgentInterface
+        :param num_workers: number of worker processes
+        :type num_workers: int
+        :param num_episodes: number of episodes by evaluation
+        :type num_episodes: int
+        """
+        if not isinstance(num_workers, int) or num_workers < 1:
+            raise ValueError("num_workers need to be int >= 1 not " + str(num_workers))
+        if not isinstance(num_episodes, int) or num_episodes < 1:
+            raise ValueError("num_episodes need to be int >= 1 not " + str(num_episodes))
+
+        self.num_workers = num_workers
+        self.num_episodes = num_episodes
+        self.pool = mp.get_context("spawn").Pool(num_workers, initializer=_init_worker,
+                                                  initargs=(environment, agent.get_policy()))
+        self.results = []
+        self.errors = []
+        self.finished = queue.Queue()
+
+    def submit(self, agent, logger, step):
+        """ Start evaluation of agent weights, each episode is logged with logger.add_evaluation by log_finished
+        or wait once it is done, so logger is only written by the thread of training
+
+        :param agent: agent to evaluate
+        :type agent: AgentInterface
+        :param logger: logger where evaluations are written
+        :type logger: Logger
+        :param step: number of episode when agent is evaluated
+        :type step: int
+        """
+        state_dict = {key: value.detach().cpu().clone().share_memory_() for key, value in agent.state_dict().items()}
+
+        def log(rewards):
+            self.finished.put((logger, rewards, step))
+
+        for _ in range(self.num_episodes):
+            self.results.append(self.pool.apply_async(_evaluate_episode, (state_dict,), callback=log,
+                                                      error_callback=self.errors.append))
+
+    def log_finished(self):
+        """ Log episodes of evaluations done since last call with logger.add_evaluation, in the calling thread
+        """
+        while True:
+            try:
+                logger, rewards, step = self.finished.get_nowait()
+            except queue.Empty:
+                return
+            logger.add_evaluation([Record(reward) for reward in rewards], step)
+
+    def wait(self):
+        """ Wait all evaluations are done and log them, raise first error of workers
+        """
+        for result in self.results:
+            result.wait()
+        self.results = []
+        self.log_finished()
+        if self.errors:
+            error, self.errors = self.errors[0], []
+            raise error
+
+    def close(self):
+        """ Wait evaluations and stop workers
+        """
+        try:
+            self.wait()
+        finally:
+            self.pool.close()
+            self.pool.join()
@@ -1,5 +1,25 @@
-from .greedy_exploration_interface import GreedyExplorationInterface
-from .not_greedy import NotGreedy
-from .greedy import Greedy
-from .epsilon_greedy import EpsilonGreedy
-from .adaptative_epsilon_greedy import AdaptativeEpsilonGreedy
+import importlib
+
+# module of each public name, imported only when the name is used
+_modules = {"GreedyExplorationInterface": ".greedy_exploration_interface", "NotGreedy": ".not_greedy",
+            "Greedy": ".greedy", "EpsilonGreedy": ".epsilon_greedy",
+            "AdaptativeEpsilonGreedy": ".adaptative_epsilon_greedy",
+            "PiecewiseEpsilonGreedy": ".piecewise_epsilon_greedy", "LinearEpsilonGreedy": ".linear_epsilon_greedy",
+            "NoisyExploration": ".noisy_exploration", "RunningMeanStd": ".running_mean_std",
+            "RandomNetworkDistillation": ".random_network_distillation",
+            "IntrinsicCuriosityModule": ".intrinsic_curiosity_module", "SimHashCount": ".sim_hash_count",
+            "Boltzmann": ".boltzmann"}
+
+__all__ = list(_modules)
+
+
+def __getattr__(name):
+    if name in _modules:
+        value = getattr(importlib.import_module(_modules[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module " + __name__ + " has no attribute " + name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,8 +3,8 @@ from blobrl.explorations import EpsilonGreedy
 
 class AdaptativeEpsilonGreedy(EpsilonGreedy):
 
-    def __init__(self, epsilon_max, epsilon_min, gamma=0.9999):
-        """ Create AdaptativeEpsilonGreedy
+    def __init__(self, epsilon_max, epsilon_min, gamma=0.9999, seed=None):
+        """ Create AdaptativeEpsilonGreedy, epsilon decrease exponentially with step
 
         :param epsilon_max: value for start exploration
         :type epsilon_min: float [0.0,1.0], epsilon_max>epsilon_min
@@ -12,20 +12,21 @@ class AdaptativeEpsilonGreedy(EpsilonGreedy):
         :type epsilon_min: float [0.0,1.0], epsilon_min<epsilon_max
         :param gamma: decrease factor for epsilon
         :type gamma: float [0.0,1.0]
+        :param seed: seed of random generator of this instance
+        :type seed: int
         """
-        super().__init__(epsilon_max)
+        super().__init__(epsilon_max, seed=seed)
         self.epsilon_max = epsilon_max
         self.epsilon_min = epsilon_min
         self.gamma = gamma
 
-    def be_greedy(self, step):
-        """ Return greedy
+    def get_epsilon(self, step):
+        """ Return max(epsilon_max * gamma ** step, epsilon_min)
 
         :param step: id of step
         :type step: int
         """
-        self.epsilon = max(self.epsilon * self.gamma, self.epsilon_min)
-        return super().be_greedy(step)
+        return max(self.epsilon_max * self.gamma ** step, self.epsilon_min)
 
     def __str__(self):
         return 'AdaptativeEpsilonGreedy-' + str(self.epsilon_max) + '-' + str(self.epsilon_min) + '-' + str(self.gamma)
@@ -0,0 +1,85 @@
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from blobrl.explorations import GreedyExplorationInterface
+
+
+class Boltzmann(GreedyExplorationInterface):
+
+    def __init__(self, steps=(0,), temperatures=(1.,)):
+        """ Create Boltzmann, actions are sampled from softmax(Q / T), temperature T is linearly interpolated
+        between (steps, temperatures) points and constant before first and after last point
+
+        :param steps: increasing steps of points
+        :type steps: list of int
+        :param temperatures: temperature at each step of steps
+        :type temperatures: list of float > 0
+        """
+        if len(steps) != len(temperatures) or len(steps) == 0:
+            raise ValueError("steps and temperatures need to have same not null length")
+        if np.any(np.diff(steps) < 0):
+            raise ValueError("steps need to be increasing not " + str(steps))
+        if np.any(np.asarray(temperatures) <= 0):
+            raise ValueError("temperatures need to be positive not " + str(temperatures))
+        self.steps = list(steps)
+        self.temperatures = list(temperatures)
+
+    def get_temperature(self, step):
+        """ Return temperature interpolated at step
+
+        :param step: id of step
+        :type step: int
+        """
+        return float(np.interp(step, self.steps, self.temperatures))
+
+    def be_greedy(self, step) -> bool:
+        """ Return True all time, actions are sampled from values of network in choose_actions
+
+        :param step: id of step
+        :type step: int
+        """
+        return True
+
+    def be_greedy_batch(self, step, n):
+        """ Return n True, actions are sampled from values of network in choose_actions
+
+        :param step: id of step
+        :type step: int
+        :param n: number of decisions
+        :type n: int
+        """
+        return np.ones(n, dtype=bool)
+
+    def choose_actions(self, step, values):
+        """ Return actions sampled from softmax(values / temperature), all heads are padded in one tensor and sampled
+        with one torch.multinomial
+
+        :param step: id of step
+        :type step: int
+        :param values: values of network, tensor of shape (batch, n) or (nested) list of them for MultiDiscrete
+        :type values: torch.Tensor, list
+        :return: tensor of shape (batch,) or (nested) list of them with same structure as values
+        """
+
+        def flat(v):
+            if isinstance(v, list):
+                return [head for sub_values in v for head in flat(sub_values)]
+            return [v]
+
+        heads = flat(values)
+        size = max(head.shape[1] for head in heads)
+        logits = torch.stack([F.pad(head, [0, size - head.shape[1]], value=-float("inf")) for head in heads], dim=1)
+
+        probabilities = (logits / self.get_temperature(step)).softmax(dim=-1)
+        actions = iter(torch.multinomial(probabilities.view(-1, size), 1).view(-1, len(heads)).unbind(dim=1))
+
+        def nest(v):
+            if isinstance(v, list):
+                return [nest(sub_values) for sub_values in v]
+            return next(actions)
+
+        return nest(values)
+
+    def __str__(self):
+        return 'Boltzmann-' + str(self.steps) + '-' + str(self.temperatures)
@@ -1,25 +1,46 @@
-from random import random
+import numpy as np
 
 from blobrl.explorations import GreedyExplorationInterface
 
 
 class EpsilonGreedy(GreedyExplorationInterface):
 
-    def __init__(self, epsilon):
+    def __init__(self, epsilon, seed=None):
         """ Create EpsilonGreedy
 
         :param epsilon: value for threshold greedy
         :type epsilon: float
+        :param seed: seed of random generator of this instance
+        :type seed: int
         """
         self.epsilon = epsilon
+        self.random_generator = np.random.default_rng(seed)
+
+    def get_epsilon(self, step):
+        """ Return epsilon at step
+
+        :param step: id of step
+        :type step: int
+        """
+        return self.epsilon
 
     def be_greedy(self, step):
-        """ Return True if random() > on self.epsilon
+        """ Return True if random() > on epsilon of step
+
+        :param step: id of step
+        :type step: int
+        """
+        return bool(self.random_generator.random() > self.get_epsilon(step))
+
+    def be_greedy_batch(self, step, n):
+        """ Return np.ndarray of n bool, True where random() > on epsilon of step
 
         :param step: id of step
         :type step: int
+        :param n: number of decisions
+        :type n: int
         """
-        return random() > self.epsilon
+        return self.random_generator.random(n) > self.get_epsilon(step)
 
     def __str__(self):
         return 'EpsilonGreedy-' + str(self.epsilon)
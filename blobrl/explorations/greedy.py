@@ -1,3 +1,5 @@
+import numpy as np
+
 from blobrl.explorations import GreedyExplorationInterface
 
 
@@ -11,5 +13,15 @@ class Greedy(GreedyExplorationInterface):
         """
         return True
 
+    def be_greedy_batch(self, step, n):
+        """ Return n True
+
+        :param step: id of step
+        :type step: int
+        :param n: number of decisions
+        :type n: int
+        """
+        return np.ones(n, dtype=bool)
+
     def __str__(self):
         return 'Greedy'
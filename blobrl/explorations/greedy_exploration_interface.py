@@ -1,17 +1,74 @@
 import abc
 
+import numpy as np
+
 
 class GreedyExplorationInterface(metaclass=abc.ABCMeta):
 
     @abc.abstractmethod
     def be_greedy(self, step) -> bool:
-        """ Return True or False if we need to explore or not
+        """ Return True or False if we need to explore or not, result only depend of step and random draws
 
         :param step: id of step
         :type step: int
         """
         pass
 
+    def be_greedy_batch(self, step, n):
+        """ Return np.ndarray of n bool, True where we don't need to explore
+
+        :param step: id of step
+        :type step: int
+        :param n: number of decisions, one by environment
+        :type n: int
+        """
+        return np.array([self.be_greedy(step) for _ in range(n)], dtype=bool)
+
+    def choose_actions(self, step, values):
+        """ Return actions chosen from values of network when agent is greedy, argmax of each head by default
+
+        :param step: id of step
+        :type step: int
+        :param values: values of network, tensor of shape (batch, n) or (nested) list of them for MultiDiscrete
+        :type values: torch.Tensor, list
+        :return: tensor of shape (batch,) or (nested) list of them with same structure as values
+        """
+        return greedy_actions(values)
+
+    def intrinsic_reward(self, observations, actions, next_observations):
+        """ Return intrinsic rewards of batch and loss to train exploration in the optimizer step of agent, None and
+        None if exploration don't give intrinsic rewards
+
+        :param observations: flatten observations sampled from memory
+        :type observations: torch.Tensor
+        :param actions: actions sampled from memory
+        :type actions: torch.Tensor
+        :param next_observations: flatten next observations sampled from memory
+        :type next_observations: torch.Tensor
+        """
+        return None, None
+
+    def count(self, next_observations):
+        """ Called once for each batch of transitions stored in memory, used by count based explorations, does nothing
+        by default
+
+        :param next_observations: flatten next observations stored in memory, list or np.ndarray of shape
+            (batch, ...)
+        """
+        pass
+
     @abc.abstractmethod
     def __str__(self):
         pass
+
+
+def greedy_actions(values):
+    """ Return argmax of each head of values
+
+    :param values: tensor of shape (batch, n) or (nested) list of them
+    :type values: torch.Tensor, list
+    :return: tensor of shape (batch,) or (nested) list of them with same structure as values
+    """
+    if isinstance(values, list):
+        return [greedy_actions(v) for v in values]
+    return values.argmax(dim=1)
@@ -0,0 +1,120 @@
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from gym.spaces import Discrete, MultiDiscrete
+
+from blobrl.explorations import GreedyExplorationInterface, EpsilonGreedy
+from blobrl.flattener import Flattener
+from blobrl.networks import get_index_sizes, get_last_layers, forward_last_layers
+
+
+class IntrinsicCuriosityModule(GreedyExplorationInterface, nn.Module):
+    """ from 'Curiosity-driven Exploration by Self-supervised Prediction' in https://arxiv.org/pdf/1705.05363.pdf
+
+    Intrinsic reward is the error of a forward model predicting features of next observation, features are trained
+    by an inverse model predicting the action. Modules are trained in the optimizer step of the agent.
+    """
+
+    def __init__(self, observation_space, action_space, greedy_exploration=None, coefficient=0.01, beta=0.2,
+                 linear_dim=64, feature_dim=64):
+        """
+
+        :param observation_space: space of observations
+        :type observation_space: gym.Space
+        :param action_space: space of actions
+        :type action_space: Discrete or MultiDiscrete
+        :param greedy_exploration: exploration to choose actions, default EpsilonGreedy(0.1)
+        :type greedy_exploration: GreedyExplorationInterface
+        :param coefficient: scale of intrinsic rewards
+        :type coefficient: float
+        :param beta: weight of forward loss against inverse loss
+        :type beta: float [0.0,1.0]
+        :param linear_dim: size of hidden layers
+        :type linear_dim: int
+        :param feature_dim: size of features of encoder
+        :type feature_dim: int
+        """
+        super().__init__()
+        if not isinstance(action_space, (Discrete, MultiDiscrete)):
+            raise TypeError(
+                "action_space need to be instance of Discrete or MultiDiscrete, not :" + str(type(action_space)))
+        if greedy_exploration is None:
+            greedy_exploration = EpsilonGreedy(0.1)
+        if not isinstance(greedy_exploration, GreedyExplorationInterface):
+            raise TypeError("greedy_exploration need to be instance of blobrls.explorations.GreedyExplorationInterface,"
+                            " not :" + str(type(greedy_exploration)))
+
+        self.observation_space = observation_space
+        self.action_space = action_space
+        self.greedy_exploration = greedy_exploration
+        self.coefficient = coefficient
+        self.beta = beta
+
+        sizes = get_index_sizes(action_space)
+        self.action_dim = sum(sizes)
+        self.register_buffer("offsets", torch.tensor([sum(sizes[:i]) for i in range(len(sizes))], dtype=torch.long))
+
+        self.encoder = nn.Sequential(nn.Linear(Flattener(observation_space).flatdim, linear_dim), nn.LeakyReLU(),
+                                     nn.Linear(linear_dim, feature_dim))
+        self.inverse_model = nn.Sequential(nn.Linear(2 * feature_dim, linear_dim), nn.LeakyReLU())
+        self.inverse_outputs = get_last_layers(action_space, linear_dim)
+        self.forward_model = nn.Sequential(nn.Linear(feature_dim + self.action_dim, linear_dim), nn.LeakyReLU(),
+                                           nn.Linear(linear_dim, feature_dim))
+
+    def be_greedy(self, step) -> bool:
+        """ Return be_greedy of greedy_exploration
+
+        :param step: id of step
+        :type step: int
+        """
+        return self.greedy_exploration.be_greedy(step)
+
+    def be_greedy_batch(self, step, n):
+        """ Return be_greedy_batch of greedy_exploration
+
+        :param step: id of step
+        :type step: int
+        :param n: number of decisions
+        :type n: int
+        """
+        return self.greedy_exploration.be_greedy_batch(step, n)
+
+    def intrinsic_reward(self, observations, actions, next_observations):
+        """ Return coefficient * forward error and (1 - beta) * inverse loss + beta * forward loss
+
+        Encoder is run once on observations and next observations concatenated.
+
+        :param observations: flatten observations sampled from memory
+        :type observations: torch.Tensor
+        :param actions: actions sampled from memory
+        :type actions: torch.Tensor
+        :param next_observations: flatten next observations sampled from memory
+        :type next_observations: torch.Tensor
+        """
+        batch_size = observations.shape[0]
+        x = torch.cat([observations.view(batch_size, -1), next_observations.view(batch_size, -1)]).float()
+        features, next_features = self.encoder(x).split(batch_size)
+
+        # index of each discrete action in (batch, number of discrete actions)
+        actions = actions.view(batch_size, -1).long()
+
+        logits = forward_last_layers(self.inverse_outputs, self.inverse_model(torch.cat([features, next_features], 1)))
+
+        def flat(values):
+            if isinstance(values, list):
+                return [v for value in values for v in flat(value)]
+            return [values]
+
+        inverse_loss = sum(F.cross_entropy(logit, actions[:, i]) for i, logit in enumerate(flat(logits)))
+
+        actions_one_hot = F.one_hot(actions + self.offsets, self.action_dim).sum(1).float()
+        predicted_features = self.forward_model(torch.cat([features, actions_one_hot], 1))
+        forward_error = 0.5 * (predicted_features - next_features.detach()).pow(2).sum(1)
+
+        loss = (1 - self.beta) * inverse_loss + self.beta * forward_error.mean()
+
+        return self.coefficient * forward_error.detach(), loss
+
+    def __str__(self):
+        return 'IntrinsicCuriosityModule-' + str(self.greedy_exploration) + '-' + str(self.coefficient) + '-' + str(
+            self.beta)
@@ -0,0 +1,25 @@
+from blobrl.explorations import PiecewiseEpsilonGreedy
+
+
+class LinearEpsilonGreedy(PiecewiseEpsilonGreedy):
+
+    def __init__(self, epsilon_max, epsilon_min, step_max, seed=None):
+        """ Create LinearEpsilonGreedy, epsilon decrease linearly from epsilon_max at step 0 to epsilon_min at
+        step_max
+
+        :param epsilon_max: value for start exploration
+        :type epsilon_max: float [0.0,1.0]
+        :param epsilon_min: min value exploration
+        :type epsilon_min: float [0.0,1.0]
+        :param step_max: step where epsilon reach epsilon_min
+        :type step_max: int
+        :param seed: seed of random generator of this instance
+        :type seed: int
+        """
+        super().__init__([0, step_max], [epsilon_max, epsilon_min], seed=seed)
+        self.epsilon_max = epsilon_max
+        self.epsilon_min = epsilon_min
+        self.step_max = step_max
+
+    def __str__(self):
+        return 'LinearEpsilonGreedy-' + str(self.epsilon_max) + '-' + str(self.epsilon_min) + '-' + str(self.step_max)
@@ -0,0 +1,31 @@
+import numpy as np
+
+from blobrl.explorations import GreedyExplorationInterface
+
+
+class NoisyExploration(GreedyExplorationInterface):
+    """ from 'Noisy Networks for Exploration' in https://arxiv.org/pdf/1706.10295.pdf
+
+    Exploration come from NoisyLinear layers of the network, so agent is always greedy on noisy values.
+    """
+
+    def be_greedy(self, step) -> bool:
+        """ Return True all time, noise of network explore
+
+        :param step: id of step
+        :type step: int
+        """
+        return True
+
+    def be_greedy_batch(self, step, n):
+        """ Return n True, noise of network explore
+
+        :param step: id of step
+        :type step: int
+        :param n: number of decisions
+        :type n: int
+        """
+        return np.ones(n, dtype=bool)
+
+    def __str__(self):
+        return 'NoisyExploration'
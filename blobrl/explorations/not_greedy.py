@@ -1,3 +1,5 @@
+import numpy as np
+
 from blobrl.explorations import GreedyExplorationInterface
 
 
@@ -11,5 +13,15 @@ class NotGreedy(GreedyExplorationInterface):
         """
         return False
 
+    def be_greedy_batch(self, step, n):
+        """ Return n False
+
+        :param step: id of step
+        :type step: int
+        :param n: number of decisions
+        :type n: int
+        """
+        return np.zeros(n, dtype=bool)
+
     def __str__(self):
         return 'NotGreedy'
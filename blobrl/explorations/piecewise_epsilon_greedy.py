@@ -0,0 +1,36 @@
+import numpy as np
+
+from blobrl.explorations import EpsilonGreedy
+
+
+class PiecewiseEpsilonGreedy(EpsilonGreedy):
+
+    def __init__(self, steps, epsilons, seed=None):
+        """ Create PiecewiseEpsilonGreedy, epsilon is linearly interpolated between (steps, epsilons) points and
+        constant before first and after last point
+
+        :param steps: increasing steps of points
+        :type steps: list of int
+        :param epsilons: epsilon at each step of steps
+        :type epsilons: list of float [0.0,1.0]
+        :param seed: seed of random generator of this instance
+        :type seed: int
+        """
+        if len(steps) != len(epsilons) or len(steps) == 0:
+            raise ValueError("steps and epsilons need to have same not null length")
+        if np.any(np.diff(steps) < 0):
+            raise ValueError("steps need to be increasing not " + str(steps))
+        super().__init__(epsilons[0], seed=seed)
+        self.steps = list(steps)
+        self.epsilons = list(epsilons)
+
+    def get_epsilon(self, step):
+        """ Return epsilon interpolated at step
+
+        :param step: id of step
+        :type step: int
+        """
+        return float(np.interp(step, self.steps, self.epsilons))
+
+    def __str__(self):
+        return 'PiecewiseEpsilonGreedy-' + str(self.steps) + '-' + str(self.epsilons)
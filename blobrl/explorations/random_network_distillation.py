@@ -0,0 +1,98 @@
+import torch
+import torch.nn as nn
+
+from blobrl.explorations import GreedyExplorationInterface, EpsilonGreedy
+from blobrl.explorations.running_mean_std import RunningMeanStd
+from blobrl.flattener import Flattener
+
+
+class RandomNetworkDistillation(GreedyExplorationInterface, nn.Module):
+    """ from 'Exploration by Random Network Distillation' in https://arxiv.org/pdf/1810.12894.pdf
+
+    Intrinsic reward is the error of a trained predictor on features of a frozen random target network, the
+    predictor is trained in the optimizer step of the agent.
+    """
+
+    def __init__(self, observation_space, greedy_exploration=None, coefficient=1.0, linear_dim=64, feature_dim=64):
+        """
+
+        :param observation_space: space of observations
+        :type observation_space: gym.Space
+        :param greedy_exploration: exploration to choose actions, default EpsilonGreedy(0.1)
+        :type greedy_exploration: GreedyExplorationInterface
+        :param coefficient: scale of intrinsic rewards
+        :type coefficient: float
+        :param linear_dim: size of hidden layer of target and predictor
+        :type linear_dim: int
+        :param feature_dim: size of features of target and predictor
+        :type feature_dim: int
+        """
+        super().__init__()
+        if greedy_exploration is None:
+            greedy_exploration = EpsilonGreedy(0.1)
+        if not isinstance(greedy_exploration, GreedyExplorationInterface):
+            raise TypeError("greedy_exploration need to be instance of blobrls.explorations.GreedyExplorationInterface,"
+                            " not :" + str(type(greedy_exploration)))
+
+        self.observation_space = observation_space
+        self.greedy_exploration = greedy_exploration
+        self.coefficient = coefficient
+
+        input_dim = Flattener(observation_space).flatdim
+
+        def gen_network():
+            return nn.Sequential(nn.Linear(input_dim, linear_dim), nn.LeakyReLU(), nn.Linear(linear_dim, feature_dim))
+
+        self.target = gen_network()
+        for parameter in self.target.parameters():
+            parameter.requires_grad_(False)
+        self.predictor = gen_network()
+
+        self.observation_normalizer = RunningMeanStd((input_dim,))
+        self.reward_normalizer = RunningMeanStd()
+
+    def be_greedy(self, step) -> bool:
+        """ Return be_greedy of greedy_exploration
+
+        :param step: id of step
+        :type step: int
+        """
+        return self.greedy_exploration.be_greedy(step)
+
+    def be_greedy_batch(self, step, n):
+        """ Return be_greedy_batch of greedy_exploration
+
+        :param step: id of step
+        :type step: int
+        :param n: number of decisions
+        :type n: int
+        """
+        return self.greedy_exploration.be_greedy_batch(step, n)
+
+    def intrinsic_reward(self, observations, actions, next_observations):
+        """ Return coefficient * error / std(error) on next observations and mean error to train predictor
+
+        :param observations: flatten observations sampled from memory
+        :type observations: torch.Tensor
+        :param actions: actions sampled from memory
+        :type actions: torch.Tensor
+        :param next_observations: flatten next observations sampled from memory
+        :type next_observations: torch.Tensor
+        """
+        x = next_observations.view(next_observations.shape[0], -1).float()
+
+        with torch.no_grad():
+            self.observation_normalizer.update(x)
+            x = self.observation_normalizer.normalize(x, clip=5.)
+            target = self.target(x)
+
+        error = (self.predictor(x) - target).pow(2).mean(dim=1)
+
+        with torch.no_grad():
+            self.reward_normalizer.update(error)
+            rewards = self.coefficient * error / (self.reward_normalizer.var.sqrt() + 1e-8)
+
+        return rewards, error.mean()
+
+    def __str__(self):
+        return 'RandomNetworkDistillation-' + str(self.greedy_exploration) + '-' + str(self.coefficient)
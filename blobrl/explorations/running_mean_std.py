@@ -0,0 +1,48 @@
+import torch
+import torch.nn as nn
+
+
+class RunningMeanStd(nn.Module):
+    def __init__(self, shape=(), epsilon=1e-4):
+        """ Running mean and variance of values, updated with whole batches
+
+        :param shape: shape of one value
+        :type shape: tuple
+        :param epsilon: initial count, avoid division by zero
+        :type epsilon: float
+        """
+        super().__init__()
+        self.register_buffer("mean", torch.zeros(shape))
+        self.register_buffer("var", torch.ones(shape))
+        self.register_buffer("count", torch.tensor(epsilon))
+
+    def update(self, values):
+        """ Merge mean and variance of batch in running statistics
+
+        :param values: tensor of shape (batch, *shape)
+        :type values: torch.Tensor
+        """
+        batch_mean = values.mean(dim=0)
+        batch_var = values.var(dim=0, unbiased=False)
+        batch_count = values.shape[0]
+
+        delta = batch_mean - self.mean
+        total = self.count + batch_count
+
+        self.mean += delta * batch_count / total
+        self.var.copy_((self.var * self.count + batch_var * batch_count + delta ** 2 * self.count * batch_count / total)
+                       / total)
+        self.count.fill_(total)
+
+    def normalize(self, values, clip=None):
+        """ Return (values - mean) / std, clipped in [-clip, clip] if clip is not None
+
+        :param values:
+        :type values: torch.Tensor
+        :param clip: bound of normalized values
+        :type clip: float
+        """
+        values = (values - self.mean) / (self.var.sqrt() + 1e-8)
+        if clip is not None:
+            values = values.clamp(-clip, clip)
+        return values
@@ -0,0 +1,120 @@
+import numpy as np
+import torch
+
+from blobrl.explorations import GreedyExplorationInterface, EpsilonGreedy
+from blobrl.flattener import Flattener
+
+
+class SimHashCount(GreedyExplorationInterface):
+    """ from '#Exploration: A Study of Count-Based Exploration for Deep Reinforcement Learning' in
+    https://arxiv.org/pdf/1611.04717.pdf
+
+    Observations are hashed by the sign of a fixed random projection, counts are kept in a table of
+    2 ** table_bits values so memory is bounded, different hashes can share a count.
+    """
+
+    def __init__(self, observation_space, greedy_exploration=None, beta=0.01, hash_bits=32, table_bits=20, seed=None):
+        """
+
+        :param observation_space: space of observations
+        :type observation_space: gym.Space
+        :param greedy_exploration: exploration to choose actions, default EpsilonGreedy(0.1)
+        :type greedy_exploration: GreedyExplorationInterface
+        :param beta: scale of intrinsic rewards beta / sqrt(n)
+        :type beta: float
+        :param hash_bits: number of bits of SimHash
+        :type hash_bits: int [1, 62]
+        :param table_bits: log2 of size of count table
+        :type table_bits: int [1, 32]
+        :param seed: seed of random projection
+        :type seed: int
+        """
+        if greedy_exploration is None:
+            greedy_exploration = EpsilonGreedy(0.1)
+        if not isinstance(greedy_exploration, GreedyExplorationInterface):
+            raise TypeError("greedy_exploration need to be instance of blobrls.explorations.GreedyExplorationInterface,"
+                            " not :" + str(type(greedy_exploration)))
+        if not 1 <= hash_bits <= 62:
+            raise ValueError("hash_bits need to be in [1, 62] not " + str(hash_bits))
+        if not 1 <= table_bits <= 32:
+            raise ValueError("table_bits need to be in [1, 32] not " + str(table_bits))
+
+        self.observation_space = observation_space
+        self.greedy_exploration = greedy_exploration
+        self.beta = beta
+        self.hash_bits = hash_bits
+        self.table_bits = table_bits
+
+        flatdim = Flattener(observation_space).flatdim
+        self.projection = np.random.default_rng(seed).standard_normal((flatdim, hash_bits)).astype(np.float32)
+        self.powers = np.left_shift(np.int64(1), np.arange(hash_bits, dtype=np.int64))
+        self.counts = np.zeros(2 ** table_bits, dtype=np.int64)
+
+    def be_greedy(self, step) -> bool:
+        """ Return be_greedy of greedy_exploration
+
+        :param step: id of step
+        :type step: int
+        """
+        return self.greedy_exploration.be_greedy(step)
+
+    def be_greedy_batch(self, step, n):
+        """ Return be_greedy_batch of greedy_exploration
+
+        :param step: id of step
+        :type step: int
+        :param n: number of decisions
+        :type n: int
+        """
+        return self.greedy_exploration.be_greedy_batch(step, n)
+
+    def get_index(self, observations):
+        """ Return index in count table of each flatten observation
+
+        :param observations: flatten observations of shape (batch, flatdim)
+        :type observations: np.ndarray
+        """
+        codes = ((observations @ self.projection) > 0) @ self.powers
+        # multiplicative hashing, high bits of code * golden ratio are spread over the table
+        with np.errstate(over="ignore"):
+            return (codes.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(64 - self.table_bits)
+
+    def update(self, observations):
+        """ Count observations and return count of each observation after update
+
+        :param observations: flatten observations of shape (batch, flatdim)
+        :type observations: np.ndarray
+        """
+        index = self.get_index(observations)
+        unique, inverse, counts = np.unique(index, return_inverse=True, return_counts=True)
+        self.counts[unique] += counts
+        return self.counts[unique][inverse.reshape(-1)]
+
+    def count(self, next_observations):
+        """ Count next observations of transitions stored in memory, so each visited state is counted once
+
+        :param next_observations: flatten next observations stored in memory, list or np.ndarray of shape
+            (batch, ...)
+        """
+        x = np.asarray(next_observations, dtype=np.float32)
+        self.update(x.reshape(x.shape[0], -1))
+
+    def intrinsic_reward(self, observations, actions, next_observations):
+        """ Return beta / sqrt(n) where n is count of next observations stored in memory, no loss, counts are not
+        changed so sampling a transition many times don't reduce its reward
+
+        :param observations: flatten observations sampled from memory
+        :type observations: torch.Tensor
+        :param actions: actions sampled from memory
+        :type actions: torch.Tensor
+        :param next_observations: flatten next observations sampled from memory
+        :type next_observations: torch.Tensor
+        """
+        x = next_observations.reshape(next_observations.shape[0], -1).float().cpu().numpy()
+        counts = np.maximum(self.counts[self.get_index(x)], 1)
+        rewards = torch.as_tensor(self.beta / np.sqrt(counts), dtype=torch.float32, device=next_observations.device)
+        return rewards, None
+
+    def __str__(self):
+        return 'SimHashCount-' + str(self.greedy_exploration) + '-' + str(self.beta) + '-' + str(
+            self.hash_bits) + '-' + str(self.table_bits)
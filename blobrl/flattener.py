@@ -0,0 +1,146 @@
+from collections import OrderedDict
+
+import numpy as np
+from gym.spaces import Box, Discrete, MultiDiscrete, MultiBinary, Tuple, Dict
+
+
+class Flattener:
+    def __init__(self, space, one_hot=True, dtype=None):
+        """ Compile space once in a flat layout table, then flatten observations of this space without walking
+        the space again
+
+        Values are in the same order as gym.spaces.flatten.
+
+        :param space: space of observations
+        :type space: gym.Space
+        :param one_hot: if Discrete values are one hot encoded, else they are written as index
+        :type one_hot: bool
+        :param dtype: dtype of flatten observations, default is dtype of all values if they share one else float32
+        :type dtype: np.dtype
+        """
+        self.space = space
+        self.one_hot = one_hot
+        self.layout = []
+
+        self.flatdim = self._compile(space, (), 0)
+
+        if dtype is None:
+            dtypes = set(np.dtype(leaf_dtype) for _, _, _, _, leaf_dtype in self.layout)
+            dtype = dtypes.pop() if len(dtypes) == 1 else np.float32
+        self.dtype = np.dtype(dtype)
+
+    def _compile(self, space, path, offset):
+        """ Add leaves of space in layout as (path, offset, size, one hot size, dtype)
+
+        :param space:
+        :param path: keys to get value of space in observation
+        :type path: tuple
+        :param offset: offset of space in flatten observation
+        :type offset: int
+        :return: offset after space
+        """
+        if isinstance(space, Tuple):
+            for i, s in enumerate(space.spaces):
+                offset = self._compile(s, path + (i,), offset)
+            return offset
+        if isinstance(space, Dict):
+            for key, s in space.spaces.items():
+                offset = self._compile(s, path + (key,), offset)
+            return offset
+
+        if isinstance(space, Discrete):
+            if self.one_hot:
+                self.layout.append((path, offset, int(space.n), int(space.n), np.float32))
+                return offset + int(space.n)
+            self.layout.append((path, offset, 1, 0, np.int32))
+            return offset + 1
+        if isinstance(space, MultiDiscrete):
+            size = int(np.prod(space.shape))
+            self.layout.append((path, offset, size, 0, space.dtype if self.one_hot else np.int32))
+            return offset + size
+        if isinstance(space, (Box, MultiBinary)):
+            size = int(np.prod(space.shape))
+            self.layout.append((path, offset, size, 0, space.dtype))
+            return offset + size
+
+        raise NotImplementedError("space not supported by Flattener: " + str(space))
+
+    @staticmethod
+    def _get(x, path):
+        for key in path:
+            x = x[key]
+        return x
+
+    def flatten(self, x, out=None):
+        """ Flatten one observation
+
+        :param x: observation of space
+        :param out: buffer of shape (flatdim,) where flatten observation is written, a new one is created if None
+        :type out: np.ndarray
+        :return: out
+        """
+        if out is None:
+            out = np.empty(self.flatdim, dtype=self.dtype)
+
+        for path, offset, size, one_hot, _ in self.layout:
+            value = self._get(x, path)
+            if one_hot:
+                out[offset:offset + size] = 0
+                out[offset + int(value)] = 1
+            else:
+                out[offset:offset + size] = np.ravel(value)
+        return out
+
+    def flatten_batch(self, observations, out=None):
+        """ Flatten many observations, each value of layout is written for all observations at once
+
+        :param observations: list of observations, or observations batched like gym.vector does (array, or
+            tuple/dict of arrays with batch as first dim)
+        :param out: buffer of shape (batch, flatdim) where flatten observations are written, a new one is created if
+            None
+        :type out: np.ndarray
+        :return: out
+        """
+        per_observation = isinstance(observations, list)
+        if per_observation:
+            n = len(observations)
+        else:
+            n = len(self._get(observations, self.layout[0][0]))
+
+        if out is None:
+            out = np.empty((n, self.flatdim), dtype=self.dtype)
+
+        rows = np.arange(n)
+        for path, offset, size, one_hot, _ in self.layout:
+            if per_observation:
+                values = np.asarray([self._get(x, path) for x in observations])
+            else:
+                values = np.asarray(self._get(observations, path))
+            if one_hot:
+                out[:, offset:offset + size] = 0
+                out[rows, offset + values.reshape(n).astype(np.int64)] = 1
+            else:
+                out[:, offset:offset + size] = values.reshape(n, size)
+        return out
+
+    def __str__(self):
+        return 'Flattener-' + str(self.space) + '-' + str(self.one_hot) + '-' + str(self.dtype)
+
+
+def split_batch(space, observations):
+    """ Return list of observations from observations batched like gym.vector does, list is returned as it is
+
+    :param space: space of one observation
+    :type space: gym.Space
+    :param observations: array, or tuple/dict of arrays with batch as first dim
+    :return: list of observations
+    """
+    if isinstance(observations, list):
+        return observations
+    if isinstance(space, Tuple):
+        return [tuple(values) for values in zip(*[split_batch(s, o) for s, o in zip(space.spaces, observations)])]
+    if isinstance(space, Dict):
+        keys = list(space.spaces.keys())
+        return [OrderedDict(zip(keys, values)) for values in
+                zip(*[split_batch(space.spaces[key], observations[key]) for key in keys])]
+    return list(observations)
@@ -1,13 +1,19 @@
-from torch.utils.tensorboard import SummaryWriter
+import numbers
+
+import numpy as np
 
 
 class Record:
+    __slots__ = ("value",)
+
     def __init__(self, value):
         """
 
-        :param value:
+        :param value: int, float or numpy scalar, numpy scalars are kept as python number
         """
-        if not isinstance(value, (int, float)):
+        if isinstance(value, (np.integer, np.floating)):
+            value = value.item()
+        if not isinstance(value, numbers.Real):
             raise TypeError("value must be int or float not " + str(type(value)))
         self.value = value
 
@@ -18,14 +24,7 @@ class Record:
         :param records:
         :return:
         """
-        if not isinstance(records, list):
-            raise TypeError("records must be a list not " + str(records))
-        if not records:
-            return 0.0
-        try:
-            return sum([record.value for record in records]) / len(records)
-        except AttributeError:
-            raise TypeError("records must a list of Record")
+        return Statistics.from_records(records).avg()
 
     @classmethod
     def max_records(cls, records):
@@ -34,14 +33,7 @@ class Record:
         :param records:
         :return:
         """
-        if not isinstance(records, list):
-            raise TypeError("records must be a list not " + str(records))
-        if not records:
-            return 0.0
-        try:
-            return max([record.value for record in records])
-        except AttributeError:
-            raise TypeError("records must a list of Record")
+        return Statistics.from_records(records).max
 
     @classmethod
     def min_records(cls, records):
@@ -50,14 +42,7 @@ class Record:
         :param records:
         :return:
         """
-        if not isinstance(records, list):
-            raise TypeError("records must be a list not " + str(records))
-        if not records:
-            return 0.0
-        try:
-            return min([record.value for record in records])
-        except AttributeError:
-            raise TypeError("records must a list of Record")
+        return Statistics.from_records(records).min
 
     @classmethod
     def sum_records(cls, records):
@@ -66,71 +51,246 @@ class Record:
         :param records:
         :return:
         """
+        return Statistics.from_records(records).sum
+
+
+class Statistics:
+    __slots__ = ("count", "sum", "min", "max", "mean", "m2")
+
+    def __init__(self, count=0, sum=0, min=0., max=0., mean=0., m2=0.):
+        """ Count, sum, min, max and variance of values of an episode updated in O(1) memory, variance with Welford
+        algorithm, min, max and avg are 0.0 when there is no value like Record methods
+
+        :param count: number of values
+        :type count: int
+        :param sum: sum of values
+        :param min: minimum value
+        :param max: maximum value
+        :param mean: mean of values
+        :param m2: sum of squared differences from mean
+        """
+        self.count = count
+        self.sum = sum
+        self.min = min
+        self.max = max
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value):
+        """ Add one value
+
+        :param value:
+        :type value: int, float
+        """
+        if self.count == 0:
+            self.min = value
+            self.max = value
+        elif value < self.min:
+            self.min = value
+        elif value > self.max:
+            self.max = value
+        self.count += 1
+        self.sum += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def avg(self):
+        """ Return mean of values, 0.0 if there is no value
+        """
+        return self.sum / self.count if self.count else 0.0
+
+    def var(self):
+        """ Return population variance of values, 0.0 if there is no value
+        """
+        return self.m2 / self.count if self.count else 0.0
+
+    def std(self):
+        """ Return population standard deviation of values
+        """
+        return self.var() ** 0.5
+
+    @classmethod
+    def from_records(cls, records):
+        """ Return statistics of values of records in one pass
+
+        :param records: list of Record
+        :type records: list
+        """
+        if isinstance(records, Statistics):
+            return records
         if not isinstance(records, list):
             raise TypeError("records must be a list not " + str(records))
-        if not records:
-            return 0.0
+        statistics = cls()
         try:
-            return sum([record.value for record in records])
+            for record in records:
+                statistics.add(record.value)
         except AttributeError:
             raise TypeError("records must a list of Record")
+        return statistics
 
+    def __len__(self):
+        return self.count
 
-class Logger:
-    def __init__(self, log_dir="./runs"):
+    def __eq__(self, other):
+        return isinstance(other, Statistics) and all(getattr(self, key) == getattr(other, key) for key in
+                                                     self.__slots__)
+
+    def __str__(self):
+        return 'Statistics-' + str(self.count) + '-' + str(self.sum) + '-' + str(self.min) + '-' + str(
+            self.max) + '-' + str(self.avg()) + '-' + str(self.std())
+
+
+class EpisodeHistory:
+    fields = ["count", "sum", "min", "max", "mean", "m2"]
+
+    def __init__(self, max_size=100000):
+        """ Statistics of the last max_size episodes kept in numpy arrays, oldest episodes are replaced when it is
+        full
+
+        :param max_size: maximum number of episodes kept
+        :type max_size: int
+        """
+        if not isinstance(max_size, int) or max_size < 1:
+            raise ValueError("max_size need to be int >= 1 not " + str(max_size))
+        self.max_size = max_size
+        self.arrays = {field: np.empty(min(1024, max_size), dtype=np.int64 if field == "count" else np.float64)
+                       for field in self.fields}
+        self.size = 0
+        self.start = 0
+
+    def append(self, statistics):
+        """ Add statistics of one episode
+
+        :param statistics: statistics of episode, or list of Record
+        :type statistics: Statistics
+        """
+        statistics = Statistics.from_records(statistics)
+        capacity = len(self.arrays["count"])
+        if self.size == capacity and capacity < self.max_size:
+            capacity = min(capacity * 2, self.max_size)
+            for field, array in self.arrays.items():
+                self.arrays[field] = np.resize(array, capacity)
+        if self.size < capacity:
+            index = self.size
+            self.size += 1
+        else:
+            index = self.start
+            self.start = (self.start + 1) % capacity
+        for field in self.fields:
+            self.arrays[field][index] = getattr(statistics, field)
+
+    def get(self, field):
+        """ Return array of field of kept episodes, from oldest to newest
+
+        :param field: one of count, sum, min, max, mean, m2
+        :type field: str
         """
+        array = self.arrays[field][:self.size]
+        return np.concatenate((array[self.start:], array[:self.start]))
+
+    @property
+    def sums(self):
+        return self.get("sum")
+
+    @property
+    def counts(self):
+        return self.get("count")
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, item):
+        if not isinstance(item, (int, np.integer)):
+            raise TypeError("item need to be int not " + str(type(item)))
+        if item < -self.size or item >= self.size:
+            raise IndexError("episode index out of range: " + str(item))
+        index = (self.start + item % self.size) % len(self.arrays["count"])
+        return Statistics(*[self.arrays[field][index].item() for field in self.fields])
+
+    def __iter__(self):
+        return (self[i] for i in range(self.size))
+
+
+class Logger:
+    def __init__(self, log_dir="./runs", start_episode=0, max_history=100000):
+        """ Log rewards of episodes in TensorBoard, only statistics of current episode and of the last max_history
+        episodes are kept
 
         :param log_dir:
+        :param start_episode: number of episodes already logged in log_dir, when training continue from a checkpoint
+        :type start_episode: int
+        :param max_history: maximum number of episodes kept in episodes
+        :type max_history: int
         """
         self.log_dir = log_dir
-        self.current_steps = []
-        self.episodes = []
+        self.start_episode = start_episode
+        self.current = Statistics()
+        self.episodes = EpisodeHistory(max_size=max_history)
+        self.num_episodes = 0
+        self.evaluations = []
+        from torch.utils.tensorboard import SummaryWriter
+
         self.summary_writer = SummaryWriter(self.log_dir)
 
     def add_steps(self, steps):
         """
 
-        :param steps:
+        :param steps: reward of step
+        :type steps: Record, int, float
         """
-        self.current_steps.append(steps)
+        self.current.add(steps.value if isinstance(steps, Record) else Record(steps).value)
 
     def add_episode(self, episode):
         """
 
-        :param episode:
+        :param episode: statistics of episode or list of Record
+        :type episode: Statistics, list
         """
         self.episodes.append(episode)
+        self.num_episodes += 1
 
     def end_episode(self):
         """
 
         """
-        self.log_episode(self.summary_writer, self.current_steps, len(self.episodes))
-        self.episodes.append(self.current_steps)
-        self.current_steps = []
+        self.log_episode(self.summary_writer, self.current, self.start_episode + self.num_episodes)
+        self.add_episode(self.current)
+        self.current = Statistics()
 
     def evaluate(self):
+        """ Log current steps as evaluation episode, sum of its rewards is kept in evaluations
+
         """
+        self.add_evaluation(self.current, self.start_episode + self.num_episodes)
+        self.current = Statistics()
+
+    def add_evaluation(self, steps, step):
+        """ Log evaluation episode given by its steps, without current steps of training, sum of its rewards is kept
+        in evaluations
 
+        :param steps: list of Record or statistics of evaluation episode
+        :type steps: list, Statistics
+        :param step: number of episode when agent is evaluated
+        :type step: int
         """
-        self.log_episode(self.summary_writer, self.current_steps, len(self.episodes), tag="Evaluate/Reward")
-        self.write_log(self.log_dir, self.current_steps, len(self.episodes))
-        self.current_steps = []
+        steps = Statistics.from_records(steps)
+        self.log_episode(self.summary_writer, steps, step, tag="Evaluate/Reward")
+        self.write_log(self.log_dir, steps, step)
+        self.evaluations.append(steps.sum)
 
     @staticmethod
     def write_log(log_dir, episode, step):
         """
 
         :param log_dir:
-        :param episode:
+        :param episode: list of Record or statistics of episode
         :param step:
         """
+        episode = Statistics.from_records(episode)
         with open(log_dir + "/log.txt", "a+") as file:
-            max = Record.max_records(episode)
-            min = Record.min_records(episode)
-            avg = Record.avg_records(episode)
-            sum = Record.sum_records(episode)
-            file.writelines(str(step) + "," + str(max) + "," + str(min) + "," + str(avg) + "," + str(sum) + "\n")
+            file.writelines(str(step) + "," + str(episode.max) + "," + str(episode.min) + "," + str(
+                episode.avg()) + "," + str(episode.sum) + "\n")
 
     @staticmethod
     def log_episode(summary_writer, episode, step, tag="Reward"):
@@ -138,10 +298,11 @@ class Logger:
 
         :param tag:
         :param summary_writer:
-        :param episode:
+        :param episode: list of Record or statistics of episode
         :param step:
         """
-        summary_writer.add_scalar(tag=tag + "/max", scalar_value=Record.max_records(episode), global_step=step)
-        summary_writer.add_scalar(tag=tag + "/min", scalar_value=Record.min_records(episode), global_step=step)
-        summary_writer.add_scalar(tag=tag + "/avg", scalar_value=Record.avg_records(episode), global_step=step)
-        summary_writer.add_scalar(tag=tag + "/sum", scalar_value=Record.sum_records(episode), global_step=step)
+        episode = Statistics.from_records(episode)
+        summary_writer.add_scalar(tag=tag + "/max", scalar_value=episode.max, global_step=step)
+        summary_writer.add_scalar(tag=tag + "/min", scalar_value=episode.min, global_step=step)
+        summary_writer.add_scalar(tag=tag + "/avg", scalar_value=episode.avg(), global_step=step)
+        summary_writer.add_scalar(tag=tag + "/sum", scalar_value=episode.sum, global_step=step)
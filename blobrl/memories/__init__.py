@@ -1,2 +1,19 @@
-from .memory_interface import MemoryInterface
-from .experience_replay import ExperienceReplay
+import importlib
+
+# module of each public name, imported only when the name is used
+_modules = {"MemoryInterface": ".memory_interface", "ExperienceReplay": ".experience_replay",
+            "SequenceReplay": ".sequence_replay", "PrioritizedReplay": ".prioritized_replay"}
+
+__all__ = list(_modules)
+
+
+def __getattr__(name):
+    if name in _modules:
+        value = getattr(importlib.import_module(_modules[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module " + __name__ + " has no attribute " + name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
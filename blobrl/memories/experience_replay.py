@@ -54,13 +54,15 @@ class ExperienceReplay(MemoryInterface):
         :type device: torch.device
         :param batch_size:
         :type batch_size: int
-        :return: list<Tensor>
+        :return: list<Tensor>, observations and next observations keep their stored dtype, like uint8 images which
+            are converted in float by network on device, other values are float32
         """
         idxs = np.random.randint(len(self.buffer), size=batch_size)
 
-        batch = np.array([self.get_sample(idx) for idx in idxs], dtype=object)
+        batch = [self.get_sample(idx) for idx in idxs]
 
-        return [torch.Tensor(list(V)).to(device=device) for V in batch.T]
+        return [torch.as_tensor(np.asarray(V) if i in (0, 3) else np.asarray(V, dtype=np.float32), device=device)
+                for i, V in enumerate(zip(*batch))]
 
     def get_sample(self, idx):
         """
@@ -0,0 +1,183 @@
+import numpy as np
+import torch
+
+from blobrl.memories import MemoryInterface
+
+
+class PrioritizedReplay(MemoryInterface):
+    """ from 'Prioritized Experience Replay' in https://arxiv.org/pdf/1511.05952.pdf, proportional variant
+    """
+
+    def __init__(self, max_size=5000, alpha=0.6, epsilon=1e-6, beta=0.4, beta_steps=100000):
+        """
+        Create PrioritizedReplay with buffersize equal to max_size, transitions are sampled with probability
+        proportional to priority ** alpha kept in a sum tree, sample also return importance sampling weights with
+        exponent beta annealed linearly to 1 in beta_steps samples
+
+        :param max_size: size max of buffer
+        :type max_size: int
+        :param alpha: how much priorities are used, 0 is uniform sampling
+        :type alpha: float
+        :param epsilon: added to priorities so no transition has probability 0
+        :type epsilon: float
+        :param beta: initial exponent of importance sampling weights, 0 is no correction
+        :type beta: float
+        :param beta_steps: number of calls of sample until beta reach 1
+        :type beta_steps: int
+        """
+        if max_size < 1:
+            raise ValueError("max_size need to be greater than 0 not " + str(max_size))
+        if alpha < 0:
+            raise ValueError("alpha need to be greater or equal than 0 not " + str(alpha))
+        if not 0 <= beta <= 1:
+            raise ValueError("beta need to be in range [0,1] not " + str(beta))
+        if not isinstance(beta_steps, int) or beta_steps < 1:
+            raise ValueError("beta_steps need to be int >= 1 not " + str(beta_steps))
+        self.max_size = max_size
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.beta = beta
+        self.beta_steps = beta_steps
+        self.sampled = 0
+
+        self.observations = None
+        self.actions = None
+        self.rewards = np.zeros(max_size, dtype=np.float32)
+        self.next_observations = None
+        self.dones = np.zeros(max_size, dtype=np.float32)
+
+        # leaves of tree are at [capacity, capacity + max_size[, tree[i] = tree[2 * i] + tree[2 * i + 1]
+        self.capacity = 1 << int(np.ceil(np.log2(max_size)))
+        self.tree = np.zeros(2 * self.capacity, dtype=np.float64)
+        self.max_priority = 1.0
+        self.indices = None
+
+        self.index = 0
+        self.size = 0
+
+    def _allocate(self, observation, action):
+        """
+        Create buffers with shape and dtype of first observation and action
+
+        :param observation:
+        :param action:
+        """
+        observation = np.asarray(observation)
+        action = np.asarray(action)
+        self.observations = np.zeros((self.max_size,) + observation.shape, dtype=observation.dtype)
+        self.next_observations = np.zeros((self.max_size,) + observation.shape, dtype=observation.dtype)
+        self.actions = np.zeros((self.max_size,) + action.shape, dtype=np.int64)
+
+    def append(self, observation, action, reward, next_observation, done, priority=None):
+        """
+        Store one couple of value
+
+        :param observation:
+        :param action:
+        :param reward:
+        :param next_observation:
+        :param done:
+        :param priority: priority of transition, default is max priority given until now
+        :type priority: float
+        """
+        self.extend([observation], [action], [reward], [next_observation], [done],
+                    None if priority is None else [priority])
+
+    def extend(self, observations, actions, rewards, next_observations, dones, priorities=None):
+        """
+        Store many couple of value
+
+        :param observations:
+        :param actions:
+        :param rewards:
+        :param next_observations:
+        :param dones:
+        :param priorities: priorities of transitions, default is max priority given until now
+        :type priorities: list, np.ndarray
+        """
+        n = min(len(dones), self.max_size)
+        values = [np.asarray(v)[-n:] for v in (observations, actions, rewards, next_observations, dones)]
+        if self.observations is None:
+            self._allocate(values[0][0], values[1][0])
+
+        idxs = (self.index + np.arange(n)) % self.max_size
+        for buffer, value in zip((self.observations, self.actions, self.rewards, self.next_observations, self.dones),
+                                 values):
+            buffer[idxs] = value
+
+        if priorities is None:
+            priorities = np.full(n, self.max_priority)
+        self.update_priorities(idxs, np.asarray(priorities, dtype=np.float64)[-n:])
+
+        self.index = (self.index + n) % self.max_size
+        self.size = min(self.size + n, self.max_size)
+
+    def update_priorities(self, indices, priorities):
+        """
+        Set priorities of transitions at indices, all parents in sum tree are updated level by level
+
+        :param indices: indices of transitions, like self.indices after sample
+        :type indices: np.ndarray
+        :param priorities: new priorities, like absolute TD errors
+        :type priorities: np.ndarray
+        """
+        priorities = np.abs(np.asarray(priorities, dtype=np.float64))
+        if len(priorities) == 0:
+            return
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+
+        nodes = np.asarray(indices, dtype=np.int64) + self.capacity
+        self.tree[nodes] = (priorities + self.epsilon) ** self.alpha
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            nodes = np.unique(nodes // 2)
+
+    def sample(self, batch_size, device):
+        """
+        returns *batch_size* of samples and their importance sampling weights (N * P(i)) ** -beta divided by
+        their maximum, indices of samples are kept in self.indices to update their priorities
+
+        :param device: torch device to run agent
+        :type device: torch.device
+        :param batch_size:
+        :type batch_size: int
+        :return: list<Tensor> [observations, actions, rewards, next_observations, dones, weights]
+        """
+        values = np.random.random(batch_size) * self.tree[1]
+        nodes = np.ones(batch_size, dtype=np.int64)
+        while nodes[0] < self.capacity:
+            left = 2 * nodes
+            right = values > self.tree[left]
+            values = np.where(right, values - self.tree[left], values)
+            nodes = np.where(right, left + 1, left)
+        self.indices = np.minimum(nodes - self.capacity, self.size - 1)
+
+        weights = (self.size * self.tree[self.indices + self.capacity] / self.tree[1]) ** -self.get_beta()
+        weights = (weights / weights.max()).astype(np.float32)
+        self.sampled += 1
+
+        return [torch.as_tensor(self.observations[self.indices], device=device),
+                torch.as_tensor(self.actions[self.indices], device=device),
+                torch.as_tensor(self.rewards[self.indices], device=device),
+                torch.as_tensor(self.next_observations[self.indices], device=device),
+                torch.as_tensor(self.dones[self.indices], device=device),
+                torch.as_tensor(weights, device=device)]
+
+    def get_beta(self):
+        """
+        Return exponent of importance sampling weights of next sample, from beta to 1 in beta_steps samples
+        """
+        return min(1., self.beta + (1. - self.beta) * self.sampled / self.beta_steps)
+
+    def get_probabilities(self):
+        """
+        Return probability of each stored transition to be sampled
+        """
+        return self.tree[self.capacity:self.capacity + self.size] / self.tree[1]
+
+    def __len__(self):
+        return self.size
+
+    def __str__(self):
+        return 'PrioritizedReplay-' + str(self.max_size) + '-' + str(self.alpha)
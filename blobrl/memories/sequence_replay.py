@@ -0,0 +1,113 @@
+import numpy as np
+import torch
+
+from blobrl.memories import MemoryInterface
+
+
+class SequenceReplay(MemoryInterface):
+
+    def __init__(self, max_size=5000, sequence_length=8):
+        """
+        Create SequenceReplay with buffersize equal to max_size, sample return sequences of sequence_length
+        transitions which stop at the end of episode
+
+        :param max_size: size max of buffer
+        :type max_size: int
+        :param sequence_length: length of sampled sequences
+        :type sequence_length: int
+        """
+        if sequence_length < 1:
+            raise ValueError("sequence_length need to be greater than 0 not " + str(sequence_length))
+        self.max_size = max_size
+        self.sequence_length = sequence_length
+
+        self.observations = None
+        self.actions = None
+        self.rewards = np.zeros(max_size, dtype=np.float32)
+        self.next_observations = None
+        self.dones = np.zeros(max_size, dtype=bool)
+
+        self.index = 0
+        self.size = 0
+
+    def _allocate(self, observation, action):
+        """
+        Create buffers with shape and dtype of first observation and action
+
+        :param observation:
+        :param action:
+        """
+        observation = np.asarray(observation)
+        action = np.asarray(action)
+        self.observations = np.zeros((self.max_size,) + observation.shape, dtype=observation.dtype)
+        self.next_observations = np.zeros((self.max_size,) + observation.shape, dtype=observation.dtype)
+        self.actions = np.zeros((self.max_size,) + action.shape, dtype=np.int64)
+
+    def append(self, observation, action, reward, next_observation, done):
+        """
+        Store one couple of value
+
+        :param observation:
+        :param action:
+        :param reward:
+        :param next_observation:
+        :param done:
+        """
+        self.extend([observation], [action], [reward], [next_observation], [done])
+
+    def extend(self, observations, actions, rewards, next_observations, dones):
+        """
+        Store many couple of value
+
+        :param observations:
+        :param actions:
+        :param rewards:
+        :param next_observations:
+        :param dones:
+        """
+        n = min(len(dones), self.max_size)
+        values = [np.asarray(v)[-n:] for v in (observations, actions, rewards, next_observations, dones)]
+        if self.observations is None:
+            self._allocate(values[0][0], values[1][0])
+
+        idxs = (self.index + np.arange(n)) % self.max_size
+        for buffer, value in zip((self.observations, self.actions, self.rewards, self.next_observations, self.dones),
+                                 values):
+            buffer[idxs] = value
+
+        self.index = (self.index + n) % self.max_size
+        self.size = min(self.size + n, self.max_size)
+
+    def sample(self, batch_size, device):
+        """
+        returns *batch_size* sequences padded to sequence_length, sequences stop after first done
+
+        :param device: torch device to run agent
+        :type device: torch.device
+        :param batch_size:
+        :type batch_size: int
+        :return: list<Tensor> [observations, actions, rewards, next_observations, dones, lengths], all of shape
+            (batch_size, sequence_length, ...) except lengths of shape (batch_size)
+        """
+        oldest = (self.index - self.size) % self.max_size
+        steps = np.random.randint(self.size, size=(batch_size, 1)) + np.arange(self.sequence_length)
+
+        valid = steps < self.size
+        idxs = (oldest + np.minimum(steps, self.size - 1)) % self.max_size
+
+        dones = self.dones[idxs] & valid
+        mask = valid & ((np.cumsum(dones, axis=1) - dones) == 0)
+        lengths = mask.sum(axis=1)
+
+        return [torch.as_tensor(self.observations[idxs], device=device),
+                torch.as_tensor(self.actions[idxs], device=device),
+                torch.as_tensor(self.rewards[idxs] * mask, device=device),
+                torch.as_tensor(self.next_observations[idxs], device=device),
+                torch.as_tensor(dones, dtype=torch.float, device=device),
+                torch.as_tensor(lengths, device=device)]
+
+    def __len__(self):
+        return self.size
+
+    def __str__(self):
+        return 'SequenceReplay-' + str(self.max_size) + '-' + str(self.sequence_length)
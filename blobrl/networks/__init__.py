@@ -1,7 +1,24 @@
-from .base_network import BaseNetwork
-from .simple_network import SimpleNetwork
-from .base_dueling_network import BaseDuelingNetwork
-from .simple_dueling_network import SimpleDuelingNetwork
-from .c51_network import C51Network
+import importlib
 
-from .utils import get_last_layers
+# module of each public name, imported only when the name is used
+_modules = {"BaseNetwork": ".base_network", "SimpleNetwork": ".simple_network",
+            "BaseDuelingNetwork": ".base_dueling_network", "SimpleDuelingNetwork": ".simple_dueling_network",
+            "C51Network": ".c51_network", "ConvNetwork": ".conv_network", "C51ConvNetwork": ".c51_conv_network",
+            "EmbeddingNetwork": ".embedding_network", "RecurrentNetwork": ".recurrent_network", "NoisyLinear": ".utils",
+            "FusedHead": ".utils", "MultiDiscreteHead": ".utils", "ConvEncoder": ".utils", "EmbeddingEncoder": ".utils",
+            "get_last_layers": ".utils", "forward_last_layers": ".utils", "get_index_sizes": ".utils",
+            "get_linear": ".utils", "set_noisy": ".utils"}
+
+__all__ = list(_modules)
+
+
+def __getattr__(name):
+    if name in _modules:
+        value = getattr(importlib.import_module(_modules[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module " + __name__ + " has no attribute " + name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,6 +1,9 @@
 import abc
 
+import torch.nn as nn
+
 from blobrl.networks import BaseNetwork
+from .utils import MultiDiscreteHead
 
 
 class BaseDuelingNetwork(BaseNetwork):
@@ -19,17 +22,31 @@ class BaseDuelingNetwork(BaseNetwork):
 
         super().__init__(observation_space=network.observation_space, action_space=network.action_space)
         self.network = network
+        self.flattener = network.flattener
         self.value_outputs = None
 
     def forward(self, observation):
-        x = observation.view(observation.shape[0], -1)
+        """ Q = V + A - mean(A), the value is computed once and the advantage is centered for each sample along
+        the action dim of each head
+
+        :param observation:
+        :return:
+        """
+        x = observation.view(observation.shape[0], -1).float()
         x = self.network.network(x)
 
-        def map_forward(layers, last_tensor, value_outputs):
-            if isinstance(layers, list):
-                return [map_forward(layers, last_tensor, value_outputs) for layers in layers]
-            advantage = layers(last_tensor)
-            value = value_outputs(last_tensor)
-            return value + advantage - advantage.mean()
+        value = self.value_outputs(x)
+
+        def map_forward(layers):
+            if isinstance(layers, nn.ModuleList):
+                return [map_forward(layer) for layer in layers]
+
+            if isinstance(layers, MultiDiscreteHead):
+                advantage = layers.linear(x)
+                return layers.split(value + advantage - layers.mean(advantage))
+
+            advantage = layers(x)
+            dims = tuple(range(1, advantage.dim()))
+            return value.view(-1, *[1] * len(dims)) + advantage - advantage.mean(dim=dims, keepdim=True)
 
-        return map_forward(self.network.outputs, x, self.value_outputs, )
+        return map_forward(self.network.outputs)
@@ -2,6 +2,8 @@ import abc
 from gym.spaces import Space
 import torch.nn as nn
 
+from blobrl.flattener import Flattener
+
 
 class BaseNetwork(nn.Module, metaclass=abc.ABCMeta):
     @abc.abstractmethod
@@ -20,9 +22,20 @@ class BaseNetwork(nn.Module, metaclass=abc.ABCMeta):
 
         self.observation_space = observation_space
         self.action_space = action_space
+        self.flattener = Flattener(self.observation_space)
         self.outputs = None
         self.network = None
 
+    def flatten_observation(self, observation, out=None):
+        """ Return observation as 1D array like forward need it, with self.flattener. Box observation keep their
+        dtype so uint8 images are converted on device of network
+
+        :param observation: stat of environment
+        :param out: buffer where observation is written, a new one is created if None
+        :type out: np.ndarray
+        """
+        return self.flattener.flatten(observation, out=out)
+
     @abc.abstractmethod
     def forward(self, observation):
         """
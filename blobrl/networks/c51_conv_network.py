@@ -0,0 +1,23 @@
+from .utils import ConvEncoder
+from blobrl.networks import C51Network
+
+
+class C51ConvNetwork(C51Network):
+    def __init__(self, observation_space, action_space, num_atoms=51, conv_layers=None, channel_last=True):
+        """
+
+        :param observation_space: image space, Box with 2 or 3 dims
+        :param action_space:
+        :param num_atoms: number of atoms of each distribution
+        :type num_atoms: int
+        :param conv_layers: list of (out_channels, kernel_size, stride), default is conv layers of Nature DQN
+        :type conv_layers: list
+        :param channel_last: if 3 dims observation are (H, W, C), else (C, H, W)
+        :type channel_last: bool
+        """
+        super().__init__(observation_space=observation_space, action_space=action_space, num_atoms=num_atoms,
+                         encoder=ConvEncoder(observation_space, linear_dim=64, conv_layers=conv_layers,
+                                             channel_last=channel_last))
+
+    def __str__(self):
+        return 'C51ConvNetwork-' + str(self.observation_space) + "-" + str(self.action_space)
@@ -1,5 +1,4 @@
 import numpy as np
-import torch
 import torch.nn as nn
 from gym.spaces import flatdim, Discrete, MultiDiscrete
 
@@ -7,11 +6,15 @@ from blobrl.networks import BaseNetwork
 
 
 class C51Network(BaseNetwork):
-    def __init__(self, observation_space, action_space):
+    def __init__(self, observation_space, action_space, num_atoms=51, encoder=None):
         """
 
         :param observation_space:
         :param action_space:
+        :param num_atoms: number of atoms of each distribution
+        :type num_atoms: int
+        :param encoder: body of network from observation to 64 features, default is two Linear layers
+        :type encoder: torch.nn.Module
         """
         if not isinstance(action_space, (Discrete, MultiDiscrete)):
             raise TypeError(
@@ -19,38 +22,26 @@ class C51Network(BaseNetwork):
 
         super().__init__(observation_space=observation_space, action_space=action_space)
 
-        self.NUM_ATOMS = 51
+        self.num_atoms = num_atoms
 
-        self.network = nn.Sequential()
-        self.network.add_module("C51_Linear_Input", nn.Linear(np.prod(flatdim(self.observation_space)), 64))
-        self.network.add_module("C51_LeakyReLU_Input", nn.LeakyReLU())
-        self.network.add_module("C51_Linear_1", nn.Linear(64, 64))
-        self.network.add_module("C51_LeakyReLU_1", nn.LeakyReLU())
+        if encoder is None:
+            encoder = nn.Sequential()
+            encoder.add_module("C51_Linear_Input", nn.Linear(np.prod(flatdim(self.observation_space)), 64))
+            encoder.add_module("C51_LeakyReLU_Input", nn.LeakyReLU())
+            encoder.add_module("C51_Linear_1", nn.Linear(64, 64))
+            encoder.add_module("C51_LeakyReLU_1", nn.LeakyReLU())
+        self.network = encoder
 
-        self.distributional_list = []
         if isinstance(self.action_space, Discrete):
-            self.len_distributional = self.action_space.n
-
-            for i in range(self.len_distributional):
-                distributional = nn.Sequential()
-                distributional.add_module("C51_Distributional_" + str(i) + "_Linear", nn.Linear(64, self.NUM_ATOMS))
-                distributional.add_module("C51_Distributional_" + str(i) + "_Softmax", nn.Softmax(dim=1))
-
-                self.add_module("C51_Distributional_" + str(i) + "_Sequential", distributional)
-                self.distributional_list.append(distributional)
+            self.distributional = nn.Linear(64, self.action_space.n * self.num_atoms)
 
         elif isinstance(self.action_space, MultiDiscrete):
             def gen_outputs(nvec):
-                dis = []
-                for nspace in nvec:
-                    if isinstance(nspace, (list, np.ndarray)):
-                        dis.append(gen_outputs(nspace))
-                    else:
-                        dis.append(
-                            [nn.Sequential(nn.Linear(64, self.NUM_ATOMS), nn.Softmax(dim=1)) for i in range(nspace)])
-                return dis
+                if isinstance(nvec, (list, np.ndarray)):
+                    return nn.ModuleList([gen_outputs(nspace) for nspace in nvec])
+                return nn.Linear(64, int(nvec) * self.num_atoms)
 
-            self.distributional_list = gen_outputs(self.action_space.nvec)
+            self.distributional = gen_outputs(self.action_space.nvec)
 
     def forward(self, observation):
         """
@@ -58,29 +49,17 @@ class C51Network(BaseNetwork):
         :param observation:
         :return:
         """
-        x = observation.view(observation.shape[0], -1)
+        x = observation.view(observation.shape[0], -1).float()
         x = self.network(x)
-        if isinstance(self.action_space, Discrete):
-            q = [distributionalLayer(x) for distributionalLayer in self.distributional_list]
-            q = torch.cat(q)
-            q = torch.reshape(q, (self.action_space.n, -1, self.NUM_ATOMS))
-            q = q.permute(1, 0, 2)
-
-            return q
-        if isinstance(self.action_space, MultiDiscrete):
-
-            def do_forward(nvec, llayers, x):
-                if isinstance(llayers[-1], list):
-                    return [do_forward(n, l, x) for n, l in zip(nvec, llayers)]
 
-                q = [distributionalLayer(x) for distributionalLayer in llayers]
-                q = torch.cat(q)
-                q = torch.reshape(q, (nvec, -1, self.NUM_ATOMS))
-                q = q.permute(1, 0, 2)
+        def do_forward(layers):
+            if isinstance(layers, nn.ModuleList):
+                return [do_forward(layer) for layer in layers]
 
-                return q
+            q = layers(x).view(x.shape[0], -1, self.num_atoms)
+            return q.softmax(dim=-1)
 
-            return do_forward(self.action_space.nvec, self.distributional_list, x)
+        return do_forward(self.distributional)
 
     def __str__(self):
         return 'C51Network-' + str(self.observation_space) + "-" + str(self.action_space)
@@ -0,0 +1,38 @@
+from .utils import ConvEncoder, get_last_layers, forward_last_layers
+from blobrl.networks import BaseNetwork
+
+
+class ConvNetwork(BaseNetwork):
+    def __init__(self, observation_space, action_space, linear_dim=64, conv_layers=None, channel_last=True):
+        """
+
+        :param observation_space: image space, Box with 2 or 3 dims
+        :param action_space:
+        :param linear_dim: size of features after convolutions
+        :type linear_dim: int
+        :param conv_layers: list of (out_channels, kernel_size, stride), default is conv layers of Nature DQN
+        :type conv_layers: list
+        :param channel_last: if 3 dims observation are (H, W, C), else (C, H, W)
+        :type channel_last: bool
+        """
+        super().__init__(observation_space=observation_space, action_space=action_space)
+
+        self.linear_dim = linear_dim
+        self.last_dim = linear_dim
+        self.network = ConvEncoder(self.observation_space, linear_dim=linear_dim, conv_layers=conv_layers,
+                                   channel_last=channel_last)
+
+        self.outputs = get_last_layers(self.action_space, last_dim=linear_dim)
+
+    def forward(self, observation):
+        """
+
+        :param observation: uint8 or float observation
+        :return:
+        """
+        x = self.network(observation)
+
+        return forward_last_layers(self.outputs, x)
+
+    def __str__(self):
+        return 'ConvNetwork-' + str(self.observation_space) + "-" + str(self.action_space)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from .utils import EmbeddingEncoder, get_last_layers, forward_last_layers
+from blobrl.flattener import Flattener
+from blobrl.networks import BaseNetwork
+
+
+class EmbeddingNetwork(BaseNetwork):
+    def __init__(self, observation_space, action_space, linear_dim=64, embedding_dim=64):
+        """
+
+        :param observation_space: Discrete, MultiDiscrete or Tuple/Dict of them
+        :param action_space:
+        :param linear_dim: size of features after embedding
+        :type linear_dim: int
+        :param embedding_dim: size of embeddings
+        :type embedding_dim: int
+        """
+        super().__init__(observation_space=observation_space, action_space=action_space)
+
+        self.flattener = Flattener(self.observation_space, one_hot=False, dtype=np.int32)
+        self.linear_dim = linear_dim
+        self.last_dim = linear_dim
+        self.network = EmbeddingEncoder(self.observation_space, linear_dim=linear_dim, embedding_dim=embedding_dim)
+
+        self.outputs = get_last_layers(self.action_space, last_dim=linear_dim)
+
+    def forward(self, observation):
+        """
+
+        :param observation: int32 indexes from self.flattener
+        :return:
+        """
+        x = self.network(observation)
+
+        return forward_last_layers(self.outputs, x)
+
+    def __str__(self):
+        return 'EmbeddingNetwork-' + str(self.observation_space) + "-" + str(self.action_space)
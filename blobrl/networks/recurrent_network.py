@@ -0,0 +1,70 @@
+import torch.nn as nn
+from gym.spaces import flatdim
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
+
+from .utils import get_last_layers, forward_last_layers
+from blobrl.networks import BaseNetwork
+
+
+class RecurrentNetwork(BaseNetwork):
+    def __init__(self, observation_space, action_space, linear_dim=64, hidden_dim=64, cell="lstm"):
+        """
+
+        :param observation_space:
+        :param action_space:
+        :param linear_dim: size of Linear layer before recurrent layer
+        :type linear_dim: int
+        :param hidden_dim: size of hidden state of recurrent layer
+        :type hidden_dim: int
+        :param cell: type of recurrent layer
+        :type cell: str "lstm" or "gru"
+        """
+        super().__init__(observation_space=observation_space, action_space=action_space)
+
+        if cell not in ("lstm", "gru"):
+            raise ValueError("cell need to be 'lstm' or 'gru' not " + str(cell))
+
+        self.linear_dim = linear_dim
+        self.hidden_dim = hidden_dim
+        self.last_dim = hidden_dim
+        self.cell = cell
+
+        self.network = nn.Sequential()
+        self.network.add_module("NetWorkRecurrent_Linear_Input",
+                                nn.Linear(flatdim(self.observation_space), linear_dim))
+        self.network.add_module("NetWorkRecurrent_LeakyReLU_Input", nn.LeakyReLU())
+
+        if cell == "lstm":
+            self.recurrent = nn.LSTM(linear_dim, hidden_dim, batch_first=True)
+        else:
+            self.recurrent = nn.GRU(linear_dim, hidden_dim, batch_first=True)
+
+        self.outputs = get_last_layers(self.action_space, last_dim=hidden_dim)
+
+    def forward(self, observation, hidden=None, lengths=None):
+        """ Run all time steps of all sequences in one call of recurrent layer
+
+        :param observation: tensor of shape (batch, time, ...) or (batch, ...) for one step
+        :type observation: torch.Tensor
+        :param hidden: hidden state return by last call, None for zeros
+        :param lengths: length of each sequence if sequences are padded
+        :type lengths: torch.Tensor
+        :return: (outputs for batch * time rows, ordered by batch then time, hidden state after last valid step)
+        """
+        if observation.dim() <= 2:
+            observation = observation.view(observation.shape[0], 1, -1)
+        batch_size, time = observation.shape[:2]
+
+        x = self.network(observation.reshape(batch_size, time, -1).float())
+
+        if lengths is None:
+            x, hidden = self.recurrent(x, hidden)
+        else:
+            x = pack_padded_sequence(x, lengths.cpu(), batch_first=True, enforce_sorted=False)
+            x, hidden = self.recurrent(x, hidden)
+            x, _ = pad_packed_sequence(x, batch_first=True, total_length=time)
+
+        return forward_last_layers(self.outputs, x.reshape(batch_size * time, -1)), hidden
+
+    def __str__(self):
+        return 'RecurrentNetwork-' + str(self.observation_space) + "-" + str(self.action_space) + "-" + self.cell
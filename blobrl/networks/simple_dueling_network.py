@@ -6,16 +6,17 @@ class SimpleDuelingNetwork(BaseDuelingNetwork):
     def __init__(self, network):
         """
 
-        :param observation_space:
-        :param action_space:
+        :param network: network when we add Value head
+        :type network: BaseNetwork and not BaseDuelingNetwork
         """
 
         super().__init__(network=network)
 
+        last_dim = getattr(network, "last_dim", 64)
         self.value_outputs = nn.Sequential(
-            nn.Linear(64, 64),
+            nn.Linear(last_dim, last_dim),
             nn.LeakyReLU(),
-            nn.Linear(64, 1)
+            nn.Linear(last_dim, 1)
         )
 
     def __str__(self):
@@ -1,27 +1,34 @@
 import numpy as np
 import torch.nn as nn
 from gym.spaces import flatdim
-from .utils import get_last_layers
+from .utils import get_last_layers, forward_last_layers, get_linear
 from blobrl.networks import BaseNetwork
 
 
 class SimpleNetwork(BaseNetwork):
-    def __init__(self, observation_space, action_space, linear_dim=64):
+    def __init__(self, observation_space, action_space, linear_dim=64, noisy=False):
         """
 
         :param observation_space:
         :param action_space:
+        :param linear_dim: size of hidden layers
+        :type linear_dim: int
+        :param noisy: if hidden and output Linear layers are NoisyLinear, for NoisyExploration
+        :type noisy: bool
         """
         super().__init__(observation_space=observation_space, action_space=action_space)
 
+        self.linear_dim = linear_dim
+        self.last_dim = linear_dim
+        self.noisy = noisy
         self.network = nn.Sequential()
         self.network.add_module("NetWorkSimple_Linear_Input",
                                 nn.Linear(np.prod(flatdim(self.observation_space)), linear_dim))
         self.network.add_module("NetWorkSimple_LeakyReLU_Input", nn.LeakyReLU())
-        self.network.add_module("NetWorkSimple_Linear_1", nn.Linear(linear_dim, linear_dim))
+        self.network.add_module("NetWorkSimple_Linear_1", get_linear(linear_dim, linear_dim, noisy))
         self.network.add_module("NetWorkSimple_LeakyReLU_1", nn.LeakyReLU())
 
-        self.outputs = get_last_layers(self.action_space, last_dim=linear_dim)
+        self.outputs = get_last_layers(self.action_space, last_dim=linear_dim, noisy=noisy)
 
     def forward(self, observation):
         """
@@ -30,15 +37,10 @@ class SimpleNetwork(BaseNetwork):
         :return:
         """
 
-        x = observation.view(observation.shape[0], -1)
+        x = observation.view(observation.shape[0], -1).float()
         x = self.network(x)
 
-        def forwards(last_tensor, layers):
-            if isinstance(layers, list):
-                return [forwards(last_tensor, layers) for layers in layers]
-            return layers(last_tensor)
-
-        return forwards(x, self.outputs)
+        return forward_last_layers(self.outputs, x)
 
     def __str__(self):
         return 'SimpleNetwork-' + str(self.observation_space) + "-" + str(self.action_space)
@@ -1,38 +1,332 @@
 from gym.spaces import flatdim
 from gym.spaces import Box, Discrete, MultiDiscrete, MultiBinary, Tuple, Dict
+import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import numpy as np
 
 
-def get_last_layers(space, last_dim):
-    if isinstance(space, Box):
-        def map_box(ld, n):
-            if isinstance(n, list):
-                return [map_box(ld, x) for x in n]
-            return nn.Linear(ld, 1)
+class NoisyLinear(nn.Module):
+    """ from 'Noisy Networks for Exploration' in https://arxiv.org/pdf/1706.10295.pdf with factorized gaussian noise
+    """
+
+    def __init__(self, in_features, out_features, sigma_init=0.5):
+        """ Linear layer with learnable noise on weight and bias
+
+        :param in_features: size of input
+        :type in_features: int
+        :param out_features: size of output
+        :type out_features: int
+        :param sigma_init: initial value of sigma, scaled by 1 / sqrt(in_features)
+        :type sigma_init: float
+        """
+        super().__init__()
+        self.in_features = in_features
+        self.out_features = out_features
+        self.noisy = True
+
+        bound = 1 / np.sqrt(in_features)
+        self.weight_mu = nn.Parameter(torch.empty(out_features, in_features).uniform_(-bound, bound))
+        self.weight_sigma = nn.Parameter(torch.full((out_features, in_features), sigma_init * bound))
+        self.bias_mu = nn.Parameter(torch.empty(out_features).uniform_(-bound, bound))
+        self.bias_sigma = nn.Parameter(torch.full((out_features,), sigma_init * bound))
+
+        self.register_buffer("epsilon_in", torch.zeros(in_features))
+        self.register_buffer("epsilon_out", torch.zeros(out_features))
+
+    @staticmethod
+    def _scale_noise(size, device):
+        x = torch.randn(size, device=device)
+        return x.sign() * x.abs().sqrt()
+
+    def reset_noise(self):
+        """ Draw new factorized noise, one vector for inputs and one for outputs
+        """
+        self.epsilon_in = self._scale_noise(self.in_features, self.epsilon_in.device)
+        self.epsilon_out = self._scale_noise(self.out_features, self.epsilon_out.device)
+
+    def forward(self, x):
+        """ Noise is resampled for each batch, without noise if self.noisy is False
+
+        Noisy weight is never built, x * epsilon_in is passed through sigma and scaled by epsilon_out.
+
+        :param x:
+        :return:
+        """
+        outputs = F.linear(x, self.weight_mu, self.bias_mu)
+        if not self.noisy:
+            return outputs
+
+        with torch.no_grad():
+            self.reset_noise()
+        return outputs + (F.linear(x * self.epsilon_in, self.weight_sigma) + self.bias_sigma) * self.epsilon_out
+
+
+def set_noisy(module, noisy):
+    """ Enable or disable noise of all NoisyLinear of module
+
+    :param module: network
+    :type module: torch.nn.Module
+    :param noisy: if noise is used
+    :type noisy: bool
+    """
+    for m in module.modules():
+        if isinstance(m, NoisyLinear):
+            m.noisy = noisy
+
+
+def get_linear(in_features, out_features, noisy=False):
+    """ Return NoisyLinear if noisy else nn.Linear
+
+    :param in_features: size of input
+    :type in_features: int
+    :param out_features: size of output
+    :type out_features: int
+    :param noisy: if layer is NoisyLinear
+    :type noisy: bool
+    """
+    if noisy:
+        return NoisyLinear(in_features, out_features)
+    return nn.Linear(in_features, out_features)
+
+
+class FusedHead(nn.Module):
+    def __init__(self, in_features, shape, noisy=False):
+        """ One Linear layer for all values of a space, reshape to the space shape
+
+        :param in_features: size of last layer
+        :type in_features: int
+        :param shape: shape of output for one sample
+        :type shape: tuple
+        :param noisy: if Linear layer is NoisyLinear
+        :type noisy: bool
+        """
+        super().__init__()
+        self.shape = tuple(int(s) for s in shape)
+        self.linear = get_linear(in_features, int(np.prod(self.shape)), noisy)
+
+    def forward(self, x):
+        """
+
+        :param x:
+        :return: tensor of shape (batch, *shape)
+        """
+        return self.linear(x).view(x.shape[0], *self.shape)
+
+
+class MultiDiscreteHead(nn.Module):
+    def __init__(self, in_features, nvec, noisy=False):
+        """ One Linear layer for all discrete heads of a MultiDiscrete space
+
+        :param in_features: size of last layer
+        :type in_features: int
+        :param nvec: nvec of MultiDiscrete space
+        :type nvec: list, np.ndarray
+        :param noisy: if Linear layer is NoisyLinear
+        :type noisy: bool
+        """
+        super().__init__()
+        self.nvec = np.asarray(nvec)
+        self.sizes = self.nvec.flatten().tolist()
+        self.linear = get_linear(in_features, int(self.nvec.sum()), noisy)
+        self.register_buffer("index", torch.repeat_interleave(torch.arange(len(self.sizes)),
+                                                              torch.tensor(self.sizes)))
+
+    def forward(self, x):
+        """
+
+        :param x:
+        :return: (nested) list of tensor of shape (batch, n) with same structure as nvec
+        """
+        return self.split(self.linear(x))
+
+    def mean(self, outputs):
+        """ Return for each value of outputs the mean of the head it belongs
+
+        :param outputs: tensor of shape (batch, sum(nvec))
+        :type outputs: torch.Tensor
+        """
+        sums = outputs.new_zeros(outputs.shape[0], len(self.sizes)).index_add_(1, self.index, outputs)
+        return (sums / sums.new_tensor(self.sizes))[:, self.index]
+
+    def split(self, outputs):
+        """ Split fused outputs in (nested) list of heads
+
+        :param outputs: tensor of shape (batch, sum(nvec))
+        :type outputs: torch.Tensor
+        """
+        heads = iter(torch.split(outputs, self.sizes, dim=1))
+
+        def nest(nvec):
+            if isinstance(nvec, list):
+                return [nest(n) for n in nvec]
+            return next(heads)
+
+        return nest(self.nvec.tolist())
+
+
+class ConvEncoder(nn.Module):
+    def __init__(self, observation_space, linear_dim=64, conv_layers=None, channel_last=True):
+        """ Convolutional body for image observation, from flatten observation to linear_dim features
 
-        return map_box(last_dim, np.empty(space.shape).tolist())
+        uint8 observation are converted to float and scaled in [0, 1] inside forward, on device of the network.
+
+        :param observation_space: space of observation
+        :type observation_space: gym.spaces.Box with 2 (H, W) or 3 dims
+        :param linear_dim: size of output features
+        :type linear_dim: int
+        :param conv_layers: list of (out_channels, kernel_size, stride), default is conv layers of Nature DQN
+        :type conv_layers: list
+        :param channel_last: if 3 dims observation are (H, W, C), else (C, H, W)
+        :type channel_last: bool
+        """
+        super().__init__()
+        if not isinstance(observation_space, Box) or len(observation_space.shape) not in (2, 3):
+            raise TypeError("observation_space need to be Box with 2 or 3 dims, not " + str(observation_space))
+
+        if conv_layers is None:
+            conv_layers = [(32, 8, 4), (64, 4, 2), (64, 3, 1)]
+
+        self.shape = tuple(observation_space.shape)
+        self.channel_last = channel_last and len(self.shape) == 3
+        self.scale = observation_space.dtype == np.uint8
+
+        if len(self.shape) == 2:
+            in_channels = 1
+        else:
+            in_channels = self.shape[-1] if self.channel_last else self.shape[0]
+
+        self.conv = nn.Sequential()
+        for i, (out_channels, kernel_size, stride) in enumerate(conv_layers):
+            self.conv.add_module("Conv_" + str(i), nn.Conv2d(in_channels, out_channels, kernel_size, stride))
+            self.conv.add_module("Conv_LeakyReLU_" + str(i), nn.LeakyReLU())
+            in_channels = out_channels
+
+        with torch.no_grad():
+            conv_dim = self.conv(self.to_image(torch.zeros((1,) + self.shape))).numel()
+
+        self.linear = nn.Sequential(nn.Linear(conv_dim, linear_dim), nn.LeakyReLU())
+
+    def to_image(self, observation):
+        """ Reshape flatten observation in (batch, channel, H, W) float tensor
+
+        :param observation:
+        :type observation: torch.Tensor
+        """
+        x = observation.view(observation.shape[0], *self.shape).float()
+        if self.scale:
+            x = x / 255.
+        if len(self.shape) == 2:
+            return x.unsqueeze(1)
+        if self.channel_last:
+            return x.permute(0, 3, 1, 2)
+        return x
+
+    def forward(self, observation):
+        """
+
+        :param observation: flatten or not observation, uint8 or float
+        :type observation: torch.Tensor
+        :return: tensor of shape (batch, linear_dim)
+        """
+        x = self.conv(self.to_image(observation))
+        return self.linear(x.reshape(x.shape[0], -1))
+
+
+def get_index_sizes(space):
+    """ Return number of values of each index of space, in order of Flattener with one_hot=False
+
+    :param space: Discrete, MultiDiscrete or Tuple/Dict of them
+    :type space: gym.Space
+    """
     if isinstance(space, Discrete):
-        return nn.Sequential(*[nn.Linear(last_dim, flatdim(space))])
+        return [int(space.n)]
+    if isinstance(space, MultiDiscrete):
+        return space.nvec.flatten().tolist()
     if isinstance(space, Tuple):
-        return [get_last_layers(s, last_dim) for s in space]
+        return [n for s in space.spaces for n in get_index_sizes(s)]
     if isinstance(space, Dict):
-        return [get_last_layers(s, last_dim) for s in space.spaces.values()]
-    if isinstance(space, MultiBinary):
-        def map_multibinary(ld, n):
-            if isinstance(n, list):
-                return [map_multibinary(ld, x) for x in n]
+        return [n for s in space.spaces.values() for n in get_index_sizes(s)]
+    raise TypeError("space need to be Discrete, MultiDiscrete or Tuple/Dict of them, not " + str(space))
 
-            return nn.Sequential(*[nn.Linear(ld, 1), nn.Sigmoid()])
 
-        return map_multibinary(last_dim, np.empty(space.n).tolist())
-    if isinstance(space, MultiDiscrete):
-        def map_multidiscrete(ld, n):
-            if isinstance(n, list):
-                return [map_multidiscrete(ld, x) for x in n]
+class EmbeddingEncoder(nn.Module):
+    def __init__(self, observation_space, linear_dim=64, embedding_dim=64):
+        """ Embedding body for discrete observation, from indexes of Flattener(one_hot=False) to linear_dim features
 
-            return nn.Sequential(*[nn.Linear(ld, n)])
+        Discrete space use nn.Embedding, MultiDiscrete and Tuple/Dict use one nn.EmbeddingBag where embeddings of
+        each index are summed.
 
-        return map_multidiscrete(last_dim, space.nvec.tolist())
+        :param observation_space: Discrete, MultiDiscrete or Tuple/Dict of them
+        :type observation_space: gym.Space
+        :param linear_dim: size of output features
+        :type linear_dim: int
+        :param embedding_dim: size of embeddings
+        :type embedding_dim: int
+        """
+        super().__init__()
+        sizes = get_index_sizes(observation_space)
+
+        if isinstance(observation_space, Discrete):
+            self.embedding = nn.Embedding(sizes[0], embedding_dim)
+        else:
+            self.embedding = nn.EmbeddingBag(int(np.sum(sizes)), embedding_dim, mode="sum")
+        self.register_buffer("offsets", torch.tensor(np.cumsum([0] + sizes[:-1]), dtype=torch.long))
+
+        self.linear = nn.Sequential(nn.LeakyReLU(), nn.Linear(embedding_dim, linear_dim), nn.LeakyReLU())
+
+    def forward(self, observation):
+        """
+
+        :param observation: indexes from Flattener(one_hot=False), int or float
+        :type observation: torch.Tensor
+        :return: tensor of shape (batch, linear_dim)
+        """
+        x = observation.view(observation.shape[0], -1).long() + self.offsets
+        if isinstance(self.embedding, nn.Embedding):
+            x = self.embedding(x[:, 0])
+        else:
+            x = self.embedding(x)
+        return self.linear(x)
+
+
+def get_last_layers(space, last_dim, noisy=False):
+    """ Return output layers for space
+
+    Box and MultiBinary give one FusedHead, Discrete one Linear, MultiDiscrete one MultiDiscreteHead, Tuple and
+    Dict give nn.ModuleList so all layers are registered on the network.
+
+    :param space: space of output
+    :type space: gym.Space
+    :param last_dim: size of last layer
+    :type last_dim: int
+    :param noisy: if Linear layers are NoisyLinear
+    :type noisy: bool
+    """
+    if isinstance(space, Box):
+        return FusedHead(last_dim, space.shape, noisy)
+    if isinstance(space, Discrete):
+        return nn.Sequential(*[get_linear(last_dim, flatdim(space), noisy)])
+    if isinstance(space, Tuple):
+        return nn.ModuleList([get_last_layers(s, last_dim, noisy) for s in space])
+    if isinstance(space, Dict):
+        return nn.ModuleList([get_last_layers(s, last_dim, noisy) for s in space.spaces.values()])
+    if isinstance(space, MultiBinary):
+        return nn.Sequential(*[FusedHead(last_dim, np.atleast_1d(space.n), noisy), nn.Sigmoid()])
+    if isinstance(space, MultiDiscrete):
+        return MultiDiscreteHead(last_dim, space.nvec, noisy)
 
     raise NotImplementedError
+
+
+def forward_last_layers(layers, last_tensor):
+    """ Apply layers from get_last_layers on last_tensor
+
+    :param layers: layers return by get_last_layers
+    :param last_tensor: output of the body of network
+    :type last_tensor: torch.Tensor
+    :return: torch.Tensor or (nested) list of torch.Tensor with same structure as layers
+    """
+    if isinstance(layers, nn.ModuleList):
+        return [forward_last_layers(layer, last_tensor) for layer in layers]
+    return layers(last_tensor)
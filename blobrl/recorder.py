@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class Recorder:
+    def __init__(self, file_name=None, frame_skip=1, buffer_size=64, downsample=1, fps=30, display_fps=0):
+        """ Record frames of environment without blocking training
+
+        Frames are grabbed with render(mode='rgb_array') every frame_skip steps and put in a ring buffer, a background
+        thread downsample them, keep them for file_name and show last one in notebook at most display_fps times by
+        second. When the buffer is full the oldest frame is dropped, so training never wait for the recorder.
+
+        :param file_name: path of gif (with pillow) or video (with torchvision) written by close, None don't write
+        :type file_name: str
+        :param frame_skip: a frame is grabbed every frame_skip calls of record
+        :type frame_skip: int
+        :param buffer_size: maximum number of frames waiting for the background thread
+        :type buffer_size: int
+        :param downsample: keep one pixel every downsample pixels in height and width
+        :type downsample: int
+        :param fps: frames by second of file
+        :type fps: int
+        :param display_fps: maximum frames by second shown in notebook, 0 don't show
+        :type display_fps: float
+        """
+        for name, value in [("frame_skip", frame_skip), ("buffer_size", buffer_size), ("downsample", downsample),
+                            ("fps", fps)]:
+            if not isinstance(value, int) or value < 1:
+                raise ValueError(name + " need to be int >= 1 not " + str(value))
+        if not isinstance(display_fps, (int, float)) or display_fps < 0:
+            raise ValueError("display_fps need to be number >= 0 not " + str(display_fps))
+
+        self.file_name = file_name
+        self.frame_skip = frame_skip
+        self.downsample = downsample
+        self.fps = fps
+        self.display_fps = display_fps
+
+        self.buffer = deque(maxlen=buffer_size)
+        self.condition = threading.Condition()
+        self.thread = None
+        self.closing = False
+
+        self.count = 0
+        self.dropped = 0
+        self.frames = []
+        self.last_display = 0.
+        self.img = None
+
+    def record(self, environment):
+        """ Grab frame of environment if it is one of the frame_skip steps
+
+        :param environment:
+        :type environment: gym.Env
+        """
+        self.count += 1
+        if (self.count - 1) % self.frame_skip != 0:
+            return
+        frame = environment.render(mode='rgb_array')
+        if frame is not None:
+            self.add(frame)
+
+    def add(self, frame):
+        """ Put frame in ring buffer, background thread is started if needed
+
+        :param frame: image of shape (height, width, 3)
+        :type frame: np.ndarray
+        """
+        with self.condition:
+            if self.thread is None:
+                self.closing = False
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append(np.asarray(frame))
+            self.condition.notify()
+
+    def run(self):
+        """ Process frames of buffer until close is called and buffer is empty
+        """
+        while True:
+            with self.condition:
+                while not self.buffer and not self.closing:
+                    self.condition.wait()
+                if not self.buffer:
+                    return
+                frame = self.buffer.popleft()
+            self.process(frame)
+
+    def process(self, frame):
+        """ Downsample frame, keep it for file and show it if last display is older than 1 / display_fps
+
+        :param frame: image of shape (height, width, 3)
+        :type frame: np.ndarray
+        """
+        frame = frame[::self.downsample, ::self.downsample]
+        if self.file_name is not None:
+            self.frames.append(frame)
+
+        now = time.time()
+        if self.display_fps > 0 and now - self.last_display >= 1. / self.display_fps:
+            self.last_display = now
+            self.display(frame)
+
+    def display(self, frame):
+        """ Show frame in notebook
+
+        :param frame: image of shape (height, width, 3)
+        :type frame: np.ndarray
+        """
+        import matplotlib.pyplot as plt
+        from IPython import display
+
+        if self.img is None:
+            plt.figure(figsize=(10, 10))
+            plt.axis('off')
+            self.img = plt.imshow(frame)
+        else:
+            self.img.set_data(frame)
+        display.display(self.img.figure)
+        display.clear_output(wait=True)
+
+    def close(self):
+        """ Wait for frames of buffer and write file_name, next recorded frames start a new file
+
+        :return: file_name if it is written else None
+        """
+        with self.condition:
+            thread = self.thread
+            self.closing = True
+            self.condition.notify()
+        if thread is not None:
+            thread.join()
+        with self.condition:
+            self.thread = None
+        self.count = 0
+
+        frames, self.frames = self.frames, []
+        if self.file_name is None or not frames:
+            return None
+        self.write(self.file_name, frames, self.fps)
+        return self.file_name
+
+    @staticmethod
+    def write(file_name, frames, fps):
+        """ Write frames in file_name, as gif with pillow if extension is .gif else as video with torchvision
+
+        :param file_name:
+        :type file_name: str
+        :param frames: list of images of shape (height, width, 3)
+        :type frames: list
+        :param fps: frames by second
+        :type fps: int
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(file_name)), exist_ok=True)
+        frames = [np.asarray(frame, dtype=np.uint8) for frame in frames]
+        if file_name.lower().endswith(".gif"):
+            from PIL import Image
+
+            images = [Image.fromarray(frame) for frame in frames]
+            images[0].save(file_name, save_all=True, append_images=images[1:], duration=int(1000 / fps), loop=0)
+        else:
+            import torch
+            from torchvision.io import write_video
+
+            write_video(file_name, torch.as_tensor(np.stack(frames)), fps=fps)
+
+    def __str__(self):
+        return 'Recorder-' + str(self.file_name) + '-' + str(self.frame_skip) + '-' + str(
+            self.buffer.maxlen) + '-' + str(self.downsample) + '-' + str(self.fps) + '-' + str(self.display_fps)
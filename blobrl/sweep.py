@@ -0,0 +1,441 @@
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from copy import deepcopy
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+from blobrl import Trainer
+from blobrl.networks import SimpleDuelingNetwork
+
+
+def mzip(*iterables):
+    """ Cartesian product of iterables, first iterable change slowest
+
+    :return: generator of list with one element of each iterable
+    """
+    iterators = [iter(it) for it in iterables]
+    if not iterators:
+        return []
+    for elem in iterators[0]:
+        if len(iterators) == 1:
+            yield [elem]
+        else:
+            for elems in mzip(*iterables[1:]):
+                yield [elem, *elems]
+
+
+def dict_mzip(x):
+    """ Cartesian product of values of x
+
+    :param x: dict of list of values
+    :type x: dict
+    :return: generator of dict with one value of each list
+    """
+    if not x.values():
+        yield {}
+    for values in mzip(*list(x.values())):
+        param = {}
+        for key, val in zip(x.keys(), values):
+            param[key] = val
+        yield param
+
+
+def write_json(file_name, data):
+    """ Write data in file_name as json, file is written in a temporary file then renamed so it is complete or absent
+
+    :param file_name: path of file
+    :type file_name: str
+    :param data: data serializable in json
+    """
+    directory = os.path.dirname(os.path.abspath(file_name))
+    file_descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w") as file:
+            json.dump(data, file, indent=1)
+        os.replace(temporary, file_name)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def get_agent(job, observation_space, action_space, device=None):
+    """ Create agent of job with its network, optimizer and memory
+
+    :param job: job return by Sweep.expand_grid
+    :type job: dict
+    :param observation_space:
+    :param action_space:
+    :param device: torch device to run agent
+    :type device: torch.device
+    """
+    job = deepcopy(job)
+    network = job["network"]["class"](observation_space=observation_space, action_space=action_space,
+                                      **job["network"]["param"])
+    if job["dueling"]:
+        network = SimpleDuelingNetwork(network)
+    optimizer = job["optimizer"]["class"](network.parameters(), **job["optimizer"]["param"])
+    memory = job["memory"]["class"](**job["memory"]["param"])
+
+    return job["agent"]["class"](observation_space=observation_space, action_space=action_space, network=network,
+                                 optimizer=optimizer, memory=memory, device=device, **job["agent"]["param"])
+
+
+def read_summary(log_dir):
+    """ Return summary written in completion marker of log_dir, None if job was never finished
+
+    :param log_dir: log_dir of job
+    :type log_dir: str
+    """
+    marker = os.path.join(log_dir, Sweep.marker)
+    if not os.path.exists(marker):
+        return None
+    with open(marker) as file:
+        return json.load(file)
+
+
+def get_summary(job, logger, episodes, seconds, previous=None):
+    """ Return summary of job trained until episodes, reward is the mean reward of the last tenth of training
+    episodes and evaluation the mean reward of evaluations of this run
+
+    :param job: job return by Sweep.expand_grid
+    :type job: dict
+    :param logger: logger of trainer of job
+    :type logger: Logger
+    :param episodes: number of episodes trained since job start
+    :type episodes: int
+    :param seconds: duration of job since its start
+    :type seconds: float
+    :param previous: summary of job before this run, its scores are kept
+    :type previous: dict
+    """
+    rewards = logger.episodes.sums
+    last = rewards[-max(1, len(rewards) // 10):]
+    reward = float(np.mean(last)) if len(last) else 0.
+    evaluation = float(np.mean(logger.evaluations)) if logger.evaluations else None
+
+    scores = dict(previous["scores"]) if previous is not None else dict()
+    scores[str(episodes)] = reward if evaluation is None else evaluation
+
+    return {"name": job["name"],
+            "log_dir": job["log_dir"],
+            "agent": job["agent"]["class"].__name__,
+            "network": Sweep.get_network_name(job),
+            "optimizer": job["optimizer"]["class"].__name__,
+            "memory": job["memory"]["class"].__name__,
+            "param": {key: {k: str(v) for k, v in job[key]["param"].items()} for key in
+                      ["agent", "network", "optimizer", "memory"]},
+            "episodes": episodes,
+            "reward": reward,
+            "evaluation": evaluation,
+            "scores": scores,
+            "seconds": seconds,
+            "checkpoint": "checkpoint-" + str(episodes) + ".p",
+            "replay": "memory-" + str(episodes) + ".p"}
+
+
+def save_checkpoint(agent, log_dir, summary):
+    """ Save agent with agent.save and its memory with pickle in files named by summary, each file is written in a
+    temporary file then renamed
+
+    :param agent: trained agent of job
+    :type agent: DQN
+    :param log_dir: log_dir of job
+    :type log_dir: str
+    :param summary: summary return by get_summary
+    :type summary: dict
+    """
+    agent.save(file_name=summary["checkpoint"] + ".tmp", dire_name=log_dir)
+    os.replace(os.path.join(log_dir, summary["checkpoint"] + ".tmp"), os.path.join(log_dir, summary["checkpoint"]))
+
+    with open(os.path.join(log_dir, summary["replay"] + ".tmp"), "wb") as file:
+        pickle.dump(agent.memory, file)
+    os.replace(os.path.join(log_dir, summary["replay"] + ".tmp"), os.path.join(log_dir, summary["replay"]))
+
+
+def run_job(job, environment, max_episode, nb_evaluation, device=None):
+    """ Train agent of job until max_episode episodes, save it and write its completion marker
+
+    Job which has a completion marker continue from the checkpoint of marker, a log_dir without marker is removed
+    and job start from scratch.
+
+    :param job: job return by Sweep.expand_grid
+    :type job: dict
+    :param environment: name of gym environment or gym.Env
+    :param max_episode: number of episode of job at the end of this run
+    :type max_episode: int
+    :param nb_evaluation: number of evaluation during this run
+    :type nb_evaluation: int
+    :param device: torch device to run agent
+    :type device: torch.device
+    :return: summary of job
+    """
+    log_dir = job["log_dir"]
+    previous = read_summary(log_dir)
+    if previous is not None and previous["episodes"] >= max_episode:
+        return previous
+
+    env = Trainer.get_environment(environment)
+    agent = get_agent(job, env.observation_space, env.action_space, device=device)
+    if previous is None:
+        shutil.rmtree(log_dir, ignore_errors=True)
+        episodes, seconds = 0, 0.
+    else:
+        with open(os.path.join(log_dir, previous["replay"]), "rb") as file:
+            agent.memory = pickle.load(file)
+        agent.load_checkpoint(file_name=previous["checkpoint"], dire_name=log_dir)
+        episodes, seconds = previous["episodes"], previous["seconds"]
+
+    start = time.time()
+    trainer = Trainer(environment=env, agent=agent, log_dir=log_dir)
+    trainer.logger.start_episode = episodes
+    trainer.train(max_episode=max_episode - episodes, render=False, nb_evaluation=nb_evaluation, progress_bar=False)
+
+    summary = get_summary(job, trainer.logger, max_episode, seconds + time.time() - start, previous)
+    save_checkpoint(agent, log_dir, summary)
+    agent.save(file_name="save.p", dire_name=log_dir)
+    write_json(os.path.join(log_dir, Sweep.marker), summary)
+
+    if previous is not None:
+        for name in [previous["checkpoint"], previous["replay"]]:
+            os.remove(os.path.join(log_dir, name))
+    return summary
+
+
+def _init_worker(num_threads):
+    """ Limit torch threads of worker process
+
+    :param num_threads: number of torch threads
+    :type num_threads: int
+    """
+    torch.set_num_threads(num_threads)
+
+
+def _run_job(arguments):
+    return run_job(*arguments)
+
+
+class Sweep:
+    marker = "result.json"
+    index = "index.json"
+
+    def __init__(self, grid, environment, log_dir=".", max_episode=300, nb_evaluation=None, num_workers=None,
+                 num_threads=1, device=None, min_episode=None, reduction_factor=3):
+        """ Run all configurations of grid in a pool of processes
+
+        With min_episode, configurations are run by successive halving from 'Massively Parallel Hyperparameter
+        Tuning' in https://arxiv.org/pdf/1810.05934.pdf: all configurations are trained min_episode episodes, then
+        the best 1 / reduction_factor continue until min_episode * reduction_factor episodes and so on until
+        max_episode. Configurations are ranked by their mean evaluation reward of the last rung, agents are saved
+        between rungs and continue where they stopped.
+
+        :param grid: list of dict like arg_all of results/result.py, each dict give lists of classes and params of
+            "agent", "network", "optimizer" and "memory", "dueling" run each configuration with and without
+            SimpleDuelingNetwork
+        :type grid: list
+        :param environment: name of gym environment or gym.Env
+        :param log_dir: directory where each job has its own log_dir
+        :type log_dir: str
+        :param max_episode: number of episode for train each job
+        :type max_episode: int
+        :param nb_evaluation: number of evaluation during max_episode episodes, split between rungs, default
+            max_episode / 10
+        :type nb_evaluation: int
+        :param num_workers: number of processes, default number of cpu / num_threads, 0 run jobs in this process
+        :type num_workers: int
+        :param num_threads: number of torch threads of each process
+        :type num_threads: int
+        :param device: torch device to run agents
+        :type device: torch.device
+        :param min_episode: number of episode of first rung, None train all configurations max_episode episodes
+        :type min_episode: int
+        :param reduction_factor: ratio of episodes between two rungs and of configurations stopped at each rung
+        :type reduction_factor: int
+        """
+        if not isinstance(num_threads, int) or num_threads < 1:
+            raise ValueError("num_threads need to be int >= 1 not " + str(num_threads))
+        if num_workers is None:
+            num_workers = max(1, (os.cpu_count() or 1) // num_threads)
+        if not isinstance(num_workers, int) or num_workers < 0:
+            raise ValueError("num_workers need to be int >= 0 not " + str(num_workers))
+        if min_episode is not None and (not isinstance(min_episode, int) or not 1 <= min_episode <= max_episode):
+            raise ValueError("min_episode need to be int in range [1, max_episode] not " + str(min_episode))
+        if not isinstance(reduction_factor, int) or reduction_factor < 2:
+            raise ValueError("reduction_factor need to be int >= 2 not " + str(reduction_factor))
+
+        self.environment = environment
+        self.log_dir = log_dir
+        self.max_episode = max_episode
+        self.nb_evaluation = int(max_episode / 10) if nb_evaluation is None else nb_evaluation
+        self.num_workers = num_workers
+        self.num_threads = num_threads
+        self.device = device
+        self.min_episode = min_episode
+        self.reduction_factor = reduction_factor
+
+        self.jobs = self.expand_grid(grid, log_dir)
+
+    @classmethod
+    def expand_grid(cls, grid, log_dir="."):
+        """ Return one job by configuration of grid, job is a dict with class and param of "agent", "network",
+        "optimizer" and "memory", "dueling", "name" and "log_dir"
+
+        :param grid: list of dict like arg_all of results/result.py
+        :type grid: list
+        :param log_dir: directory where each job has its own log_dir
+        :type log_dir: str
+        """
+        keys = ["agent", "network", "optimizer", "memory"]
+        jobs = []
+        for arg in grid:
+            duelings = [False, True] if arg.get("dueling", False) else [False]
+            classes = [arg[key]["class"] for key in keys]
+            params = [list(dict_mzip(arg[key]["param"])) for key in keys]
+            for values in mzip(*classes, *params, duelings):
+                job = {key: {"class": c, "param": p} for key, c, p in zip(keys, values[:4], values[4:8])}
+                job["dueling"] = values[8]
+                job["name"] = cls.get_name(job)
+                job["log_dir"] = os.path.join(log_dir, job["name"])
+                jobs.append(job)
+        return jobs
+
+    @staticmethod
+    def get_network_name(job):
+        """ Return name of network class of job
+
+        :param job:
+        :type job: dict
+        """
+        return SimpleDuelingNetwork.__name__ if job["dueling"] else job["network"]["class"].__name__
+
+    @classmethod
+    def get_name(cls, job):
+        """ Return name of job, same as log_dir of results/result.py without environment
+
+        :param job:
+        :type job: dict
+        """
+        def join(param):
+            return "_".join([str(x) for x in param.values()])
+
+        return job["agent"]["class"].__name__ + "/" + join(job["agent"]["param"]) + "_" + cls.get_network_name(
+            job) + "_" + join(job["network"]["param"]) + "_" + job["optimizer"]["class"].__name__ + "_" + join(
+            job["optimizer"]["param"]) + "_" + job["memory"]["class"].__name__ + "_" + join(job["memory"]["param"])
+
+    @staticmethod
+    def estimate_cost(job):
+        """ Return relative cost of job, number of trained samples by step batch_size / step_train
+
+        :param job:
+        :type job: dict
+        """
+        param = job["agent"]["param"]
+        return param.get("batch_size", 32) / param.get("step_train", 1)
+
+    def get_rungs(self):
+        """ Return number of episodes of jobs at the end of each rung
+        """
+        if self.min_episode is None:
+            return [self.max_episode]
+        rungs = []
+        episodes = self.min_episode
+        while episodes < self.max_episode:
+            rungs.append(episodes)
+            episodes *= self.reduction_factor
+        return rungs + [self.max_episode]
+
+    def promote(self, jobs, summaries, episodes):
+        """ Return best 1 / reduction_factor jobs by their score at the end of rung, at least one
+
+        :param jobs: jobs of rung
+        :type jobs: list
+        :param summaries: summary of each job by name
+        :type summaries: dict
+        :param episodes: number of episodes of rung
+        :type episodes: int
+        """
+        jobs = sorted(jobs, key=lambda job: (-summaries[job["name"]]["scores"][str(episodes)], job["name"]))
+        return jobs[:max(1, len(jobs) // self.reduction_factor)]
+
+    def run(self):
+        """ Run jobs rung by rung, jobs already done are read from their completion marker, and write index of
+        summaries of all jobs after each job
+
+        :return: list of summaries of jobs
+        """
+        os.makedirs(self.log_dir, exist_ok=True)
+        summaries = {}
+        pool = None
+        if self.num_workers > 0:
+            pool = mp.get_context("spawn").Pool(min(self.num_workers, len(self.jobs)), initializer=_init_worker,
+                                                initargs=(self.num_threads,))
+        try:
+            jobs = self.jobs
+            previous = 0
+            rungs = self.get_rungs()
+            for i, episodes in enumerate(rungs):
+                nb_evaluation = 0
+                if self.nb_evaluation > 0:
+                    nb_evaluation = max(1, round(self.nb_evaluation * (episodes - previous) / self.max_episode))
+                self.run_rung(jobs, episodes, nb_evaluation, summaries, pool)
+                if i + 1 < len(rungs):
+                    jobs = self.promote(jobs, summaries, episodes)
+                previous = episodes
+            if pool is not None:
+                pool.close()
+        except BaseException:
+            if pool is not None:
+                pool.terminate()
+            raise
+        finally:
+            if pool is not None:
+                pool.join()
+
+        return [summaries[name] for name in sorted(summaries)]
+
+    def run_rung(self, jobs, episodes, nb_evaluation, summaries, pool=None):
+        """ Train jobs until episodes, most costly first so all processes finish together
+
+        :param jobs: jobs of rung
+        :type jobs: list
+        :param episodes: number of episodes of jobs at the end of rung
+        :type episodes: int
+        :param nb_evaluation: number of evaluation of each job during rung
+        :type nb_evaluation: int
+        :param summaries: summary of each job by name, updated with summaries of jobs
+        :type summaries: dict
+        :param pool: pool where jobs are run, None run jobs in this process
+        :type pool: multiprocessing.Pool
+        """
+        todo = []
+        for job in jobs:
+            summary = read_summary(job["log_dir"])
+            if summary is not None and summary["episodes"] >= episodes:
+                summaries[job["name"]] = summary
+            else:
+                todo.append(job)
+        self.write_index(summaries)
+
+        todo = sorted(todo, key=self.estimate_cost, reverse=True)
+        arguments = [(job, self.environment, episodes, nb_evaluation, self.device) for job in todo]
+        results = map(_run_job, arguments) if pool is None else pool.imap_unordered(_run_job, arguments,
+                                                                                   chunksize=1)
+        for summary in results:
+            summaries[summary["name"]] = summary
+            self.write_index(summaries)
+
+    def write_index(self, summaries):
+        """ Write summaries of jobs in log_dir/index.json, sorted by number of episodes then score of last rung
+
+        :param summaries: summary of each job by name
+        :type summaries: dict
+        """
+        def key(summary):
+            return summary["episodes"], summary["scores"][str(summary["episodes"])]
+
+        write_json(os.path.join(self.log_dir, self.index), sorted(summaries.values(), key=key, reverse=True))
@@ -1,28 +1,124 @@
+import os
+import queue
+import random
 import sys
+import threading
 import time
+import warnings
 from argparse import ArgumentParser
+from copy import deepcopy
 
 import gym
-import matplotlib.pyplot as plt
-from tqdm.auto import tqdm
-from IPython import display
+import numpy as np
+import torch
 
 from blobrl import Logger, Record
-from blobrl.agents import AgentInterface, AgentRandom, DQN, DoubleDQN, CategoricalDQN
+from blobrl.agents import AgentInterface, AgentRandom, DQN, DoubleDQN, CategoricalDQN, DRQN
+from blobrl.checkpointer import Checkpointer
+from blobrl.evaluator import AsyncEvaluator
+from blobrl.flattener import split_batch
+from blobrl.recorder import Recorder
+from blobrl.wrappers import TerminalObservation, ActionRepeat, FrameStack
 
 
 class Trainer:
-    def __init__(self, environment, agent, log_dir="./runs"):
+    # minimum seconds between two computations of throughput
+    throughput_interval = 1.0
+
+    def __init__(self, environment, agent, log_dir="./runs", num_envs=1, asynchronous=False, evaluation_workers=0,
+                 evaluation_episodes=1, actor_learner=False, policy_update=10, queue_size=16, replay_ratio=1.,
+                 recorder=None, checkpoint_dir=None, checkpoint_steps=10000, checkpoint_keep=3, checkpoint_memory=False,
+                 wrappers=None):
         """
 
         :param environment:
         :param agent:
         :param log_dir:
+        :param num_envs: number of environments run together during training, more than 1 use gym.vector
+        :type num_envs: int
+        :param asynchronous: if environments are run in subprocesses with gym.vector.AsyncVectorEnv, else
+            gym.vector.SyncVectorEnv
+        :type asynchronous: bool
+        :param evaluation_workers: number of processes where evaluations run while training continue, 0 evaluate in
+            the training process
+        :type evaluation_workers: int
+        :param evaluation_episodes: number of episodes by evaluation run in parallel by evaluation_workers
+        :type evaluation_episodes: int
+        :param actor_learner: if environment is run by an actor thread with a copy of agent while a learner thread
+            train agent, else agent learn after each step
+        :type actor_learner: bool
+        :param policy_update: number of learner updates between two copies of agent weights in policy of actor
+        :type policy_update: int
+        :param queue_size: maximum number of transitions waiting for the learner, actor wait when it is reached
+        :type queue_size: int
+        :param replay_ratio: number of learner updates by step_train transitions received from the actor
+        :type replay_ratio: float
+        :param recorder: recorder which grab frames when environment is rendered, instead of showing each step
+        :type recorder: Recorder
+        :param checkpoint_dir: directory where checkpoints are written during training, None for no checkpoint
+        :type checkpoint_dir: str
+        :param checkpoint_steps: number of environment steps between two checkpoints, written at the end of episode
+        :type checkpoint_steps: int
+        :param checkpoint_keep: number of newest checkpoints kept in checkpoint_dir
+        :type checkpoint_keep: int
+        :param checkpoint_memory: if memory of agent is in checkpoints
+        :type checkpoint_memory: bool
+        :param wrappers: list of functions which take environment and return it wrapped, applied in order on training,
+            vector and evaluation environments, like blobrl.wrappers ActionRepeat, GrayResize and FrameStack
+        :type wrappers: list
         """
-        self.environment = self.get_environment(environment)
+        if not isinstance(num_envs, int) or num_envs < 1:
+            raise ValueError("num_envs need to be int >= 1 not " + str(num_envs))
+        if not isinstance(evaluation_workers, int) or evaluation_workers < 0:
+            raise ValueError("evaluation_workers need to be int >= 0 not " + str(evaluation_workers))
+        if actor_learner and num_envs > 1:
+            raise ValueError("actor_learner support only one environment, not " + str(num_envs))
+        if not isinstance(policy_update, int) or policy_update < 1:
+            raise ValueError("policy_update need to be int >= 1 not " + str(policy_update))
+        if not isinstance(queue_size, int) or queue_size < 1:
+            raise ValueError("queue_size need to be int >= 1 not " + str(queue_size))
+        if not isinstance(replay_ratio, (int, float)) or replay_ratio <= 0:
+            raise ValueError("replay_ratio need to be number > 0 not " + str(replay_ratio))
+        if recorder is not None and not isinstance(recorder, Recorder):
+            raise TypeError("recorder need to be instance of blobrl.Recorder, not :" + str(type(recorder)))
+        if not isinstance(checkpoint_steps, int) or checkpoint_steps < 1:
+            raise ValueError("checkpoint_steps need to be int >= 1 not " + str(checkpoint_steps))
+
+        if wrappers is not None and any(not callable(wrapper) for wrapper in wrappers):
+            raise TypeError("wrappers need to be list of callable, not " + str(wrappers))
+
+        self.wrappers = [] if wrappers is None else list(wrappers)
+        self.environment = self.wrap(self.get_environment(environment), self.wrappers)
+        self.environment_argument = environment if isinstance(environment, str) and not self.wrappers else \
+            self.environment
+        self.num_envs = num_envs
+        self.asynchronous = asynchronous
+        self.vector_environment = None
+        if num_envs > 1:
+            self.vector_environment = self.get_vector_environment(self.environment_argument, num_envs, asynchronous)
+        self.episode_records = [[] for _ in range(num_envs)]
+
+        self.evaluation_workers = evaluation_workers
+        self.evaluation_episodes = evaluation_episodes
+        self.evaluator = None
+
+        self.actor_learner = actor_learner
+        self.policy_update = policy_update
+        self.queue_size = queue_size
+        self.replay_ratio = replay_ratio
+        self.policy_weights = None
+        self.policy_loaded = None
+        self.learner_error = None
+        self.recorder = recorder
+        self.learner_lock = threading.Lock()
+        self.checkpointer = None
+        if checkpoint_dir is not None:
+            self.checkpointer = Checkpointer(checkpoint_dir, keep=checkpoint_keep)
+        self.checkpoint_steps = checkpoint_steps
+        self.checkpoint_memory = checkpoint_memory
         if isinstance(agent, type(AgentInterface)):
-            action_space = self.get_environment(environment).action_space
-            observation_space = self.get_environment(environment).observation_space
+            action_space = self.environment.action_space
+            observation_space = self.environment.observation_space
             self.agent = agent(observation_space=observation_space, action_space=action_space)
         elif isinstance(agent, AgentInterface):
             import warnings
@@ -33,6 +129,17 @@ class Trainer:
 
         self.logger = Logger(log_dir=log_dir)
 
+        self.steps = 0
+        self.max_steps = None
+        self.max_seconds = None
+        self.evaluation_steps = None
+        self.start_steps = 0
+        self.start_time = time.time()
+        self.throughput = dict()
+        self.throughput_last = None
+        self.first_episode = 0
+        self.resumed = None
+
     @classmethod
     def get_environment(cls, arg_env):
         """
@@ -48,7 +155,42 @@ class Trainer:
 
         raise ValueError("this env (" + str(arg_env) + ") is not supported")
 
-    def do_step(self, observation, learn=True, logger=None, render=True):
+    @staticmethod
+    def wrap(environment, wrappers):
+        """ Return environment wrapped by each function of wrappers in order
+
+        :param environment:
+        :type environment: gym.Env
+        :param wrappers: list of functions which take environment and return it wrapped
+        :type wrappers: list
+        """
+        for wrapper in wrappers:
+            environment = wrapper(environment)
+        return environment
+
+    @classmethod
+    def get_vector_environment(cls, arg_env, num_envs, asynchronous=False):
+        """ Return gym.vector environment of num_envs environments, each is a copy of arg_env if it is a gym.Env
+
+        :param arg_env:
+        :param num_envs: number of environments
+        :type num_envs: int
+        :param asynchronous: if AsyncVectorEnv else SyncVectorEnv
+        :type asynchronous: bool
+        """
+        environment = cls.get_environment(arg_env)
+
+        def make_environment():
+            if isinstance(arg_env, str):
+                return TerminalObservation(gym.make(arg_env))
+            return TerminalObservation(deepcopy(environment))
+
+        environment_fns = [make_environment] * num_envs
+        if asynchronous:
+            return gym.vector.AsyncVectorEnv(environment_fns)
+        return gym.vector.SyncVectorEnv(environment_fns)
+
+    def do_step(self, observation, learn=True, logger=None, render=True, agent=None):
         """
 
 
@@ -57,20 +199,61 @@ class Trainer:
         :param logger:
         :param render: if show env render
         :type render: bool
+        :param agent: agent which choose action, default self.agent
+        :type agent: AgentInterface
         :return:
         """
+        if agent is None:
+            agent = self.agent
         if render:
             self.render()
-        action = self.agent.get_action(observation=observation)
+        action = agent.get_action(observation=observation)
         next_observation, reward, done, info = self.environment.step(action)
         if learn:
-            self.agent.learn(observation, action, reward, next_observation, done)
+            agent.learn(observation, action, reward, next_observation, done)
+            self.steps += 1
         if logger:
             logger.add_steps(Record(reward))
         return next_observation, done, reward
 
-    def do_episode(self, logger=None, render=True):
+    def do_vector_step(self, observations, logger=None):
+        """ Do one step on all environments of vector_environment, agent learn from the batch of transitions
+
+        gym.vector reset done environments, next observation used to learn is the last one of the episode.
+
+        :param observations: observations batched by gym.vector
+        :param logger:
+        :return: next observations, number of finished episodes
         """
+        actions = self.agent.get_actions(observations)
+        next_observations, rewards, dones, infos = self.vector_environment.step(actions)
+
+        last_observations = next_observations
+        if dones.any():
+            last_observations = split_batch(self.environment.observation_space, next_observations)
+            for i in np.flatnonzero(dones):
+                last_observations[i] = infos[i]["terminal_observation"]
+
+        rewards = rewards.tolist()
+        dones = dones.tolist()
+        self.agent.learn_batch(observations, actions, rewards, last_observations, dones)
+        self.steps += len(dones)
+
+        finished = 0
+        for i, (reward, done) in enumerate(zip(rewards, dones)):
+            self.episode_records[i].append(Record(reward))
+            if done:
+                finished += 1
+                self.agent.episode_finished()
+                if logger:
+                    for record in self.episode_records[i]:
+                        logger.add_steps(record)
+                    logger.end_episode()
+                self.episode_records[i] = []
+        return next_observations, finished
+
+    def do_episode(self, logger=None, render=True):
+        """ Run one training episode, it is stopped before its end if max_steps or max_seconds of train is reached
 
         :param logger:
         :param render: if show env render
@@ -79,33 +262,44 @@ class Trainer:
         self.agent.enable_exploration()
         observation = self.environment.reset()
         done = False
-        while not done:
+        while not done and not self.is_budget_reached():
             observation, done, reward = self.do_step(observation=observation,
                                                      learn=True, logger=logger, render=render)
         self.agent.episode_finished()
         if logger:
             logger.end_episode()
 
-    def evaluate(self, logger=None, render=True):
+    def evaluate(self, logger=None, render=True, agent=None):
         """
 
         :param logger:
         :param render: if show env render
         :type render: bool
+        :param agent: agent to evaluate, default self.agent
+        :type agent: AgentInterface
         """
-        self.agent.disable_exploration()
+        if agent is None:
+            agent = self.agent
+        agent.disable_exploration()
         observation = self.environment.reset()
         done = False
         while not done:
             observation, done, reward = self.do_step(observation=observation,
-                                                     learn=False, logger=logger, render=render)
+                                                     learn=False, logger=logger, render=render, agent=agent)
         if logger:
             logger.evaluate()
 
-    def train(self, max_episode=1000, nb_evaluation=4, render=True, progress_bar=True):
+    def train(self, max_episode=1000, nb_evaluation=4, render=True, progress_bar=True, max_steps=None,
+              max_seconds=None, evaluation_steps=None):
         """
         Star train on *max_episode* episode.
 
+        Training stop after max_episode episodes, or at the step where max_steps or max_seconds is reached, the
+        current episode is then stopped, with num_envs > 1 all environments do their last step so at most
+        num_envs - 1 steps more are done. Agent is evaluated one last time if training is stopped before
+        max_episode. Steps, updates and samples trained by second are shown in progress bar and logged as
+        Throughput/ in TensorBoard.
+
         :param max_episode: maximum episode to train agent
         :type max_episode: int
         :param nb_evaluation: number of time where we test agent without training
@@ -114,26 +308,481 @@ class Trainer:
         :type render: bool
         :param progress_bar: show or not progress bar of training
         :type progress_bar: bool
+        :param max_steps: maximum environment steps to train agent, None for no limit
+        :type max_steps: int
+        :param max_seconds: maximum duration of training in seconds, None for no limit
+        :type max_seconds: float
+        :param evaluation_steps: number of environment steps between two evaluations, replace nb_evaluation
+        :type evaluation_steps: int
         """
+        if max_steps is not None and (not isinstance(max_steps, int) or max_steps < 1):
+            raise ValueError("max_steps need to be int >= 1 not " + str(max_steps))
+        if max_seconds is not None and (not isinstance(max_seconds, (int, float)) or max_seconds <= 0):
+            raise ValueError("max_seconds need to be number > 0 not " + str(max_seconds))
+        if evaluation_steps is not None and (not isinstance(evaluation_steps, int) or evaluation_steps < 1):
+            raise ValueError("evaluation_steps need to be int >= 1 not " + str(evaluation_steps))
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+        self.evaluation_steps = evaluation_steps
+        self.start_steps = self.steps
+        self.start_time = time.time()
+        self.first_episode = 0
+        random_state = None
+        if self.resumed is not None:
+            self.start_steps -= self.resumed["train_steps"]
+            self.start_time -= self.resumed["seconds"]
+            self.first_episode = self.resumed["i_episode"]
+            random_state = self.resumed["random_state"]
+            self.resumed = None
+        self.throughput_last = (self.start_time, self.steps, self.agent.updates, self.agent.samples)
 
         self.environment.reset()
-        for i_episode in tqdm(range(1, max_episode + 1), disable=not progress_bar):
-            self.do_episode(logger=self.logger, render=render)
-            if nb_evaluation > 0:
-                if nb_evaluation <= 1:
-                    if i_episode == max_episode:
-                        self.evaluate(logger=self.logger, render=render)
-
-                elif i_episode == 1 or i_episode == max_episode or i_episode % int(
-                        max_episode // (nb_evaluation - 1)) == 0:
-                    self.evaluate(logger=self.logger, render=render)
+        if random_state is not None:
+            self.set_random_state(random_state)
+        if self.evaluation_workers > 0:
+            self.evaluator = AsyncEvaluator(self.environment_argument, self.agent, num_workers=self.evaluation_workers,
+                                            num_episodes=self.evaluation_episodes)
+        if self.vector_environment is not None:
+            self.train_vector(max_episode=max_episode, nb_evaluation=nb_evaluation, render=render,
+                              progress_bar=progress_bar)
+        elif self.actor_learner:
+            self.train_actor_learner(max_episode=max_episode, nb_evaluation=nb_evaluation, render=render,
+                                     progress_bar=progress_bar)
+        else:
+            with self.get_progress_bar(max_episode, progress_bar) as bar:
+                i_episode = self.first_episode
+                finished = self.is_finished(i_episode, max_episode)
+                while not finished:
+                    steps = self.steps
+                    self.do_episode(logger=self.logger, render=render)
+                    i_episode += 1
+                    finished = self.is_finished(i_episode, max_episode)
+                    self.update_progress(bar, i_episode)
+                    self.log_evaluations()
+                    if self.is_evaluation(i_episode - 1, i_episode, max_episode, nb_evaluation, steps, finished):
+                        self.do_evaluation(render=render)
+                    self.do_checkpoint(i_episode, steps, finished)
+        self.log_throughput(force=True)
+        self.max_steps = None
+        self.max_seconds = None
         self.close()
 
+    def train_vector(self, max_episode=1000, nb_evaluation=4, render=True, progress_bar=True):
+        """ Train on *max_episode* episodes finished by all environments of vector_environment, only evaluations
+        are rendered
+
+        :param max_episode: maximum episode to train agent
+        :type max_episode: int
+        :param nb_evaluation: number of time where we test agent without training
+        :type nb_evaluation: int
+        :param render: if show env render during evaluations
+        :type render: bool
+        :param progress_bar: show or not progress bar of training
+        :type progress_bar: bool
+        """
+        if self.vector_environment.closed:
+            self.vector_environment = self.get_vector_environment(self.environment, self.num_envs, self.asynchronous)
+
+        self.agent.enable_exploration()
+        observations = self.vector_environment.reset()
+        self.episode_records = [[] for _ in range(self.num_envs)]
+
+        with self.get_progress_bar(max_episode, progress_bar) as bar:
+            i_episode = self.first_episode
+            finished = self.is_finished(i_episode, max_episode)
+            while not finished:
+                steps = self.steps
+                observations, episodes = self.do_vector_step(observations, logger=self.logger)
+                previous_episode = i_episode
+                i_episode = min(i_episode + episodes, max_episode)
+                finished = self.is_finished(i_episode, max_episode)
+                self.update_progress(bar, i_episode)
+                self.log_evaluations()
+                if self.is_evaluation(previous_episode, i_episode, max_episode, nb_evaluation, steps, finished):
+                    self.do_evaluation(render=render)
+                    self.agent.enable_exploration()
+                self.do_checkpoint(i_episode, steps, finished)
+
+    def train_actor_learner(self, max_episode=1000, nb_evaluation=4, render=True, progress_bar=True):
+        """ Train on *max_episode* episodes, environment is run in this thread by a policy from agent.get_policy()
+        while a learner thread train agent
+
+        Transitions are sent to the learner by a queue of queue_size transitions, the learner store them with
+        agent.remember and train agent with agent.update, replay_ratio times by step_train transitions. Weights of
+        agent are copied every policy_update updates and loaded in policy by the actor, threads never wait for each
+        other except when queue is full.
+
+        :param max_episode: maximum episode to train agent
+        :type max_episode: int
+        :param nb_evaluation: number of time where we test agent without training
+        :type nb_evaluation: int
+        :param render: if show env render
+        :type render: bool
+        :param progress_bar: show or not progress bar of training
+        :type progress_bar: bool
+        """
+        policy = self.agent.get_policy()
+        transitions = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        self.policy_weights = None
+        self.policy_loaded = None
+        self.learner_error = None
+        learner = threading.Thread(target=self.do_learner, args=(self.agent, transitions, stop), daemon=True)
+        learner.start()
+        try:
+            with self.get_progress_bar(max_episode, progress_bar) as bar:
+                i_episode = self.first_episode
+                finished = self.is_finished(i_episode, max_episode)
+                while not finished:
+                    steps = self.steps
+                    self.do_actor_episode(policy, transitions, logger=self.logger, render=render)
+                    i_episode += 1
+                    finished = self.is_finished(i_episode, max_episode)
+                    self.update_progress(bar, i_episode)
+                    self.log_evaluations()
+                    if self.is_evaluation(i_episode - 1, i_episode, max_episode, nb_evaluation, steps, finished):
+                        self.do_evaluation(render=render, agent=policy)
+                    self.do_checkpoint(i_episode, steps, finished, transitions)
+        finally:
+            stop.set()
+            learner.join()
+        if self.learner_error is not None:
+            raise self.learner_error
+
+    def do_actor_episode(self, policy, transitions, logger=None, render=True):
+        """ Run one episode with policy and send its transitions to the learner, it is stopped before its end if
+        max_steps or max_seconds of train is reached
+
+        :param policy: agent return by agent.get_policy()
+        :type policy: AgentInterface
+        :param transitions: queue of transitions read by the learner
+        :type transitions: queue.Queue
+        :param logger:
+        :param render: if show env render
+        :type render: bool
+        """
+        policy.enable_exploration()
+        observation = self.environment.reset()
+        done = False
+        while not done and not self.is_budget_reached():
+            weights = self.policy_weights
+            self.agent.sync_policy(policy, weights if weights is not self.policy_loaded else None)
+            self.policy_loaded = weights
+            if render:
+                self.render()
+            action = policy.get_action(observation=observation)
+            next_observation, reward, done, info = self.environment.step(action)
+            self.steps += 1
+
+            while True:
+                if self.learner_error is not None:
+                    raise self.learner_error
+                try:
+                    transitions.put((observation, action, reward, next_observation, done), timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+            if logger:
+                logger.add_steps(Record(reward))
+            observation = next_observation
+        policy.episode_finished()
+        if logger:
+            logger.end_episode()
+
+    def do_learner(self, agent, transitions, stop):
+        """ Train agent until stop is set, then store last transitions
+
+        Each loop store at most one transition of the actor with agent.remember, so the actor is at most
+        queue_size transitions ahead of the learner, and each transition give replay_ratio / step_train updates to
+        do, so agent is not trained more than transitions allow when the actor is slow. Updates to do are kept while
+        agent.update don't train agent, like before batch_size transitions. A copy of agent weights is published in
+        policy_weights every policy_update updates.
+
+        :param agent: agent trained
+        :type agent: AgentInterface
+        :param transitions: queue of transitions sent by the actor
+        :type transitions: queue.Queue
+        :param stop: set when the actor is finished
+        :type stop: threading.Event
+        """
+        updates = 0
+        pending_updates = 0.
+        step_train = getattr(agent, "step_train", 1)
+        try:
+            while not stop.is_set():
+                with self.learner_lock:
+                    try:
+                        agent.remember(*transitions.get_nowait())
+                        pending_updates += self.replay_ratio / step_train
+                        received = True
+                    except queue.Empty:
+                        received = False
+                    updated = pending_updates >= 1 and agent.update()
+                    if updated:
+                        pending_updates -= 1
+
+                if updated:
+                    updates += 1
+                    if updates % self.policy_update == 0:
+                        self.policy_weights = {key: value.detach().clone() for key, value in
+                                               agent.state_dict().items()}
+                elif not received:
+                    stop.wait(0.001)
+
+            with self.learner_lock:
+                while not transitions.empty():
+                    agent.remember(*transitions.get_nowait())
+        except Exception as error:
+            self.learner_error = error
+
+    def do_evaluation(self, render=True, agent=None):
+        """ Evaluate agent with evaluator in worker processes if there is one, else with evaluate
+
+        :param render: if show env render, only when agent is evaluated in training process
+        :type render: bool
+        :param agent: agent to evaluate, default self.agent
+        :type agent: AgentInterface
+        """
+        if agent is None:
+            agent = self.agent
+        if self.evaluator is not None:
+            self.evaluator.submit(agent, self.logger, self.logger.start_episode + self.logger.num_episodes)
+        else:
+            self.evaluate(logger=self.logger, render=render, agent=agent)
+
+    def log_evaluations(self):
+        """ Log evaluations done by evaluator workers since last call, logger is only written by this thread
+        """
+        if self.evaluator is not None:
+            self.evaluator.log_finished()
+
+    def do_checkpoint(self, i_episode, previous_steps, finished=False, transitions=None):
+        """ Give a checkpoint to checkpointer if steps reach a multiple of checkpoint_steps since previous_steps or
+        if training is finished
+
+        Checkpoint is a copy of agent, steps and progress of training taken in this thread, it is written by the
+        background thread of checkpointer. With actor_learner, transitions waiting for the learner are stored in
+        agent before the copy.
+
+        :param i_episode: number of episodes done since training start
+        :type i_episode: int
+        :param previous_steps: value of steps before the episodes
+        :type previous_steps: int
+        :param finished: if training is finished
+        :type finished: bool
+        :param transitions: queue of transitions read by the learner
+        :type transitions: queue.Queue
+        """
+        if self.checkpointer is None:
+            return
+        if not finished and self.steps // self.checkpoint_steps <= previous_steps // self.checkpoint_steps:
+            return
+        with self.learner_lock:
+            while transitions is not None and not transitions.empty():
+                self.agent.remember(*transitions.get_nowait())
+            checkpoint = {"agent": self.agent.get_checkpoint(memory=self.checkpoint_memory),
+                          "steps": self.steps,
+                          "episode": self.logger.start_episode + self.logger.num_episodes,
+                          "i_episode": i_episode,
+                          "train_steps": self.steps - self.start_steps,
+                          "seconds": time.time() - self.start_time,
+                          "random_state": self.get_random_state()}
+        self.checkpointer.save(checkpoint, self.steps)
+
+    def get_random_state(self):
+        """ Return states of random generators of python, numpy, torch and environment, used by checkpoints
+
+        Generators of environments of vector_environment are in other processes and are not saved.
+        """
+        random_state = {"python": random.getstate(), "numpy": np.random.get_state(), "torch": torch.get_rng_state(),
+                        "cuda": torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None}
+        for key, generator in self.get_environment_generators().items():
+            random_state[key] = generator.get_state()
+        return random_state
+
+    def set_random_state(self, random_state):
+        """ Restore states of random generators returned by get_random_state
+
+        :param random_state: states returned by get_random_state
+        :type random_state: dict
+        """
+        random.setstate(random_state["python"])
+        np.random.set_state(random_state["numpy"])
+        torch.set_rng_state(random_state["torch"])
+        if random_state["cuda"] is not None and torch.cuda.is_available():
+            torch.cuda.set_rng_state_all(random_state["cuda"])
+        for key, generator in self.get_environment_generators().items():
+            if key in random_state:
+                generator.set_state(random_state[key])
+
+    def get_environment_generators(self):
+        """ Return numpy generators of environment and of its spaces
+        """
+        generators = {}
+        for key, owner in [("environment", self.environment.unwrapped),
+                           ("action_space", self.environment.action_space),
+                           ("observation_space", self.environment.observation_space)]:
+            generator = getattr(owner, "np_random", None)
+            if isinstance(generator, np.random.RandomState):
+                generators[key] = generator
+        return generators
+
+    def resume(self, path):
+        """ Load checkpoint written during training, next call of train continue where it stopped with same
+        max_episode, max_steps and max_seconds
+
+        Agent need to be created with same classes than agent of checkpoint. States of random generators of python,
+        numpy, torch and environment are restored when train start, so resumed training is the same than without
+        interruption only if checkpoint contain memory of agent (checkpoint_memory) and if training don't use
+        actor_learner, num_envs or evaluation_workers. A warning is given if agent memory is not in checkpoint,
+        agent then continue with its current memory.
+
+        :param path: checkpoint file, or directory where newest checkpoint is loaded
+        :type path: str
+        :return: path of loaded checkpoint
+        """
+        if os.path.isdir(path):
+            directory, path = path, Checkpointer.get_latest(path)
+            if path is None:
+                raise FileNotFoundError("no checkpoint in " + str(directory))
+        checkpoint = torch.load(path, weights_only=False)
+
+        if getattr(self.agent, "memory", None) is not None and "memory" not in checkpoint["agent"]:
+            warnings.warn("checkpoint " + str(path) + " don't contain agent memory, training continue with current "
+                          "memory and is not the same than without interruption, use checkpoint_memory=True")
+        self.agent.set_checkpoint(checkpoint["agent"])
+        self.steps = checkpoint["steps"]
+        self.logger.start_episode = checkpoint["episode"] - self.logger.num_episodes
+        self.resumed = {key: checkpoint[key] for key in ["i_episode", "train_steps", "seconds"]}
+        self.resumed["random_state"] = checkpoint.get("random_state")
+        return path
+
+    @staticmethod
+    def is_evaluation_episode(i_episode, max_episode, nb_evaluation):
+        """ Return True if agent is evaluated after episode i_episode
+
+        :param i_episode: number of episode from 1
+        :type i_episode: int
+        :param max_episode: maximum episode to train agent
+        :type max_episode: int
+        :param nb_evaluation: number of time where we test agent without training
+        :type nb_evaluation: int
+        """
+        if nb_evaluation <= 0:
+            return False
+        if nb_evaluation <= 1:
+            return i_episode == max_episode
+        return i_episode == 1 or i_episode == max_episode or i_episode % int(max_episode // (nb_evaluation - 1)) == 0
+
+    def is_finished(self, i_episode, max_episode):
+        """ Return True if training reach max_episode episodes, max_steps steps or max_seconds seconds
+
+        :param i_episode: number of episodes done since training start
+        :type i_episode: int
+        :param max_episode: maximum episode to train agent
+        :type max_episode: int
+        """
+        return i_episode >= max_episode or self.is_budget_reached()
+
+    def is_budget_reached(self):
+        """ Return True if training reach max_steps steps or max_seconds seconds, checked after each step
+        """
+        if self.max_steps is not None and self.steps - self.start_steps >= self.max_steps:
+            return True
+        return self.max_seconds is not None and time.time() - self.start_time >= self.max_seconds
+
+    def is_evaluation(self, previous_episode, i_episode, max_episode, nb_evaluation, previous_steps, finished=False):
+        """ Return True if agent is evaluated after episodes previous_episode + 1 to i_episode, each evaluation_steps
+        steps if it is set, else like is_evaluation_episode, and at the end if training is stopped before max_episode
+
+        :param previous_episode: number of episodes done before
+        :type previous_episode: int
+        :param i_episode: number of episodes done
+        :type i_episode: int
+        :param max_episode: maximum episode to train agent
+        :type max_episode: int
+        :param nb_evaluation: number of time where we test agent without training
+        :type nb_evaluation: int
+        :param previous_steps: value of steps before the episodes
+        :type previous_steps: int
+        :param finished: if training is finished
+        :type finished: bool
+        """
+        if self.evaluation_steps is not None:
+            if finished and i_episode < max_episode:
+                return True
+            return (self.steps - self.start_steps) // self.evaluation_steps > (
+                    previous_steps - self.start_steps) // self.evaluation_steps
+        if finished and i_episode < max_episode:
+            return nb_evaluation > 0
+        return any(self.is_evaluation_episode(i, max_episode, nb_evaluation) for i in
+                   range(previous_episode + 1, i_episode + 1))
+
+    def get_progress_bar(self, max_episode, progress_bar=True):
+        """ Return progress bar of training, in steps if max_steps is set else in episodes
+
+        :param max_episode: maximum episode to train agent
+        :type max_episode: int
+        :param progress_bar: show or not progress bar
+        :type progress_bar: bool
+        """
+        from tqdm.auto import tqdm
+
+        if self.max_steps is not None:
+            return tqdm(total=self.max_steps, unit="step", disable=not progress_bar)
+        return tqdm(total=max_episode, unit="episode", disable=not progress_bar)
+
+    def update_progress(self, bar, i_episode):
+        """ Move progress bar to i_episode or to steps done and show throughput
+
+        :param bar: progress bar return by get_progress_bar
+        :type bar: tqdm
+        :param i_episode: number of episodes done since training start
+        :type i_episode: int
+        """
+        if self.max_steps is not None:
+            bar.update(min(self.steps - self.start_steps, self.max_steps) - bar.n)
+        else:
+            bar.update(i_episode - bar.n)
+        self.log_throughput(bar)
+
+    def log_throughput(self, bar=None, force=False):
+        """ Compute steps, updates and samples trained by second since last call, at most each throughput_interval
+        seconds, log them in TensorBoard and show them in bar
+
+        :param bar: progress bar
+        :type bar: tqdm
+        :param force: compute throughput even if last one is recent
+        :type force: bool
+        """
+        now = time.time()
+        last_time, last_steps, last_updates, last_samples = self.throughput_last
+        if now - last_time < self.throughput_interval and not (force and now > last_time):
+            return
+        duration = now - last_time
+        self.throughput = {"steps_per_second": (self.steps - last_steps) / duration,
+                           "updates_per_second": (self.agent.updates - last_updates) / duration,
+                           "samples_per_second": (self.agent.samples - last_samples) / duration}
+        self.throughput_last = (now, self.steps, self.agent.updates, self.agent.samples)
+
+        for key, value in self.throughput.items():
+            self.logger.summary_writer.add_scalar("Throughput/" + key, value, global_step=self.steps)
+        if bar is not None:
+            bar.set_postfix({key: int(value) for key, value in self.throughput.items()})
+
     def render(self):
-        """ Show the environment
+        """ Show the environment, or give it to recorder if there is one
 
         :return:
         """
+        if self.recorder is not None:
+            self.recorder.record(self.environment)
+            return
+        import matplotlib.pyplot as plt
+        from IPython import display
+
         if 'inline' in plt.get_backend():
             pub_thread = sys.stdout.pub_thread
             try:
@@ -161,6 +810,15 @@ class Trainer:
         :return:
         """
         self.environment.close()
+        if self.vector_environment is not None:
+            self.vector_environment.close()
+        if self.evaluator is not None:
+            self.evaluator.close()
+            self.evaluator = None
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.checkpointer is not None:
+            self.checkpointer.close()
         if hasattr(self, 'img'):
             delattr(self, 'img')
 
@@ -179,6 +837,8 @@ def arg_to_agent(arg_agent) -> AgentInterface:
         return DoubleDQN
     if arg_agent == "categorical_dqn":
         return CategoricalDQN
+    if arg_agent == "drqn":
+        return DRQN
     raise ValueError("this agent (" + str(arg_agent) + ") is not implemented")
 
 
@@ -189,7 +849,41 @@ if __name__ == '__main__':
     parser.add_argument('--max_episode', type=int, help='number of episode to train', nargs='?', const=1, default=100)
     parser.add_argument('--render', type=bool, help='if show render on each step or not', nargs='?', const=1,
                         default=False)
+    parser.add_argument('--num_envs', type=int, help='number of environments run together', nargs='?', const=1,
+                        default=1)
+    parser.add_argument('--actor_learner', type=bool, help='if environment and training run in two threads',
+                        nargs='?', const=1, default=False)
+    parser.add_argument('--replay_ratio', type=float, help='number of learner updates by step_train transitions',
+                        nargs='?', const=1, default=1.)
+    parser.add_argument('--evaluation_workers', type=int, help='number of processes where evaluations run', nargs='?',
+                        const=1, default=0)
+    parser.add_argument('--max_steps', type=int, help='maximum environment steps to train', nargs='?', const=1,
+                        default=None)
+    parser.add_argument('--max_seconds', type=float, help='maximum duration of training in seconds', nargs='?',
+                        const=1, default=None)
+    parser.add_argument('--checkpoint_dir', type=str, help='directory where checkpoints are written', nargs='?',
+                        const=1, default=None)
+    parser.add_argument('--resume', type=bool, help='if training continue from last checkpoint of checkpoint_dir',
+                        nargs='?', const=1, default=False)
+    parser.add_argument('--action_repeat', type=int, help='number of steps by action', nargs='?', const=1,
+                        default=1)
+    parser.add_argument('--frame_stack', type=int, help='number of observations stacked', nargs='?', const=1,
+                        default=1)
+    parser.add_argument('--record', type=str, help='gif or video file where rendered frames are written', nargs='?',
+                        const=1, default=None)
     args = parser.parse_args()
 
-    trainer = Trainer(environment=args.env, agent=arg_to_agent(args.agent))
-    trainer.train(max_episode=args.max_episode, render=args.render)
+    wrappers = []
+    if args.action_repeat > 1:
+        wrappers.append(lambda env: ActionRepeat(env, repeat=args.action_repeat))
+    if args.frame_stack > 1:
+        wrappers.append(lambda env: FrameStack(env, num_stack=args.frame_stack))
+    recorder = None if args.record is None else Recorder(file_name=args.record, frame_skip=2)
+    trainer = Trainer(environment=args.env, agent=arg_to_agent(args.agent), num_envs=args.num_envs,
+                      evaluation_workers=args.evaluation_workers, actor_learner=args.actor_learner,
+                      replay_ratio=args.replay_ratio, recorder=recorder, checkpoint_dir=args.checkpoint_dir,
+                      wrappers=wrappers)
+    if args.resume:
+        trainer.resume(args.checkpoint_dir)
+    trainer.train(max_episode=args.max_episode, render=args.render or recorder is not None, max_steps=args.max_steps,
+                  max_seconds=args.max_seconds)
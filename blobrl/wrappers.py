@@ -0,0 +1,181 @@
+from collections import deque
+
+import gym
+import numpy as np
+import torch
+import torch.nn.functional as F
+from gym.spaces import Box
+
+# weights of red, green and blue in gray images, ITU-R 601
+GRAY_WEIGHTS = torch.tensor([0.299, 0.587, 0.114])
+
+
+class TerminalObservation(gym.Wrapper):
+    """ Keep last observation of episode in info["terminal_observation"], gym.vector reset environment on done and
+    return first observation of next episode
+    """
+
+    def step(self, action):
+        """
+
+        :param action:
+        :return: observation, reward, done, info
+        """
+        observation, reward, done, info = self.env.step(action)
+        if done:
+            info = dict(info) if isinstance(info, dict) else {}
+            info["terminal_observation"] = observation
+        return observation, reward, done, info
+
+
+class ActionRepeat(gym.Wrapper):
+    def __init__(self, env, repeat=4, max_pool=True):
+        """ Repeat each action repeat times, so agent choose an action every repeat frames
+
+        Rewards of repeated steps are summed, repeat stop at the end of episode. With max_pool, observation is the
+        maximum of the last two frames, which remove flickering of Atari like environments.
+
+        :param env:
+        :type env: gym.Env
+        :param repeat: number of steps by action
+        :type repeat: int
+        :param max_pool: if observation is maximum of the last two frames
+        :type max_pool: bool
+        """
+        if not isinstance(repeat, int) or repeat < 1:
+            raise ValueError("repeat need to be int >= 1 not " + str(repeat))
+        super().__init__(env)
+        self.repeat = repeat
+        self.max_pool = max_pool and repeat > 1
+        self.frames = None
+
+    def step(self, action):
+        """
+
+        :param action:
+        :return: observation, sum of rewards, done, info of last step
+        """
+        total_reward = 0.
+        for i in range(self.repeat):
+            observation, reward, done, info = self.env.step(action)
+            total_reward += reward
+            if self.max_pool and i >= self.repeat - 2:
+                if self.frames is None:
+                    self.frames = np.empty((2,) + np.shape(observation), dtype=np.asarray(observation).dtype)
+                self.frames[i - self.repeat + 2] = observation
+            if done:
+                break
+        if self.max_pool and i == self.repeat - 1:
+            observation = np.maximum(self.frames[0], self.frames[1], out=np.empty_like(self.frames[0]))
+        return observation, total_reward, done, info
+
+
+class GrayResize(gym.ObservationWrapper):
+    def __init__(self, env, shape=(84, 84), grayscale=True):
+        """ Convert image observations (H, W, 3) in gray and resize them with area interpolation
+
+        :param env:
+        :type env: gym.Env
+        :param shape: (height, width) of observations, None keep size of env
+        :type shape: tuple
+        :param grayscale: if observations are converted in (height, width) gray images
+        :type grayscale: bool
+        """
+        super().__init__(env)
+        space = env.observation_space
+        if not isinstance(space, Box) or len(space.shape) != 3:
+            raise TypeError("observation_space need to be Box of images (H, W, C), not " + str(space))
+        if shape is not None and (len(shape) != 2 or any(not isinstance(s, int) or s < 1 for s in shape)):
+            raise ValueError("shape need to be (height, width) of int >= 1 not " + str(shape))
+
+        self.shape = tuple(space.shape[:2]) if shape is None else tuple(shape)
+        self.grayscale = grayscale
+        observation_shape = self.shape if grayscale else self.shape + space.shape[2:]
+        self.observation_space = Box(low=0, high=255, shape=observation_shape, dtype=np.uint8)
+
+    def observation(self, observation):
+        """
+
+        :param observation: image (H, W, C)
+        :return: uint8 image (height, width) if grayscale else (height, width, C)
+        """
+        image = torch.as_tensor(np.asarray(observation, dtype=np.float32))
+        if self.grayscale:
+            image = (image[..., :3] @ GRAY_WEIGHTS).unsqueeze(-1)
+        if tuple(image.shape[:2]) != self.shape:
+            image = F.interpolate(image.permute(2, 0, 1).unsqueeze(0), size=self.shape, mode="area")
+            image = image.squeeze(0).permute(1, 2, 0)
+        image = image.round_().clamp_(0, 255).to(torch.uint8).numpy()
+        return image[..., 0] if self.grayscale else image
+
+
+class LazyFrames:
+    def __init__(self, frames):
+        """ Stack of frames on last axis built only when it is converted in array, consecutive stacks share their
+        frames
+
+        :param frames: list of frames with same shape
+        :type frames: list
+        """
+        self.frames = tuple(frames)
+
+    @property
+    def shape(self):
+        return np.shape(self.frames[0]) + (len(self.frames),)
+
+    @property
+    def dtype(self):
+        return np.asarray(self.frames[0]).dtype
+
+    def __array__(self, dtype=None, copy=None):
+        array = np.stack(self.frames, axis=-1)
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, item):
+        return np.asarray(self)[item]
+
+
+class FrameStack(gym.Wrapper):
+    def __init__(self, env, num_stack=4):
+        """ Observation is the last num_stack observations stacked on last axis, first observation of episode is
+        repeated, observations are LazyFrames so frames are not copied in each stack
+
+        :param env:
+        :type env: gym.Env
+        :param num_stack: number of stacked observations
+        :type num_stack: int
+        """
+        if not isinstance(num_stack, int) or num_stack < 1:
+            raise ValueError("num_stack need to be int >= 1 not " + str(num_stack))
+        super().__init__(env)
+        space = env.observation_space
+        if not isinstance(space, Box):
+            raise TypeError("observation_space need to be Box, not " + str(space))
+        self.num_stack = num_stack
+        self.frames = deque(maxlen=num_stack)
+        self.observation_space = Box(low=np.repeat(space.low[..., np.newaxis], num_stack, axis=-1),
+                                     high=np.repeat(space.high[..., np.newaxis], num_stack, axis=-1),
+                                     dtype=space.dtype)
+
+    def reset(self, **kwargs):
+        """
+
+        :return: first observation repeated num_stack times
+        """
+        observation = self.env.reset(**kwargs)
+        for _ in range(self.num_stack):
+            self.frames.append(observation)
+        return LazyFrames(self.frames)
+
+    def step(self, action):
+        """
+
+        :param action:
+        :return: observation, reward, done, info
+        """
+        observation, reward, done, info = self.env.step(action)
+        self.frames.append(observation)
+        return LazyFrames(self.frames), reward, done, info
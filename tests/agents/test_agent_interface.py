@@ -97,6 +97,12 @@ class TestAgentInterface:
             if torch.cuda.is_available():
                 self.agent(o, a, torch.device("cuda"))
 
+    def test_remember_update(self):
+        for o, a in self.list_work:
+            agent = self.agent(o, a, None)
+            agent.remember(o.sample(), a.sample(), 0, o.sample(), False)
+            assert not agent.update()
+
     def test__str__(self):
 
         pass
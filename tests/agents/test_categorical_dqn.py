@@ -1,3 +1,7 @@
+import os
+
+import torch
+
 from blobrl.agents import CategoricalDQN
 from blobrl.networks import C51Network
 
@@ -17,3 +21,26 @@ class TestCategorical_DQN(TestDQN):
                 agent.step) + "-" + str(agent.batch_size) + "-" + str(agent.gamma) + "-" + str(agent.loss) + "-" + str(
                 agent.optimizer) + "-" + str(agent.greedy_exploration) + "-" + str(agent.num_atoms) + "-" + str(
                 agent.r_min) + "-" + str(agent.r_max) + "-" + str(agent.delta_z) + "-" + str(agent.z) == agent.__str__()
+
+    def test_num_atoms(self):
+        for o, a in self.list_work:
+            agent = self.agent(o, a, num_atoms=11)
+
+            assert agent.num_atoms == 11 == agent.network.num_atoms
+            assert agent.z.shape == (11,)
+            agent.get_action(o.sample())
+
+    def test_save_load_num_atoms(self):
+        for o, a in self.list_work[:3]:
+            agent = self.agent(o, a, num_atoms=11, r_min=-2, r_max=5)
+            agent.save(file_name="deed.pt")
+            agent_l = self.agent.load(file_name="deed.pt")
+            os.remove("deed.pt")
+
+            assert isinstance(agent_l, CategoricalDQN)
+            assert agent_l.num_atoms == 11 == agent_l.network.num_atoms
+            assert agent_l.r_min == -2 and agent_l.r_max == 5
+            assert torch.equal(agent.z, agent_l.z)
+            for x, y in zip(agent.network.state_dict().values(), agent_l.network.state_dict().values()):
+                assert torch.equal(x, y)
+            agent_l.get_action(o.sample())
@@ -1,7 +1,12 @@
+import os
+from copy import deepcopy
+
+import numpy as np
+import torch
 from blobrl.agents import DoubleDQN
 from tests.agents import TestDQN
-from gym.spaces import flatten
-from blobrl.memories import ExperienceReplay
+from gym.spaces import flatten, Discrete, Box
+from blobrl.memories import ExperienceReplay, PrioritizedReplay
 
 
 class TestDouble_DQN(TestDQN):
@@ -17,6 +22,92 @@ class TestDouble_DQN(TestDQN):
             for i in range(20):
                 agent.learn(o.sample(), a.sample(), 0, o.sample(), False)
 
+    def test_learn_batch_copy(self):
+        for o, a in self.list_work:
+            agent = self.agent(observation_space=o, action_space=a, step_copy=3)
+
+            for i in range(3):
+                agent.learn_batch([o.sample(), o.sample()], [a.sample(), a.sample()], [0, 0],
+                                  [o.sample(), o.sample()], [False, False])
+            for p, t in zip(agent.network.parameters(), agent.network_target.parameters()):
+                assert torch.equal(p, t)
+
+    def test_update_copy(self):
+        for o, a in self.list_work:
+            agent = self.agent(observation_space=o, action_space=a, step_copy=3, batch_size=2)
+
+            for i in range(3):
+                agent.remember(o.sample(), a.sample(), 1, o.sample(), False)
+            assert agent.update() and agent.step_copied == 3
+            for p, t in zip(agent.network.parameters(), agent.network_target.parameters()):
+                assert torch.equal(p, t)
+
+            assert agent.update() and agent.step_copied == 3
+            assert not all(torch.equal(p, t) for p, t in zip(agent.network.parameters(),
+                                                             agent.network_target.parameters()))
+
+    def test_load_checkpoint_target(self):
+        for o, a in self.list_work[:3]:
+            agent = self.agent(observation_space=o, action_space=a, step_copy=10, batch_size=2)
+            for i in range(12):
+                agent.remember(o.sample(), a.sample(), 1.0, o.sample(), False)
+            assert agent.update() and agent.update() and agent.step_copied == 12
+            agent.save(file_name="deed.pt")
+
+            agent_l = self.agent(observation_space=o, action_space=a, step_copy=10, batch_size=2)
+            agent_l.load_checkpoint(file_name="deed.pt")
+            agent_loaded = self.agent.load(file_name="deed.pt")
+            os.remove("deed.pt")
+
+            assert agent_l.step_copied == agent_loaded.step_copied == 12
+            assert agent_l.step == agent_loaded.step == 12
+            assert agent_loaded.step_copy == 10
+            for x, y, z in zip(agent.network_target.state_dict().values(), agent_l.network_target.state_dict().values(),
+                               agent_loaded.network_target.state_dict().values()):
+                assert torch.equal(x, y) and torch.equal(x, z)
+            assert not all(torch.equal(x, y) for x, y in zip(agent_l.network.state_dict().values(),
+                                                             agent_l.network_target.state_dict().values()))
+
+            for i in range(8):
+                agent_loaded.remember(o.sample(), a.sample(), 1.0, o.sample(), False)
+            assert agent_loaded.update() and agent_loaded.step_copied == 20
+
+    def test_priorities_double_target(self):
+        o, a = Box(-1, 1, shape=(3,)), Discrete(4)
+        agent = self.agent(o, a, memory=PrioritizedReplay(max_size=16, alpha=1., epsilon=0.), batch_size=8,
+                           gamma=0.9)
+        for p in agent.network_target.parameters():
+            p.data.normal_()
+
+        observations = [o.sample() for _ in range(8)]
+        actions = [a.sample() for _ in range(8)]
+        next_observations = [o.sample() for _ in range(8)]
+        rewards, dones = [1.] * 8, [False] * 7 + [True]
+        with torch.no_grad():
+            q = agent.network(torch.as_tensor(np.array(observations), dtype=torch.float32))
+            q_next = agent.network(torch.as_tensor(np.array(next_observations), dtype=torch.float32))
+            q_target = agent.network_target(torch.as_tensor(np.array(next_observations), dtype=torch.float32))
+        target = 1. + 0.9 * q_target.gather(1, q_next.argmax(dim=1, keepdim=True)).squeeze(1) * torch.tensor(
+            [1.] * 7 + [0.])
+        expected = (target - q.gather(1, torch.tensor(actions).view(-1, 1)).squeeze(1)).abs()
+        priorities = agent.get_priorities(observations, actions, rewards, next_observations, dones)
+        assert np.allclose(priorities, expected.numpy(), atol=1e-5)
+
+        agent.remember_batch(observations, actions, rewards, next_observations, dones, priorities)
+        before = deepcopy(agent)
+        agent.train()
+        indices = agent.memory.indices
+        errors = before.td_errors(*[torch.as_tensor(x) for x in [
+            before.memory.observations[indices], before.memory.actions[indices], before.memory.rewards[indices],
+            before.memory.next_observations[indices], before.memory.dones[indices]]])
+        assert np.allclose(agent.memory.tree[indices + agent.memory.capacity], errors.numpy(), atol=1e-5)
+
+    def test_get_policy(self):
+        super().test_get_policy()
+        for o, a in self.list_work:
+            agent = self.agent(o, a)
+            assert agent.get_policy().network_target is None and agent.network_target is not None
+
     def test__str__(self):
         for o, a in self.list_work:
             agent = self.agent(o, a)
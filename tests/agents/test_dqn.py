@@ -4,10 +4,11 @@ import torch
 from gym.spaces import Discrete, Box, MultiBinary, MultiDiscrete, Dict, Tuple, flatten
 import torch.optim as optim
 
-from blobrl.agents import DQN
-from blobrl.explorations import Greedy, EpsilonGreedy
-from blobrl.memories import ExperienceReplay
-from blobrl.networks import SimpleNetwork
+from blobrl.agents import DQN, DoubleDQN
+from blobrl.explorations import Greedy, EpsilonGreedy, NoisyExploration, RandomNetworkDistillation, \
+    IntrinsicCuriosityModule, Boltzmann
+from blobrl.memories import ExperienceReplay, PrioritizedReplay
+from blobrl.networks import SimpleNetwork, NoisyLinear
 
 from tests.agents import TestAgentInterface
 
@@ -79,13 +80,42 @@ class TestDQN(TestAgentInterface):
     def test_get_action(self):
         for o, a in self.list_work:
             assert 1
-            for ge in [Greedy(), EpsilonGreedy(1.)]:
+            for ge in [Greedy(), EpsilonGreedy(1.), Boltzmann()]:
                 agent = self.agent(o, a, greedy_exploration=ge)
 
                 for i in range(20):
                     act = agent.get_action(o.sample())
                     if isinstance(a, Discrete):
                         assert act in range(a.n)
+                    else:
+                        assert a.contains(act)
+
+    def test_noisy_exploration(self):
+        for o, a in self.list_work:
+            agent = self.agent(o, a, greedy_exploration=NoisyExploration())
+            layers = [m for m in agent.network.modules() if isinstance(m, NoisyLinear)]
+            agent.get_action(o.sample())
+
+            agent.disable_exploration()
+            assert all(not layer.noisy for layer in layers)
+            agent.get_action(o.sample())
+
+            agent.enable_exploration()
+            assert all(layer.noisy for layer in layers)
+
+    def test_intrinsic_reward(self):
+        for o, a in self.list_work:
+            for exploration in [RandomNetworkDistillation(o), IntrinsicCuriosityModule(o, a)]:
+                agent = self.agent(o, a, greedy_exploration=exploration)
+                optimized = set(id(p) for group in agent.optimizer.param_groups for p in group["params"])
+                trained = [p for p in exploration.parameters() if p.requires_grad]
+                assert all(id(p) in optimized for p in trained)
+                assert all(id(p) not in optimized for p in exploration.parameters() if not p.requires_grad)
+
+                parameters = [p.clone() for p in trained]
+                for i in range(20):
+                    agent.learn(o.sample(), a.sample(), 0, o.sample(), False)
+                assert any(not torch.equal(p, c) for p, c in zip(trained, parameters))
 
     def test_learn(self):
         for o, a in self.list_work:
@@ -97,11 +127,142 @@ class TestDQN(TestAgentInterface):
             for i in range(20):
                 agent.learn(o.sample(), a.sample(), 0, o.sample(), False)
 
+    def test_learn_batch(self):
+        for o, a in self.list_work:
+            agent = self.agent(o, a, greedy_exploration=EpsilonGreedy(0.5))
+
+            observations = [o.sample() for _ in range(4)]
+            actions = agent.get_actions(observations)
+            assert len(actions) == 4
+            assert all(a.contains(action) for action in actions)
+
+            agent.disable_exploration()
+            assert all(a.contains(action) for action in agent.get_actions(observations))
+            agent.enable_exploration()
+
+            agent.learn_batch(observations, actions, [0.] * 4, [o.sample() for _ in range(4)], [False] * 3 + [True])
+            assert agent.step == 4
+
+    def test_remember_update(self):
+        for o, a in self.list_work:
+            agent = self.agent(o, a, batch_size=4)
+
+            for i in range(4):
+                assert not agent.update()
+                agent.remember(o.sample(), a.sample(), 0, o.sample(), False)
+                assert agent.step == i + 1
+            assert agent.update()
+
+            policy = agent.get_policy()
+            agent.sync_policy(policy)
+            assert policy.step == agent.step
+
+    def test_priorities(self):
+        for o, a in self.list_work:
+            agent = self.agent(o, a, memory=PrioritizedReplay(max_size=10), batch_size=4)
+
+            observations = [o.sample() for _ in range(5)]
+            actions = [a.sample() for _ in range(5)]
+            next_observations = [o.sample() for _ in range(5)]
+            priorities = agent.get_priorities(observations, actions, [1.] * 5, next_observations, [False] * 4 + [True])
+            assert priorities.shape == (5,) and (priorities >= 0).all()
+
+            agent.remember_batch(observations, actions, [1.] * 5, next_observations, [False] * 4 + [True], priorities)
+            assert agent.step == 5 and len(agent.memory) == 5
+            probabilities = agent.memory.get_probabilities()
+            assert abs(probabilities.sum() - 1) < 1e-6
+
+            agent.train()
+            assert len(agent.memory.indices) == 4
+
+    def test_get_loss(self):
+        agent = self.agent(Discrete(3), Discrete(4))
+        q_predict, q = torch.tensor([1., 2., 3.]), torch.tensor([2., 2., 1.])
+        assert torch.isclose(agent.get_loss(q_predict, q), torch.tensor(5. / 3))
+        assert torch.isclose(agent.get_loss(q_predict, q, torch.tensor([1., 0.5, 0.25])), torch.tensor(2. / 3))
+        assert agent.loss.reduction == "mean"
+
+    def test_get_policy(self):
+        for o, a in self.list_work:
+            agent = self.agent(o, a)
+            policy = agent.get_policy()
+            assert policy.memory is None and policy.optimizer is None
+            assert policy.network is not agent.network
+
+            with torch.no_grad():
+                for p in agent.network.parameters():
+                    p.add_(1.)
+            assert not all(torch.equal(p, q) for p, q in zip(agent.network.parameters(),
+                                                             policy.network.parameters()))
+
+            policy.load_state_dict(agent.state_dict())
+            for p, q in zip(agent.network.parameters(), policy.network.parameters()):
+                assert torch.equal(p, q)
+
+            policy.disable_exploration()
+            assert a.contains(policy.get_action(o.sample()))
+            assert agent.with_exploration
+
     def test_episode_finished(self):
         for o, a in self.list_work:
             agent = self.agent(observation_space=o, action_space=a)
             agent.episode_finished()
 
+    def test_load_checkpoint(self):
+        for o, a in self.list_work[:3]:
+            agent = self.agent(observation_space=o, action_space=a, batch_size=2,
+                               greedy_exploration=EpsilonGreedy(0.2))
+            for i in range(12):
+                agent.learn(o.sample(), a.sample(), 1.0, o.sample(), False)
+            assert agent.updates > 0 and agent.samples >= agent.updates
+            agent.save(file_name="deed.pt")
+
+            agent_l = self.agent(observation_space=o, action_space=a, memory=agent.memory, batch_size=2)
+            agent_l.load_checkpoint(file_name="deed.pt")
+            os.remove("deed.pt")
+
+            assert agent_l.step == agent.step
+            assert agent_l.greedy_exploration.epsilon == 0.2
+            for x, y in zip(agent.network.state_dict().values(), agent_l.network.state_dict().values()):
+                assert torch.equal(x, y)
+            assert agent_l.optimizer.state_dict()["state"].keys() == agent.optimizer.state_dict()["state"].keys()
+
+            weights = [p.clone() for p in agent_l.network.parameters()]
+            for i in range(12):
+                agent_l.learn(o.sample(), a.sample(), 1.0, o.sample(), False)
+            assert any(not torch.equal(x, y) for x, y in zip(weights, agent_l.network.parameters()))
+
+            with pytest.raises(FileNotFoundError):
+                agent_l.load_checkpoint(file_name="deed.pt")
+
+    def test_get_checkpoint(self):
+        for o, a in self.list_work[:3]:
+            agent = self.agent(observation_space=o, action_space=a, batch_size=2,
+                               greedy_exploration=EpsilonGreedy(0.2))
+            for i in range(12):
+                agent.learn(o.sample(), a.sample(), 1.0, o.sample(), False)
+            checkpoint = agent.get_checkpoint()
+            assert "memory" not in checkpoint
+            checkpoint = agent.get_checkpoint(memory=True)
+            assert checkpoint["memory"] is not agent.memory
+
+            weights = [p.clone() for p in agent.network.parameters()]
+            for i in range(12):
+                agent.learn(o.sample(), a.sample(), 1.0, o.sample(), False)
+            for x, y in zip(weights, checkpoint["network"].values()):
+                assert torch.equal(x, y)
+
+            agent_l = self.agent(observation_space=o, action_space=a, batch_size=2)
+            agent_l.set_checkpoint(checkpoint)
+            assert agent_l.step == 12
+            assert agent_l.greedy_exploration.epsilon == 0.2
+            assert agent_l.memory is checkpoint["memory"]
+            for x, y in zip(weights, agent_l.network.parameters()):
+                assert torch.equal(x, y)
+            if hasattr(agent_l, "network_target"):
+                for x, y in zip(checkpoint["network_target"].values(), agent_l.network_target.state_dict().values()):
+                    assert torch.equal(x, y)
+
     def test_agent_save_load(self):
         for o, a in self.list_work:
             agent = self.agent(observation_space=o, action_space=a)
@@ -205,3 +366,31 @@ class TestDQN(TestAgentInterface):
                 agent.network) + "-" + str(agent.memory) + "-" + str(agent.step_train) + "-" + str(
                 agent.step) + "-" + str(agent.batch_size) + "-" + str(agent.gamma) + "-" + str(agent.loss) + "-" + str(
                 agent.optimizer) + "-" + str(agent.greedy_exploration) == agent.__str__()
+
+
+def test_dqn_noisy_network():
+    agent = DQN(Discrete(3), Discrete(4), greedy_exploration=NoisyExploration())
+    assert any(isinstance(m, NoisyLinear) for m in agent.network.modules())
+
+    agent.disable_exploration()
+    observation = agent.observation_space.sample()
+    assert len(set(agent.get_action(observation) for _ in range(10))) == 1
+
+    for i in range(20):
+        agent.learn(Discrete(3).sample(), Discrete(4).sample(), 0, Discrete(3).sample(), False)
+
+
+def test_dqn_noisy_save_load(tmp_path):
+    for agent_class in [DQN, DoubleDQN]:
+        agent = agent_class(Discrete(3), Discrete(4), greedy_exploration=NoisyExploration(), batch_size=2)
+        agent.save(file_name="noisy.pt", dire_name=str(tmp_path))
+        agent_l = agent_class.load(file_name="noisy.pt", dire_name=str(tmp_path))
+
+        assert any(isinstance(m, NoisyLinear) for m in agent_l.network.modules())
+        for x, y in zip(agent.network.state_dict().values(), agent_l.network.state_dict().values()):
+            assert torch.equal(x, y)
+
+        weights = [p.clone() for p in agent_l.network.parameters()]
+        for i in range(10):
+            agent_l.learn(Discrete(3).sample(), Discrete(4).sample(), 1.0, Discrete(3).sample(), False)
+        assert any(not torch.equal(x, y) for x, y in zip(weights, agent_l.network.parameters()))
@@ -0,0 +1,184 @@
+import os
+
+import pytest
+import torch
+from gym.spaces import Discrete
+
+from blobrl.agents import DRQN
+from blobrl.explorations import EpsilonGreedy, Greedy
+from blobrl.memories import ExperienceReplay, SequenceReplay
+from blobrl.networks import RecurrentNetwork, SimpleNetwork
+from tests.agents import TestDQN
+
+
+class ScaledRecurrentNetwork(RecurrentNetwork):
+    def __init__(self, observation_space, action_space, scale=2.):
+        super().__init__(observation_space, action_space, linear_dim=8, hidden_dim=12, cell="gru")
+        self.scale = scale
+
+    def forward(self, observation, hidden=None, lengths=None):
+        outputs, hidden = super().forward(observation, hidden, lengths)
+        return outputs * self.scale, hidden
+
+
+class TestDRQN(TestDQN):
+    agent = DRQN
+    network = RecurrentNetwork
+
+    def test_init(self):
+        super().test_init()
+
+        o, a = self.list_work[0]
+        with pytest.raises(TypeError):
+            self.agent(o, a, memory=ExperienceReplay())
+        with pytest.raises(TypeError):
+            self.agent(o, a, network=SimpleNetwork(o, a))
+        for burn_in in [-1, 4, 10]:
+            with pytest.raises(ValueError):
+                self.agent(o, a, memory=SequenceReplay(sequence_length=4), burn_in=burn_in)
+
+    def test_hidden(self):
+        for o, a in self.list_work:
+            agent = self.agent(o, a, greedy_exploration=EpsilonGreedy(1.))
+            assert agent.hidden is None
+
+            agent.get_action(o.sample())
+            hidden = agent.hidden
+            assert hidden is not None
+
+            agent.get_action(o.sample())
+            assert not torch.equal(hidden[0], agent.hidden[0])
+
+            agent.episode_finished()
+            assert agent.hidden is None
+
+    def test_priorities(self):
+        for o, a in self.list_work:
+            agent = self.agent(o, a)
+            priorities = agent.get_priorities([o.sample(), o.sample()], [a.sample(), a.sample()], [1., 0.],
+                                              [o.sample(), o.sample()], [False, True])
+            assert priorities.shape == (2,) and (priorities >= 0).all()
+
+    def test_learn(self):
+        for o, a in self.list_work:
+            for burn_in in [0, 2]:
+                network = self.network(o, a)
+                memory = SequenceReplay(max_size=10, sequence_length=4)
+
+                agent = self.agent(observation_space=o, action_space=a, memory=memory, network=network,
+                                   burn_in=burn_in, batch_size=8)
+
+                for i in range(20):
+                    agent.learn(o.sample(), a.sample(), 0, o.sample(), i % 7 == 0)
+
+    def test_learn_batch(self):
+        for o, a in self.list_work:
+            agent = self.agent(o, a, greedy_exploration=EpsilonGreedy(0.5))
+
+            actions = agent.get_actions([o.sample()])
+            assert len(actions) == 1
+            agent.learn_batch([o.sample()], actions, [0.], [o.sample()], [False])
+            assert agent.step == 1
+
+            with pytest.raises(ValueError):
+                agent.get_actions([o.sample(), o.sample()])
+            with pytest.raises(ValueError):
+                agent.learn_batch([o.sample()] * 2, [a.sample()] * 2, [0.] * 2, [o.sample()] * 2, [False] * 2)
+
+    def test_train_update(self):
+        o, a = Discrete(3), Discrete(2)
+        network = self.network(o, a, cell="gru")
+        agent = self.agent(o, a, memory=SequenceReplay(sequence_length=6), network=network, burn_in=2,
+                           step_train=100, greedy_exploration=Greedy())
+        for i in range(30):
+            agent.learn(o.sample(), a.sample(), 1., o.sample(), i % 10 == 9)
+
+        parameters = [p.detach().clone() for p in network.parameters()]
+        agent.train()
+        assert any(not torch.equal(p, n) for p, n in zip(parameters, network.parameters()))
+
+    def test_dqn_agent_episode_finished(self):
+        for o, a in self.list_work:
+            network = self.network(o, a)
+            memory = SequenceReplay(max_size=5)
+
+            agent = self.agent(o, a, memory, network=network)
+            agent.get_action(o.sample())
+            agent.episode_finished()
+            assert agent.hidden is None
+
+    def test_agent_save_load(self):
+        for o, a in self.list_work:
+            network = self.network(o, a)
+
+            agent = self.agent(observation_space=o, action_space=a, memory=SequenceReplay(sequence_length=6),
+                               network=network, burn_in=3,
+                               step_train=3, batch_size=12, gamma=0.50,
+                               optimizer=torch.optim.Adam(network.parameters()),
+                               greedy_exploration=EpsilonGreedy(0.2))
+
+            agent.save(file_name="deed.pt")
+            agent_l = self.agent.load(file_name="deed.pt")
+
+            os.remove("deed.pt")
+
+            assert agent.observation_space == agent_l.observation_space
+            assert a == agent_l.action_space
+            assert isinstance(agent_l, DRQN)
+            assert isinstance(agent.network, type(agent_l.network))
+            for a, b in zip(agent.network.state_dict().values(), agent_l.network.state_dict().values()):
+                assert torch.equal(a, b)
+            assert agent.burn_in == agent_l.burn_in
+            assert agent.memory.sequence_length == agent_l.memory.sequence_length
+            assert agent.step_train == agent_l.step_train
+            assert agent.batch_size == agent_l.batch_size
+            assert agent.gamma == agent_l.gamma
+
+            with pytest.raises(FileNotFoundError):
+                self.agent.load(file_name="deed.pt")
+
+    def test_save_load_network_arguments(self):
+        for o, a in self.list_work[:3]:
+            network = self.network(o, a, linear_dim=16, hidden_dim=24, cell="gru")
+            agent = self.agent(observation_space=o, action_space=a, network=network,
+                               memory=SequenceReplay(max_size=100, sequence_length=6), burn_in=2,
+                               optimizer=torch.optim.Adam(network.parameters()))
+            agent.save(file_name="deed.pt")
+            agent_l = self.agent.load(file_name="deed.pt")
+            os.remove("deed.pt")
+
+            assert agent_l.network.cell == "gru" and agent_l.network.hidden_dim == agent_l.network.last_dim == 24
+            assert agent_l.network.linear_dim == 16
+            assert agent_l.memory.max_size == 100 and agent_l.memory.sequence_length == 6
+            for x, y in zip(agent.network.state_dict().values(), agent_l.network.state_dict().values()):
+                assert torch.equal(x, y)
+
+            agent.save(file_name="deed.pt")
+            dict_save = torch.load("deed.pt")
+            del dict_save["network_object"]
+            torch.save(dict_save, "deed.pt")
+            agent_l = self.agent.load(file_name="deed.pt")
+            os.remove("deed.pt")
+            assert agent_l.network.cell == "gru" and agent_l.network.linear_dim == 16
+            for x, y in zip(agent.network.state_dict().values(), agent_l.network.state_dict().values()):
+                assert torch.equal(x, y)
+
+    def test_save_load_custom_network(self):
+        o, a = Discrete(3), Discrete(2)
+        agent = self.agent(observation_space=o, action_space=a, network=ScaledRecurrentNetwork(o, a, scale=3.))
+        agent.save(file_name="deed.pt")
+        agent_l = self.agent.load(file_name="deed.pt")
+        os.remove("deed.pt")
+
+        assert type(agent_l.network) is ScaledRecurrentNetwork and agent_l.network.scale == 3.
+        for x, y in zip(agent.network.state_dict().values(), agent_l.network.state_dict().values()):
+            assert torch.equal(x, y)
+
+    def test__str__(self):
+        for o, a in self.list_work:
+            agent = self.agent(o, a)
+
+            assert 'DRQN-' + str(agent.observation_space) + "-" + str(agent.action_space) + "-" + str(
+                agent.network) + "-" + str(agent.memory) + "-" + str(agent.step_train) + "-" + str(
+                agent.step) + "-" + str(agent.batch_size) + "-" + str(agent.gamma) + "-" + str(agent.loss) + "-" + str(
+                agent.optimizer) + "-" + str(agent.greedy_exploration) + "-" + str(agent.burn_in) == agent.__str__()
@@ -13,6 +13,16 @@ def test_adaptative_epsilon_greedy_step():
     exploration.be_greedy(5)
 
 
+def test_adaptative_epsilon_greedy_closed_form():
+    exploration = AdaptativeEpsilonGreedy(0.8, 0.1, 0.99)
+
+    for _ in range(10):
+        exploration.be_greedy(3)
+    assert exploration.get_epsilon(3) == 0.8 * 0.99 ** 3
+    assert exploration.get_epsilon(0) == 0.8
+    assert exploration.get_epsilon(10 ** 6) == 0.1
+
+
 def test__str__():
     explo = AdaptativeEpsilonGreedy(0.8, 0.1, 0.99)
 
@@ -0,0 +1,56 @@
+import pytest
+import torch
+
+from blobrl.explorations import Boltzmann
+
+
+def test_boltzmann_init():
+    Boltzmann()
+    with pytest.raises(ValueError):
+        Boltzmann([0, 10], [1.])
+    with pytest.raises(ValueError):
+        Boltzmann([], [])
+    with pytest.raises(ValueError):
+        Boltzmann([10, 0], [1., 0.1])
+    with pytest.raises(ValueError):
+        Boltzmann([0], [0.])
+
+
+def test_boltzmann_get_temperature():
+    exploration = Boltzmann([0, 100], [1., 0.1])
+
+    assert exploration.get_temperature(0) == 1.
+    assert exploration.get_temperature(50) == pytest.approx(0.55)
+    assert exploration.get_temperature(1000) == pytest.approx(0.1)
+
+
+def test_boltzmann_be_greedy():
+    exploration = Boltzmann()
+
+    assert exploration.be_greedy(0) is True
+    assert exploration.be_greedy_batch(0, 3).all()
+
+
+def test_boltzmann_choose_actions():
+    exploration = Boltzmann([0], [0.01])
+
+    values = torch.tensor([[0., 10., 0.], [10., 0., 0.]])
+    assert exploration.choose_actions(0, values).tolist() == [1, 0]
+
+    values = [[torch.tensor([[0., 10.]] * 4), torch.tensor([[0., 0., 10.]] * 4)], [torch.tensor([[10.]] * 4)]]
+    actions = exploration.choose_actions(0, values)
+    assert actions[0][0].tolist() == [1] * 4
+    assert actions[0][1].tolist() == [2] * 4
+    assert actions[1][0].tolist() == [0] * 4
+
+    exploration = Boltzmann([0], [1.])
+    actions = exploration.choose_actions(0, torch.zeros(1000, 3))
+    assert actions.shape == (1000,)
+    counts = torch.bincount(actions, minlength=3)
+    assert (counts > 250).all()
+
+
+def test__str__():
+    explo = Boltzmann()
+
+    assert 'Boltzmann-' + str(explo.steps) + '-' + str(explo.temperatures) == explo.__str__()
@@ -1,3 +1,5 @@
+import numpy as np
+
 from blobrl.explorations import EpsilonGreedy
 
 
@@ -5,3 +7,28 @@ def test_epsilon_greedy():
 	exploration = EpsilonGreedy(0.4)
 
 	exploration.be_greedy(0)
+
+
+def test_epsilon_greedy_batch():
+	exploration = EpsilonGreedy(0.4, seed=0)
+
+	mask = exploration.be_greedy_batch(0, 1000)
+	assert isinstance(mask, np.ndarray)
+	assert mask.dtype == bool
+	assert mask.shape == (1000,)
+	assert 0.5 < mask.mean() < 0.7
+
+	assert EpsilonGreedy(0., seed=0).be_greedy_batch(0, 10).all()
+	assert not EpsilonGreedy(1., seed=0).be_greedy_batch(0, 10).any()
+
+
+def test_epsilon_greedy_seed():
+	first = EpsilonGreedy(0.4, seed=1).be_greedy_batch(0, 100)
+	second = EpsilonGreedy(0.4, seed=1).be_greedy_batch(0, 100)
+	assert (first == second).all()
+
+
+def test__str__():
+	explo = EpsilonGreedy(0.4)
+
+	assert 'EpsilonGreedy-' + str(explo.epsilon) == explo.__str__()
@@ -11,3 +11,9 @@ def test__str__():
     explo = Greedy()
 
     assert 'Greedy' == explo.__str__()
+
+
+def test_greedy_batch():
+    exploration = Greedy()
+
+    assert exploration.be_greedy_batch(0, 3).tolist() == [True, True, True]
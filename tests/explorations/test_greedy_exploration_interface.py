@@ -6,3 +6,16 @@ from blobrl.explorations import GreedyExplorationInterface
 def test_can_t_instantiate_greedy_exploration_interface():
     with pytest.raises(TypeError):
         GreedyExplorationInterface()
+
+
+def test_be_greedy_batch():
+    class FakeExploration(GreedyExplorationInterface):
+        def be_greedy(self, step) -> bool:
+            return step > 2
+
+        def __str__(self):
+            return 'FakeExploration'
+
+    exploration = FakeExploration()
+    assert exploration.be_greedy_batch(0, 2).tolist() == [False, False]
+    assert exploration.be_greedy_batch(3, 2).tolist() == [True, True]
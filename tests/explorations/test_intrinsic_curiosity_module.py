@@ -0,0 +1,51 @@
+import pytest
+import torch
+from gym.spaces import Discrete, MultiDiscrete, Box, flatdim
+
+from blobrl.explorations import IntrinsicCuriosityModule, Greedy, NotGreedy
+
+
+def test_intrinsic_curiosity_module_init():
+    IntrinsicCuriosityModule(Discrete(3), Discrete(2))
+    IntrinsicCuriosityModule(Discrete(3), MultiDiscrete([[2, 3], [4, 5]]))
+    with pytest.raises(TypeError):
+        IntrinsicCuriosityModule(Discrete(3), Box(low=0, high=1, shape=[2]))
+    with pytest.raises(TypeError):
+        IntrinsicCuriosityModule(Discrete(3), Discrete(2), greedy_exploration="dede")
+
+
+def test_intrinsic_curiosity_module_be_greedy():
+    assert IntrinsicCuriosityModule(Discrete(3), Discrete(2), greedy_exploration=Greedy()).be_greedy(0) is True
+    assert IntrinsicCuriosityModule(Discrete(3), Discrete(2), greedy_exploration=NotGreedy()).be_greedy(0) is False
+    assert not IntrinsicCuriosityModule(Discrete(3), Discrete(2),
+                                        greedy_exploration=NotGreedy()).be_greedy_batch(0, 3).any()
+
+
+def test_intrinsic_curiosity_module_intrinsic_reward():
+    observation_space = Box(low=0, high=1, shape=[4])
+    for action_space in [Discrete(3), MultiDiscrete([3, 2]), MultiDiscrete([[3, 2], [4, 5]])]:
+        exploration = IntrinsicCuriosityModule(observation_space, action_space)
+        optimizer = torch.optim.Adam(exploration.parameters(), lr=0.01)
+
+        observations = torch.rand(8, flatdim(observation_space))
+        next_observations = torch.rand(8, flatdim(observation_space))
+        actions = torch.tensor([action_space.sample() for _ in range(8)]).float()
+
+        losses = []
+        for _ in range(30):
+            rewards, loss = exploration.intrinsic_reward(observations, actions, next_observations)
+            assert rewards.shape == (8,)
+            assert not rewards.requires_grad
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            losses.append(loss.item())
+
+        assert losses[-1] < losses[0]
+
+
+def test__str__():
+    explo = IntrinsicCuriosityModule(Discrete(3), Discrete(2))
+
+    assert 'IntrinsicCuriosityModule-' + str(explo.greedy_exploration) + '-' + str(explo.coefficient) + '-' + str(
+        explo.beta) == explo.__str__()
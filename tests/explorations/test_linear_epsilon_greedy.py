@@ -0,0 +1,26 @@
+import pytest
+
+from blobrl.explorations import LinearEpsilonGreedy
+
+
+def test_linear_epsilon_greedy_get_epsilon():
+    exploration = LinearEpsilonGreedy(1., 0.1, 100)
+
+    assert exploration.get_epsilon(0) == 1.
+    assert exploration.get_epsilon(50) == pytest.approx(0.55)
+    assert exploration.get_epsilon(100) == pytest.approx(0.1)
+    assert exploration.get_epsilon(1000) == pytest.approx(0.1)
+
+
+def test_linear_epsilon_greedy_be_greedy_batch():
+    exploration = LinearEpsilonGreedy(1., 0., 100, seed=0)
+
+    assert not exploration.be_greedy_batch(0, 10).any()
+    assert exploration.be_greedy_batch(100, 10).all()
+
+
+def test__str__():
+    explo = LinearEpsilonGreedy(1., 0.1, 100)
+
+    assert 'LinearEpsilonGreedy-' + str(explo.epsilon_max) + '-' + str(explo.epsilon_min) + '-' + str(
+        explo.step_max) == explo.__str__()
@@ -0,0 +1,14 @@
+from blobrl.explorations import NoisyExploration
+
+
+def test_noisy_exploration():
+    exploration = NoisyExploration()
+
+    assert exploration.be_greedy(0) is True
+    assert exploration.be_greedy_batch(0, 3).tolist() == [True, True, True]
+
+
+def test__str__():
+    explo = NoisyExploration()
+
+    assert 'NoisyExploration' == explo.__str__()
@@ -11,3 +11,9 @@ def test__str__():
     explo = NotGreedy()
 
     assert 'NotGreedy' == explo.__str__()
+
+
+def test_not_greedy_batch():
+    exploration = NotGreedy()
+
+    assert exploration.be_greedy_batch(0, 3).tolist() == [False, False, False]
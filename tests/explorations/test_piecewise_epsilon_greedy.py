@@ -0,0 +1,36 @@
+import pytest
+
+from blobrl.explorations import PiecewiseEpsilonGreedy
+
+
+def test_piecewise_epsilon_greedy_init():
+    with pytest.raises(ValueError):
+        PiecewiseEpsilonGreedy([0, 10], [1.])
+    with pytest.raises(ValueError):
+        PiecewiseEpsilonGreedy([], [])
+    with pytest.raises(ValueError):
+        PiecewiseEpsilonGreedy([10, 0], [1., 0.1])
+
+
+def test_piecewise_epsilon_greedy_get_epsilon():
+    exploration = PiecewiseEpsilonGreedy([10, 20, 40], [1., 0.5, 0.1])
+
+    assert exploration.get_epsilon(0) == 1.
+    assert exploration.get_epsilon(15) == pytest.approx(0.75)
+    assert exploration.get_epsilon(20) == pytest.approx(0.5)
+    assert exploration.get_epsilon(30) == pytest.approx(0.3)
+    assert exploration.get_epsilon(100) == pytest.approx(0.1)
+
+
+def test_piecewise_epsilon_greedy_be_greedy():
+    exploration = PiecewiseEpsilonGreedy([0, 10], [1., 0.], seed=0)
+
+    assert exploration.be_greedy(0) is False
+    assert exploration.be_greedy(10) is True
+    assert exploration.be_greedy_batch(10, 5).all()
+
+
+def test__str__():
+    explo = PiecewiseEpsilonGreedy([0, 10], [1., 0.1])
+
+    assert 'PiecewiseEpsilonGreedy-' + str(explo.steps) + '-' + str(explo.epsilons) == explo.__str__()
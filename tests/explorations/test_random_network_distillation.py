@@ -0,0 +1,45 @@
+import pytest
+import torch
+from gym.spaces import Discrete, Box, flatdim
+
+from blobrl.explorations import RandomNetworkDistillation, Greedy, NotGreedy
+
+
+def test_random_network_distillation_init():
+    RandomNetworkDistillation(Discrete(3))
+    with pytest.raises(TypeError):
+        RandomNetworkDistillation(Discrete(3), greedy_exploration="dede")
+
+
+def test_random_network_distillation_be_greedy():
+    assert RandomNetworkDistillation(Discrete(3), greedy_exploration=Greedy()).be_greedy(0) is True
+    assert RandomNetworkDistillation(Discrete(3), greedy_exploration=NotGreedy()).be_greedy(0) is False
+    assert RandomNetworkDistillation(Discrete(3), greedy_exploration=Greedy()).be_greedy_batch(0, 3).all()
+
+
+def test_random_network_distillation_intrinsic_reward():
+    space = Box(low=0, high=1, shape=[4])
+    exploration = RandomNetworkDistillation(space)
+    target = [p.clone() for p in exploration.target.parameters()]
+    optimizer = torch.optim.Adam(exploration.parameters(), lr=0.01)
+
+    observations = torch.rand(8, flatdim(space))
+    losses = []
+    for _ in range(50):
+        rewards, loss = exploration.intrinsic_reward(observations, None, observations)
+        assert rewards.shape == (8,)
+        assert not rewards.requires_grad
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+        losses.append(loss.item())
+
+    assert losses[-1] < losses[0]
+    assert all(torch.equal(p, t) for p, t in zip(exploration.target.parameters(), target))
+
+
+def test__str__():
+    explo = RandomNetworkDistillation(Discrete(3))
+
+    assert 'RandomNetworkDistillation-' + str(explo.greedy_exploration) + '-' + str(
+        explo.coefficient) == explo.__str__()
@@ -0,0 +1,26 @@
+import torch
+
+from blobrl.explorations import RunningMeanStd
+
+
+def test_running_mean_std_update():
+    running = RunningMeanStd((3,), epsilon=0)
+    values = torch.rand(100, 3)
+
+    running.update(values[:10])
+    running.update(values[10:60])
+    running.update(values[60:])
+
+    assert torch.allclose(running.mean, values.mean(dim=0), atol=1e-5)
+    assert torch.allclose(running.var, values.var(dim=0, unbiased=False), atol=1e-5)
+    assert running.count.item() == 100
+
+
+def test_running_mean_std_normalize():
+    running = RunningMeanStd()
+    running.update(torch.tensor([0., 10.]))
+
+    normalized = running.normalize(torch.tensor([5., 100., -100.]), clip=5.)
+    assert normalized[0].abs().item() < 1e-3
+    assert normalized[1].item() == 5.
+    assert normalized[2].item() == -5.
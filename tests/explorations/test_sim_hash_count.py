@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import torch
+from gym.spaces import Discrete, Box, flatdim
+
+from blobrl.agents import DQN
+from blobrl.explorations import SimHashCount, Greedy, NotGreedy
+
+
+def test_sim_hash_count_init():
+    SimHashCount(Discrete(3))
+    with pytest.raises(TypeError):
+        SimHashCount(Discrete(3), greedy_exploration="dede")
+    for hash_bits in [0, 63]:
+        with pytest.raises(ValueError):
+            SimHashCount(Discrete(3), hash_bits=hash_bits)
+    for table_bits in [0, 33]:
+        with pytest.raises(ValueError):
+            SimHashCount(Discrete(3), table_bits=table_bits)
+
+
+def test_sim_hash_count_be_greedy():
+    assert SimHashCount(Discrete(3), greedy_exploration=Greedy()).be_greedy(0) is True
+    assert SimHashCount(Discrete(3), greedy_exploration=NotGreedy()).be_greedy(0) is False
+    assert SimHashCount(Discrete(3), greedy_exploration=Greedy()).be_greedy_batch(0, 3).all()
+
+
+def test_sim_hash_count_update():
+    exploration = SimHashCount(Box(low=-1, high=1, shape=[4]), table_bits=10, seed=0)
+    observations = np.random.uniform(-1, 1, (6, 4)).astype(np.float32)
+
+    index = exploration.get_index(observations)
+    assert index.shape == (6,)
+    assert (index < 2 ** 10).all()
+    assert (exploration.get_index(observations) == index).all()
+
+    counts = exploration.update(np.concatenate([observations, observations[:2]]))
+    assert exploration.counts.sum() == 8
+    for i, c in zip(np.concatenate([index, index[:2]]), counts):
+        assert exploration.counts[i] == c
+
+
+def test_sim_hash_count_intrinsic_reward():
+    space = Box(low=-1, high=1, shape=[4])
+    exploration = SimHashCount(space, beta=0.5, seed=0)
+    observations = torch.rand(8, flatdim(space)) * 2 - 1
+
+    rewards, loss = exploration.intrinsic_reward(observations, None, observations)
+    assert loss is None
+    assert rewards.shape == (8,)
+    assert (rewards <= 0.5).all()
+    assert exploration.counts.sum() == 0
+
+    next_rewards, _ = exploration.intrinsic_reward(observations, None, observations)
+    assert torch.equal(next_rewards, rewards)
+
+    exploration.count(observations.numpy())
+    exploration.count(observations.numpy()[:, None])
+    rewards, _ = exploration.intrinsic_reward(observations, None, observations)
+    counts = exploration.counts[exploration.get_index(observations.numpy())]
+    assert (counts >= 2).all()
+    assert torch.allclose(rewards, torch.as_tensor(0.5 / np.sqrt(counts), dtype=torch.float32))
+
+    agent = DQN(space, Discrete(2), greedy_exploration=SimHashCount(space), batch_size=4)
+    for i in range(20):
+        agent.learn(space.sample(), 1, 0, space.sample(), False)
+    assert agent.greedy_exploration.counts.sum() == 20
+    agent.learn_batch([space.sample(), space.sample()], [1, 0], [0, 0], [space.sample(), space.sample()],
+                      [False, False])
+    assert agent.greedy_exploration.counts.sum() == 22
+
+
+def test__str__():
+    explo = SimHashCount(Discrete(3))
+
+    assert 'SimHashCount-' + str(explo.greedy_exploration) + '-' + str(explo.beta) + '-' + str(
+        explo.hash_bits) + '-' + str(explo.table_bits) == explo.__str__()
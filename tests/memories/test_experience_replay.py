@@ -1,3 +1,4 @@
+import numpy as np
 import torch
 import pytest
 from blobrl.memories import ExperienceReplay
@@ -43,6 +44,17 @@ def test_experience_replay():
     mem.sample(2, device=torch.device("cpu"))
 
 
+def test_sample_dtype():
+    mem = ExperienceReplay(10)
+    for i in range(5):
+        mem.append(np.full(4, i, dtype=np.uint8), 1, 0.5, np.full(4, i + 1, dtype=np.uint8), False)
+
+    observations, actions, rewards, next_observations, dones = mem.sample(3, device=torch.device("cpu"))
+    assert observations.dtype == torch.uint8 and next_observations.dtype == torch.uint8
+    assert observations.shape == (3, 4)
+    assert actions.dtype == rewards.dtype == dones.dtype == torch.float32
+
+
 def test_get_sample():
     max_size = 10
 
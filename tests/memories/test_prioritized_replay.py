@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+import torch
+
+from blobrl.memories import PrioritizedReplay
+
+
+def test_init_():
+    for max_size, alpha in [(0, 0.6), (10, -1)]:
+        with pytest.raises(ValueError):
+            PrioritizedReplay(max_size=max_size, alpha=alpha)
+    for beta, beta_steps in [(-0.1, 10), (1.5, 10), (0.4, 0), (0.4, 1.5)]:
+        with pytest.raises(ValueError):
+            PrioritizedReplay(beta=beta, beta_steps=beta_steps)
+
+    for max_size in [1, 5, 8, 100]:
+        mem = PrioritizedReplay(max_size=max_size)
+        assert mem.capacity >= max_size
+
+
+def test_prioritized_replay():
+    mem = PrioritizedReplay(max_size=5, alpha=1., epsilon=0.)
+
+    for i in range(7):
+        mem.append([i, i], i % 3, float(i), [i + 1, i + 1], False, priority=i)
+    assert len(mem) == 5
+    assert np.allclose(mem.get_probabilities(), np.array([5, 6, 2, 3, 4]) / 20)
+
+    observations, actions, rewards, next_observations, dones, weights = mem.sample(20000, device=torch.device("cpu"))
+    assert observations.shape == next_observations.shape == (20000, 2)
+    assert actions.shape == rewards.shape == dones.shape == weights.shape == (20000,)
+    assert (rewards == observations[:, 0]).all() and (next_observations[:, 0] == observations[:, 0] + 1).all()
+
+    counts = np.bincount(observations[:, 0].numpy().astype(int), minlength=7) / 20000
+    assert np.allclose(counts, [0, 0, 2 / 20, 3 / 20, 4 / 20, 5 / 20, 6 / 20], atol=0.02)
+    assert (mem.observations[mem.indices][:, 0] == observations[:, 0].numpy()).all()
+
+
+def test_update_priorities():
+    mem = PrioritizedReplay(max_size=10, alpha=1., epsilon=0.)
+    mem.extend([[i] for i in range(4)], [0] * 4, [0.] * 4, [[i] for i in range(4)], [False] * 4)
+    assert np.allclose(mem.get_probabilities(), [0.25] * 4)
+
+    mem.update_priorities(np.array([], dtype=np.int64), np.array([]))
+    assert np.allclose(mem.get_probabilities(), [0.25] * 4)
+
+    mem.update_priorities(np.array([0, 1, 1]), np.array([0., 3., -3.]))
+    assert np.allclose(mem.get_probabilities(), [0, 3 / 5, 1 / 5, 1 / 5])
+    assert mem.max_priority == 3
+
+    mem.extend([[4]], [0], [0.], [[4]], [True])
+    assert np.allclose(mem.get_probabilities(), [0, 3 / 8, 1 / 8, 1 / 8, 3 / 8])
+
+    observations = mem.sample(100, device=torch.device("cpu"))[0]
+    assert (observations[:, 0] != 0).all()
+
+
+def test_weights():
+    mem = PrioritizedReplay(max_size=4, alpha=1., epsilon=0., beta=0.5, beta_steps=2)
+    mem.extend([[i] for i in range(4)], [0] * 4, [0.] * 4, [[i] for i in range(4)], [False] * 4, [1., 1., 2., 4.])
+    probabilities = np.array([1, 1, 2, 4]) / 8
+
+    for beta in [0.5, 0.75, 1., 1.]:
+        assert mem.get_beta() == beta
+        observations, actions, rewards, next_observations, dones, weights = mem.sample(200, device=torch.device("cpu"))
+        assert weights.dtype == torch.float32
+        expected = (4 * probabilities[mem.indices]) ** -beta
+        assert np.allclose(weights.numpy(), expected / expected.max())
+        assert np.allclose(weights.numpy()[mem.indices == 0], 1.)
+    assert mem.sampled == 4
+
+
+def test___str__():
+    assert 'PrioritizedReplay-10-0.5' == PrioritizedReplay(max_size=10, alpha=0.5).__str__()
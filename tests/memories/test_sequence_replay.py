@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+import torch
+
+from blobrl.memories import SequenceReplay
+
+
+def test_init_():
+    for sequence_length in [0, -1]:
+        with pytest.raises(ValueError):
+            SequenceReplay(max_size=100, sequence_length=sequence_length)
+
+    for sequence_length in [1, 8]:
+        SequenceReplay(max_size=100, sequence_length=sequence_length)
+
+
+def test_sequence_replay():
+    mem = SequenceReplay(max_size=5, sequence_length=3)
+
+    for i in range(10):
+        mem.append([i, i], i % 3, float(i), [i + 1, i + 1], False)
+    assert len(mem) == 5
+
+    observations, actions, rewards, next_observations, dones, lengths = mem.sample(20, device=torch.device("cpu"))
+
+    assert observations.shape == (20, 3, 2) and next_observations.shape == (20, 3, 2)
+    assert actions.shape == rewards.shape == dones.shape == (20, 3)
+    assert lengths.shape == (20,)
+
+    for o, r, n, length in zip(observations, rewards, next_observations, lengths):
+        assert 5 <= o[0, 0] <= 9
+        assert length == min(3, 10 - int(o[0, 0]))
+        for t in range(int(length)):
+            assert o[t, 0] == o[0, 0] + t and r[t] == o[t, 0] and n[t, 0] == o[t, 0] + 1
+
+
+def test_sequence_stop_at_done():
+    mem = SequenceReplay(max_size=100, sequence_length=4)
+    mem.extend([[i] for i in range(10)], list(range(10)), [1.] * 10, [[i + 1] for i in range(10)],
+               [i in (2, 7) for i in range(10)])
+
+    observations, actions, rewards, next_observations, dones, lengths = mem.sample(50, device=torch.device("cpu"))
+
+    for o, r, d, length in zip(observations, rewards, dones, lengths):
+        start = int(o[0, 0])
+        ends = [e for e in (2, 7, 9) if e >= start]
+        assert length == min(4, ends[0] - start + 1)
+        assert r.sum() == length
+        assert d.sum() == (1 if start + int(length) - 1 in (2, 7) else 0)
+
+
+def test_extend_more_than_max_size():
+    mem = SequenceReplay(max_size=4, sequence_length=2)
+    mem.extend(np.arange(10).reshape(10, 1), np.zeros(10), np.zeros(10), np.arange(10).reshape(10, 1), [False] * 10)
+
+    assert len(mem) == 4
+    assert sorted(mem.observations[:, 0].tolist()) == [6, 7, 8, 9]
+
+
+def test_str_():
+    mem = SequenceReplay(max_size=1000, sequence_length=5)
+
+    assert mem.__str__() == 'SequenceReplay-1000-5'
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import torch
+from gym.spaces import Discrete, MultiDiscrete, Box
+
+from blobrl.agents import CategoricalDQN
+from blobrl.memories import ExperienceReplay
+from blobrl.networks import C51ConvNetwork
+from tests.networks.test_conv_network import TestConvNetwork
+
+
+class TestC51ConvNetwork(TestConvNetwork):
+    __test__ = True
+
+    network = C51ConvNetwork
+
+    list_work = TestConvNetwork.list_work[:4]
+
+    list_fail = TestConvNetwork.list_fail + [
+        [Box(low=0, high=255, shape=[36, 36], dtype=np.uint8), Box(low=0, high=10, shape=[2, 2])],
+    ]
+
+    def test_init(self):
+        for ob, ac in self.list_fail:
+            with pytest.raises(TypeError):
+                self.network(observation_space=ob, action_space=ac)
+
+        for ob, ac in self.list_work:
+            self.network(observation_space=ob, action_space=ac)
+
+        self.network(observation_space=Box(low=0, high=255, shape=[4, 10, 10], dtype=np.uint8),
+                     action_space=Discrete(3), conv_layers=[(8, 3, 1)], channel_last=False, num_atoms=11)
+
+    def test_dueling(self):
+        pass
+
+    def test_agents(self):
+        for ob, ac in self.list_work:
+            agent = CategoricalDQN(ob, ac, network=self.network(ob, ac), memory=ExperienceReplay(max_size=5),
+                                   batch_size=4)
+            for i in range(6):
+                agent.get_action(ob.sample())
+                agent.learn(ob.sample(), ac.sample(), 0, ob.sample(), False)
+
+    def test_str_(self):
+        for ob, ac in self.list_work:
+            network = self.network(observation_space=ob, action_space=ac)
+
+            assert 'C51ConvNetwork-' + str(ob) + "-" + str(ac) == network.__str__()
@@ -64,3 +64,26 @@ class TestC51Network(TestBaseNetwork):
             network = self.network(observation_space=ob, action_space=ac)
 
             assert 'C51Network-' + str(ob) + "-" + str(ac) == network.__str__()
+
+    def test_num_atoms(self):
+        for ob, ac in self.list_work:
+            for num_atoms in [1, 11, 51]:
+                network = self.network(observation_space=ob, action_space=ac, num_atoms=num_atoms)
+                outputs = network.forward(torch.rand((4, flatdim(ob))))
+
+                def valid_outputs(out, nvec):
+                    if isinstance(out, list):
+                        assert len(out) == len(nvec)
+                        for o, n in zip(out, nvec):
+                            valid_outputs(o, n)
+                    else:
+                        assert out.shape == (4, nvec, num_atoms)
+                        assert torch.allclose(out.sum(dim=-1), torch.ones(4, nvec))
+
+                valid_outputs(outputs, ac.n if isinstance(ac, Discrete) else ac.nvec)
+
+    def test_registered_parameters(self):
+        for ob, ac in self.list_work:
+            network = self.network(observation_space=ob, action_space=ac)
+            nb_heads = 1 if isinstance(ac, Discrete) else ac.nvec.size
+            assert len(list(network.parameters())) == 4 + 2 * nb_heads
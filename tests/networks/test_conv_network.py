@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+import torch
+from gym.spaces import Discrete, MultiDiscrete, MultiBinary, Box, Tuple, Dict
+
+from blobrl.agents import DQN, DoubleDQN
+from blobrl.memories import ExperienceReplay
+from blobrl.networks import ConvNetwork, SimpleDuelingNetwork
+from tests.networks import TestBaseNetwork
+
+
+class TestConvNetwork(TestBaseNetwork):
+    __test__ = True
+
+    network = ConvNetwork
+
+    list_work = [
+        [Box(low=0, high=255, shape=[36, 36], dtype=np.uint8), Discrete(3)],
+        [Box(low=0, high=255, shape=[36, 36, 3], dtype=np.uint8), Discrete(4)],
+        [Box(low=0, high=1, shape=[36, 36, 4]), MultiDiscrete([3, 2])],
+        [Box(low=0, high=255, shape=[36, 36, 2], dtype=np.uint8), MultiDiscrete([[3, 2], [4, 5]])],
+        [Box(low=0, high=255, shape=[36, 36], dtype=np.uint8), Box(low=0, high=10, shape=[2, 2])],
+    ]
+
+    list_fail = TestBaseNetwork.list_fail + [
+        [Discrete(3), Discrete(3)],
+        [MultiDiscrete([3, 3]), Discrete(3)],
+        [Box(low=0, high=10, shape=[3]), Discrete(3)],
+        [Box(low=0, high=10, shape=[2, 2, 2, 2]), Discrete(3)],
+        [Tuple([Discrete(1), MultiDiscrete([1, 1])]), Discrete(3)],
+        [Dict({"first": Discrete(1), "second": MultiDiscrete([1, 1])}), Discrete(3)],
+        [MultiBinary(3), Discrete(3)],
+    ]
+
+    def test_init(self):
+        for ob, ac in self.list_fail:
+            with pytest.raises(TypeError):
+                self.network(observation_space=ob, action_space=ac)
+
+        for ob, ac in self.list_work:
+            self.network(observation_space=ob, action_space=ac)
+
+        self.network(observation_space=Box(low=0, high=255, shape=[4, 10, 10], dtype=np.uint8),
+                     action_space=Discrete(3), conv_layers=[(8, 3, 1)], channel_last=False, linear_dim=32)
+
+    def test_forward(self):
+        for ob, ac in self.list_work:
+            network = self.network(observation_space=ob, action_space=ac)
+            observations = np.stack([ob.sample() for _ in range(5)])
+
+            flat = network.forward(torch.as_tensor(observations.reshape(5, -1)))
+            image = network.forward(torch.as_tensor(observations))
+
+            def valid_outputs(f, i):
+                if isinstance(f, list):
+                    return [valid_outputs(x, y) for x, y in zip(f, i)]
+                assert f.shape[0] == 5
+                assert torch.allclose(f, i)
+
+            valid_outputs(flat, image)
+
+    def test_uint8_scaling(self):
+        ob = Box(low=0, high=255, shape=[36, 36, 3], dtype=np.uint8)
+        network = self.network(observation_space=ob, action_space=Discrete(3))
+
+        observations = np.stack([ob.sample() for _ in range(2)])
+        uint8_out = network(torch.as_tensor(observations))
+        float_out = network(torch.as_tensor(observations).float())
+        assert torch.allclose(uint8_out, float_out)
+
+        image = network.network.to_image(torch.as_tensor(observations))
+        assert image.dtype == torch.float32
+        assert image.shape == (2, 3, 36, 36)
+        assert float(image.max()) <= 1.
+
+    def test_dueling(self):
+        for ob, ac in self.list_work:
+            network = SimpleDuelingNetwork(self.network(observation_space=ob, action_space=ac, linear_dim=32))
+            network.forward(torch.as_tensor(np.stack([ob.sample() for _ in range(5)])))
+
+    def test_agents(self):
+        for ob, ac in self.list_work[:4]:
+            for agent_class in [DQN, DoubleDQN]:
+                agent = agent_class(ob, ac, network=self.network(ob, ac), memory=ExperienceReplay(max_size=5),
+                                    batch_size=4)
+                for i in range(6):
+                    agent.get_action(ob.sample())
+                    agent.learn(ob.sample(), ac.sample(), 0, ob.sample(), False)
+
+    def test_str_(self):
+        for ob, ac in self.list_work:
+            network = self.network(observation_space=ob, action_space=ac)
+
+            assert 'ConvNetwork-' + str(ob) + "-" + str(ac) == network.__str__()
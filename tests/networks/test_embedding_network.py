@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+import torch
+from gym.spaces import Discrete, MultiDiscrete, MultiBinary, Box, Tuple, Dict, flatdim
+
+from blobrl.agents import DQN, DoubleDQN
+from blobrl.memories import ExperienceReplay
+from blobrl.networks import EmbeddingNetwork, SimpleDuelingNetwork, SimpleNetwork, get_index_sizes
+from tests.networks import TestBaseNetwork
+
+
+class TestEmbeddingNetwork(TestBaseNetwork):
+    __test__ = True
+
+    network = EmbeddingNetwork
+
+    list_work = [
+        [Discrete(500), Discrete(6)],
+        [Discrete(16), MultiDiscrete([3, 2])],
+        [MultiDiscrete([3, 3]), MultiDiscrete([3, 3])],
+        [MultiDiscrete([[100, 3], [3, 5]]), Discrete(4)],
+        [Tuple([Discrete(32), Discrete(11), Discrete(2)]), Discrete(2)],
+        [Dict({"first": Discrete(1), "second": MultiDiscrete([4, 2])}), Box(low=0, high=10, shape=[2, 2])],
+    ]
+
+    list_fail = TestBaseNetwork.list_fail + [
+        [Box(low=0, high=10, shape=[3]), Discrete(3)],
+        [MultiBinary(3), Discrete(3)],
+        [Tuple([Discrete(1), Box(low=0, high=10, shape=[3])]), Discrete(3)],
+    ]
+
+    def test_init(self):
+        for ob, ac in self.list_fail:
+            with pytest.raises(TypeError):
+                self.network(observation_space=ob, action_space=ac)
+
+        for ob, ac in self.list_work:
+            self.network(observation_space=ob, action_space=ac, embedding_dim=8)
+
+    def test_forward(self):
+        for ob, ac in self.list_work:
+            network = self.network(observation_space=ob, action_space=ac)
+            observations = np.stack([network.flatten_observation(ob.sample()) for _ in range(5)])
+
+            assert observations.dtype == np.int32
+            assert observations.shape == (5, len(get_index_sizes(ob)))
+
+            out_int = network.forward(torch.as_tensor(observations))
+            out_float = network.forward(torch.as_tensor(observations).float().unsqueeze(1))
+
+            def valid_outputs(i, f):
+                if isinstance(i, list):
+                    return [valid_outputs(x, y) for x, y in zip(i, f)]
+                assert i.shape[0] == 5
+                assert torch.allclose(i, f)
+
+            valid_outputs(out_int, out_float)
+
+    def test_embedding_bag(self):
+        ob = Tuple([Discrete(3), Discrete(2)])
+        network = self.network(observation_space=ob, action_space=Discrete(2))
+        embedding = network.network.embedding
+
+        x = torch.as_tensor(network.flattener.flatten_batch([(2, 1), (0, 0)]))
+        expected = torch.stack([embedding.weight[2] + embedding.weight[4], embedding.weight[0] + embedding.weight[3]])
+        assert torch.allclose(embedding(x + network.network.offsets), expected)
+
+    def test_dueling(self):
+        for ob, ac in self.list_work:
+            network = SimpleDuelingNetwork(self.network(observation_space=ob, action_space=ac, linear_dim=32))
+            observation = network.flatten_observation(ob.sample())
+            assert observation.dtype == np.int32
+            network.forward(torch.as_tensor(observation[None]))
+
+    def test_agents(self):
+        for ob, ac in self.list_work[:5]:
+            for agent_class in [DQN, DoubleDQN]:
+                memory = ExperienceReplay(max_size=5)
+                agent = agent_class(ob, ac, network=self.network(ob, ac), memory=memory, batch_size=4)
+                for i in range(6):
+                    agent.get_action(ob.sample())
+                    agent.learn(ob.sample(), ac.sample(), 0, ob.sample(), False)
+                assert memory.buffer[0][0][0].dtype == np.int32
+
+    def test_str_(self):
+        for ob, ac in self.list_work:
+            network = self.network(observation_space=ob, action_space=ac)
+
+            assert 'EmbeddingNetwork-' + str(ob) + "-" + str(ac) == network.__str__()
+
+
+def test_base_network_flatten_observation():
+    ob = Box(low=0, high=255, shape=[4, 4], dtype=np.uint8)
+    observation = SimpleNetwork(ob, Discrete(2)).flatten_observation(ob.sample())
+    assert observation.dtype == np.uint8 and observation.shape == (16,)
+
+    ob = Discrete(5)
+    observation = SimpleNetwork(ob, Discrete(2)).flatten_observation(3)
+    assert observation.shape == (flatdim(ob),) and observation[3] == 1
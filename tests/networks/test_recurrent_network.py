@@ -0,0 +1,67 @@
+import pytest
+import torch
+from gym.spaces import flatdim, flatten, Discrete
+
+from blobrl.networks import RecurrentNetwork
+from tests.networks import TestBaseNetwork
+
+
+class TestRecurrentNetwork(TestBaseNetwork):
+    __test__ = True
+
+    network = RecurrentNetwork
+
+    def test_init(self):
+        for ob, ac in self.list_fail:
+            with pytest.raises(TypeError):
+                self.network(observation_space=ob, action_space=ac)
+
+        for ob, ac in self.list_work:
+            for cell in ["lstm", "gru"]:
+                self.network(observation_space=ob, action_space=ac, cell=cell)
+
+        with pytest.raises(ValueError):
+            self.network(observation_space=Discrete(3), action_space=Discrete(3), cell="rnn")
+
+        network = self.network(observation_space=Discrete(3), action_space=Discrete(3), linear_dim=16, hidden_dim=24)
+        assert network.linear_dim == 16 and network.hidden_dim == network.last_dim == 24
+
+    def test_forward(self):
+        for ob, ac in self.list_work:
+            for cell in ["lstm", "gru"]:
+                network = self.network(observation_space=ob, action_space=ac, cell=cell)
+
+                outputs, hidden = network.forward(torch.rand((3, flatdim(ob))))
+                outputs, hidden = network.forward(torch.rand((3, 1, flatdim(ob))), hidden)
+                outputs, hidden = network.forward(torch.rand((3, 5, flatdim(ob))), hidden,
+                                                  lengths=torch.tensor([5, 1, 3]))
+
+                def valid_outputs(out):
+                    if isinstance(out, list):
+                        return [valid_outputs(o) for o in out]
+                    assert out.shape[0] == 3 * 5
+
+                valid_outputs(outputs)
+
+    def test_packed_sequence(self):
+        network = self.network(observation_space=Discrete(4), action_space=Discrete(2))
+        sequences = torch.rand((2, 6, 4))
+
+        packed, hidden = network.forward(sequences, lengths=torch.tensor([6, 3]))
+        short, short_hidden = network.forward(sequences[1:, :3])
+        step, step_hidden = network.forward(sequences[1:, 2], network.forward(sequences[1:, :2])[1])
+
+        assert torch.allclose(packed.view(2, 6, -1)[1, :3], short, atol=1e-6)
+        assert torch.allclose(hidden[0][:, 1], short_hidden[0][:, 0], atol=1e-6)
+        assert torch.allclose(step, short[2:], atol=1e-6)
+
+    def test_str_(self):
+        for ob, ac in self.list_work:
+            network = self.network(observation_space=ob, action_space=ac)
+
+            assert 'RecurrentNetwork-' + str(ob) + "-" + str(ac) + "-lstm" == network.__str__()
+
+    def test_call_network(self):
+        for ob, ac in self.list_work:
+            self.network(observation_space=ob, action_space=ac)(
+                torch.tensor([flatten(ob, ob.sample())]).float())
@@ -43,3 +43,27 @@ class TestSimpleDuelingNetwork(TestBaseDuelingNetwork):
         for ob, ac in self.list_work:
             self.network(SimpleNetwork(observation_space=ob, action_space=ac))(
                 torch.tensor([flatten(ob, ob.sample())]).float())
+
+    def test_advantage_per_sample(self):
+        for ob, ac in self.list_work:
+            network = self.network(self.net(observation_space=ob, action_space=ac))
+            observations = torch.rand((5, flatdim(ob)))
+
+            value = network.value_outputs(network.network.network(observations))
+
+            def valid_outputs(outputs):
+                if isinstance(outputs, list):
+                    return [valid_outputs(o) for o in outputs]
+                dims = tuple(range(1, outputs.dim()))
+                assert torch.allclose(outputs.mean(dim=dims), value.view(-1), atol=1e-5)
+
+            valid_outputs(network.forward(observations))
+            batch = network.forward(observations)
+            single = network.forward(observations[:1])
+
+            def valid_independent(b, s):
+                if isinstance(b, list):
+                    return [valid_independent(x, y) for x, y in zip(b, s)]
+                assert torch.allclose(b[:1], s, atol=1e-5)
+
+            valid_independent(batch, single)
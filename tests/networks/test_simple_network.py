@@ -2,7 +2,7 @@ import pytest
 import torch
 from gym.spaces import flatdim, flatten
 
-from blobrl.networks import SimpleNetwork
+from blobrl.networks import SimpleNetwork, NoisyLinear
 from tests.networks import TestBaseNetwork
 
 
@@ -34,3 +34,9 @@ class TestSimpleNetwork(TestBaseNetwork):
         for ob, ac in self.list_work:
             self.network(observation_space=ob, action_space=ac)(
                 torch.tensor([flatten(ob, ob.sample())]).float())
+
+    def test_noisy(self):
+        for ob, ac in self.list_work:
+            network = self.network(observation_space=ob, action_space=ac, noisy=True)
+            assert any(isinstance(m, NoisyLinear) for m in network.modules())
+            network.forward(torch.rand((2, flatdim(ob))))
@@ -1,10 +1,12 @@
-from blobrl.networks import get_last_layers
+import torch
+from blobrl.networks import get_last_layers, forward_last_layers, FusedHead, MultiDiscreteHead, NoisyLinear, set_noisy
 from gym.spaces import Box, Discrete, MultiDiscrete, MultiBinary, Tuple, Dict
 import torch.nn as nn
 
 
 def valid_dim(out_v, out_g):
     if isinstance(out_v, list):
+        assert isinstance(out_g, nn.ModuleList)
         assert len(out_v) == len(out_g)
         for o, g in zip(out_v, out_g):
             valid_dim(o, g)
@@ -47,52 +49,86 @@ def test_get_last_layers():
         nn.Linear(10, 100),
         nn.Linear(10, 5),
 
-        [nn.Sequential(*[nn.Linear(10, 10), nn.Softmax()])],
-        [nn.Sequential(*[nn.Linear(10, 10), nn.Softmax()]), nn.Sequential(*[nn.Linear(10, 110), nn.Softmax()]),
-         nn.Sequential(*[nn.Linear(10, 3), nn.Softmax()]), nn.Sequential(*[nn.Linear(10, 50), nn.Softmax()])],
-        [nn.Sequential(*[nn.Linear(10, 1), nn.Softmax()]), nn.Sequential(*[nn.Linear(10, 1), nn.Softmax()]),
-         nn.Sequential(*[nn.Linear(10, 1), nn.Softmax()])],
-        [nn.Sequential(*[nn.Linear(10, 100), nn.Softmax()]), nn.Sequential(*[nn.Linear(10, 3), nn.Softmax()]),
-         nn.Sequential(*[nn.Linear(10, 3), nn.Softmax()]), nn.Sequential(*[nn.Linear(10, 5), nn.Softmax()])],
-
-        [[nn.Sequential(*[nn.Linear(10, 100), nn.Softmax()]), nn.Sequential(*[nn.Linear(10, 3), nn.Softmax()])],
-         [nn.Sequential(*[nn.Linear(10, 3), nn.Softmax()]), nn.Sequential(*[nn.Linear(10, 5), nn.Softmax()])]],
-        [
-            [[nn.Sequential(*[nn.Linear(10, 100), nn.Softmax()]), nn.Sequential(*[nn.Linear(10, 3), nn.Softmax()])],
-             [nn.Sequential(*[nn.Linear(10, 3), nn.Softmax()]), nn.Sequential(*[nn.Linear(10, 5), nn.Softmax()])]],
-            [[nn.Sequential(*[nn.Linear(10, 100), nn.Softmax()]), nn.Sequential(*[nn.Linear(10, 3), nn.Softmax()])],
-             [nn.Sequential(*[nn.Linear(10, 3), nn.Softmax()]), nn.Sequential(*[nn.Linear(10, 5), nn.Softmax()])]]
-        ],
-
-        [nn.Sequential(*[nn.Linear(10, 1), nn.Sigmoid()])],
-        [nn.Sequential(*[nn.Linear(10, 1), nn.Sigmoid()]),
-         nn.Sequential(*[nn.Linear(10, 1), nn.Sigmoid()]),
-         nn.Sequential(*[nn.Linear(10, 1), nn.Sigmoid()])],
-
-        [
-            [nn.Sequential(*[nn.Linear(10, 1), nn.Sigmoid()]),
-             nn.Sequential(*[nn.Linear(10, 1), nn.Sigmoid()])],
-            [nn.Sequential(*[nn.Linear(10, 1), nn.Sigmoid()]),
-             nn.Sequential(*[nn.Linear(10, 1), nn.Sigmoid()])],
-            [nn.Sequential(*[nn.Linear(10, 1), nn.Sigmoid()]),
-             nn.Sequential(*[nn.Linear(10, 1), nn.Sigmoid()])]
-        ],
-
-        [nn.Linear(10, 1)]
-        ,
-        [[nn.Linear(10, 1), nn.Linear(10, 1)], [nn.Linear(10, 1), nn.Linear(10, 1)]]
-        ,
-        [[[nn.Linear(10, 1), nn.Linear(10, 1)], [nn.Linear(10, 1), nn.Linear(10, 1)]],
-         [[nn.Linear(10, 1), nn.Linear(10, 1)], [nn.Linear(10, 1), nn.Linear(10, 1)]]],
-
-        [nn.Linear(10, 1),
-         [nn.Sequential(*[nn.Linear(10, 1), nn.Softmax()]), nn.Sequential(*[nn.Linear(10, 1), nn.Softmax()])]],
-
-        [nn.Linear(10, 1),
-         [nn.Sequential(*[nn.Linear(10, 1), nn.Softmax()]), nn.Sequential(*[nn.Linear(10, 1), nn.Softmax()])]],
+        MultiDiscreteHead(10, [1]),
+        MultiDiscreteHead(10, [10, 110, 3, 50]),
+        MultiDiscreteHead(10, [1, 1, 1]),
+        MultiDiscreteHead(10, [100, 3, 3, 5]),
+
+        MultiDiscreteHead(10, [[100, 3], [3, 5]]),
+        MultiDiscreteHead(10, [[[100, 3], [3, 5]], [[100, 3], [3, 5]]]),
+
+        nn.Sequential(*[FusedHead(10, [1]), nn.Sigmoid()]),
+        nn.Sequential(*[FusedHead(10, [3]), nn.Sigmoid()]),
+        nn.Sequential(*[FusedHead(10, [3, 2]), nn.Sigmoid()]),
+
+        FusedHead(10, [1]),
+        FusedHead(10, [2, 2]),
+        FusedHead(10, [2, 2, 2]),
+
+        [nn.Linear(10, 1), MultiDiscreteHead(10, [1, 1])],
+
+        [nn.Linear(10, 1), MultiDiscreteHead(10, [1, 1])],
 
     ]
 
     for in_value, out_value in zip(in_values, out_values):
         out_value_gen = get_last_layers(in_value, 10)
         valid_dim(out_value, out_value_gen)
+
+
+def test_forward_last_layers():
+    in_values = [
+        [Discrete(10), (10,)],
+        [MultiBinary(3), (3,)],
+        [MultiBinary([3, 2]), (3, 2)],
+        [Box(low=0, high=10, shape=[1]), (1,)],
+        [Box(low=0, high=10, shape=[84, 84]), (84, 84)],
+        [Box(low=0, high=10, shape=[2, 2, 2]), (2, 2, 2)],
+    ]
+
+    for space, shape in in_values:
+        layers = get_last_layers(space, 10)
+        assert forward_last_layers(layers, torch.rand(4, 10)).shape == (4, *shape)
+
+    layers = get_last_layers(Box(low=0, high=10, shape=[84, 84]), 10)
+    assert len(list(layers.parameters())) == 2
+
+    layers = get_last_layers(Tuple([Box(low=0, high=10, shape=[2, 2]), MultiDiscrete([[3, 2], [4, 5]])]), 10)
+    outputs = forward_last_layers(layers, torch.rand(4, 10))
+    assert outputs[0].shape == (4, 2, 2)
+    assert [[o.shape[1] for o in out] for out in outputs[1]] == [[3, 2], [4, 5]]
+    assert len(list(layers.parameters())) == 2 + 2
+
+
+def test_multi_discrete_head():
+    head = MultiDiscreteHead(10, [[3, 2], [4, 5]])
+    outputs = head.linear(torch.rand(4, 10))
+
+    means = head.mean(outputs)
+    for o, m in zip(head.split(outputs), head.split(means)):
+        for out, mean in zip(o, m):
+            assert torch.allclose(mean, out.mean(dim=1, keepdim=True).expand_as(out))
+
+
+def test_noisy_linear():
+    layer = NoisyLinear(10, 5)
+    x = torch.rand(4, 10)
+
+    outputs = layer(x)
+    assert outputs.shape == (4, 5)
+    weight = layer.weight_mu + layer.weight_sigma * torch.ger(layer.epsilon_out, layer.epsilon_in)
+    bias = layer.bias_mu + layer.bias_sigma * layer.epsilon_out
+    assert torch.allclose(outputs, x @ weight.t() + bias, atol=1e-6)
+    assert not torch.equal(layer(x), layer(x))
+
+    outputs.sum().backward()
+    assert layer.weight_sigma.grad is not None
+
+    set_noisy(layer, False)
+    assert torch.equal(layer(x), layer(x))
+    assert torch.allclose(layer(x), x @ layer.weight_mu.t() + layer.bias_mu)
+
+
+def test_get_last_layers_noisy():
+    layers = get_last_layers(Tuple([Discrete(3), MultiDiscrete([2, 2]), Box(low=0, high=1, shape=[2])]), 10, noisy=True)
+    assert len([m for m in layers.modules() if isinstance(m, NoisyLinear)]) == 3
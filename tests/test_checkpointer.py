@@ -0,0 +1,116 @@
+import os
+
+import numpy as np
+import pytest
+import torch
+
+from blobrl import Checkpointer, Trainer
+from blobrl.agents import DQN, DoubleDQN
+
+
+class RaiseCheckpointer(Checkpointer):
+    def write(self, checkpoint, steps):
+        raise RuntimeError("write")
+
+
+def test_init():
+    for keep in [0, -1, "1"]:
+        with pytest.raises(ValueError):
+            Checkpointer("des", keep=keep)
+    assert str(Checkpointer("des", keep=2)) == "Checkpointer-des-2"
+
+
+def test_save(tmp_path):
+    directory = str(tmp_path / "checkpoints")
+    checkpointer = Checkpointer(directory, keep=2)
+    assert checkpointer.get_latest(directory) is None
+
+    for steps in [5, 10, 100, 20]:
+        checkpointer.save({"steps": steps, "weights": torch.ones(3) * steps}, steps)
+        checkpointer.wait()
+    checkpointer.close()
+    checkpointer.close()
+
+    assert sorted(os.listdir(directory)) == ["checkpoint-100.pt", "checkpoint-20.pt"]
+    assert Checkpointer.get_checkpoints(directory) == [os.path.join(directory, "checkpoint-20.pt"),
+                                                       os.path.join(directory, "checkpoint-100.pt")]
+    latest = Checkpointer.get_latest(directory)
+    assert torch.equal(torch.load(latest)["weights"], torch.ones(3) * 100)
+
+    checkpointer.save({"steps": 200}, 200)
+    checkpointer.close()
+    assert Checkpointer.get_latest(directory).endswith("checkpoint-200.pt")
+
+
+def test_error(tmp_path):
+    checkpointer = RaiseCheckpointer(str(tmp_path))
+    checkpointer.save({}, 1)
+    with pytest.raises(RuntimeError):
+        checkpointer.close()
+    checkpointer.close()
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_trainer_resume(tmp_path):
+    directory = str(tmp_path / "checkpoints")
+    with pytest.raises(ValueError):
+        Trainer(environment="CartPole-v1", agent=DQN, checkpoint_dir=directory, checkpoint_steps=0)
+
+    for agent in [DQN, DoubleDQN]:
+        trainer = Trainer(environment="CartPole-v1", agent=agent, log_dir=str(tmp_path / "runs"),
+                          checkpoint_dir=directory, checkpoint_steps=20, checkpoint_memory=True)
+        trainer.train(max_episode=3, nb_evaluation=0, render=False, progress_bar=False)
+        assert os.listdir(directory)
+        assert Checkpointer.get_latest(directory).endswith("checkpoint-" + str(trainer.steps) + ".pt")
+
+        resumed = Trainer(environment="CartPole-v1", agent=agent, log_dir=str(tmp_path / "runs"),
+                          checkpoint_dir=directory, checkpoint_steps=20)
+        assert resumed.resume(directory) == Checkpointer.get_latest(directory)
+        assert resumed.steps == trainer.steps
+        assert resumed.agent.step == trainer.agent.step
+        assert resumed.logger.start_episode == 3
+        for x, y in zip(trainer.agent.network.parameters(), resumed.agent.network.parameters()):
+            assert torch.equal(x, y)
+
+        resumed.train(max_episode=3, nb_evaluation=0, render=False, progress_bar=False)
+        assert resumed.steps == trainer.steps and len(resumed.logger.episodes) == 0
+
+        resumed.resume(directory)
+        resumed.train(max_episode=5, nb_evaluation=0, render=False, progress_bar=False)
+        assert len(resumed.logger.episodes) == 2
+        assert resumed.steps > trainer.steps
+
+        for file_name in os.listdir(directory):
+            os.remove(os.path.join(directory, file_name))
+        with pytest.raises(FileNotFoundError):
+            resumed.resume(directory)
+
+
+def test_actor_learner_checkpoint(tmp_path):
+    directory = str(tmp_path / "checkpoints")
+    trainer = Trainer(environment="CartPole-v1", agent=DQN, log_dir=str(tmp_path / "runs"), actor_learner=True,
+                      checkpoint_dir=directory, checkpoint_steps=10, checkpoint_keep=1)
+    trainer.train(max_episode=4, nb_evaluation=0, render=False, progress_bar=False)
+    assert len(os.listdir(directory)) == 1
+
+    resumed = Trainer(environment="CartPole-v1", agent=DQN, log_dir=str(tmp_path / "runs"))
+    with pytest.warns(UserWarning):
+        resumed.resume(Checkpointer.get_latest(directory))
+    assert resumed.steps == trainer.steps and resumed.logger.start_episode == 4
+
+
+def test_resume_exact(tmp_path):
+    directory = str(tmp_path / "checkpoints")
+    trainer = Trainer(environment="CartPole-v1", agent=DQN, log_dir=str(tmp_path / "runs"), checkpoint_dir=directory,
+                      checkpoint_steps=1, checkpoint_keep=4, checkpoint_memory=True)
+    trainer.train(max_episode=4, nb_evaluation=0, render=False, progress_bar=False)
+    checkpoints = Checkpointer.get_checkpoints(directory)
+    assert len(checkpoints) == 4
+
+    resumed = Trainer(environment="CartPole-v1", agent=DQN, log_dir=str(tmp_path / "runs"))
+    resumed.resume(checkpoints[1])
+    resumed.train(max_episode=4, nb_evaluation=0, render=False, progress_bar=False)
+    assert resumed.steps == trainer.steps
+    assert np.array_equal(resumed.logger.episodes.sums, trainer.logger.episodes.sums[2:])
+    for x, y in zip(trainer.agent.network.parameters(), resumed.agent.network.parameters()):
+        assert torch.equal(x, y)
@@ -0,0 +1,99 @@
+import queue
+import threading
+
+import gym
+import pytest
+import torch
+import torch.multiprocessing as mp
+
+from blobrl import DistributedTrainer
+from blobrl.distributed_trainer import _run_actor
+from blobrl.agents import AgentRandom, DQN, DoubleDQN, DRQN
+from blobrl.memories import PrioritizedReplay
+
+
+def test_init():
+    for name in ["num_actors", "send_steps", "weights_update", "queue_size"]:
+        for value in [0, -1, 1.5]:
+            with pytest.raises(ValueError):
+                DistributedTrainer("CartPole-v1", DQN, **{name: value})
+    for value in [0, -1, "1"]:
+        with pytest.raises(ValueError):
+            DistributedTrainer("CartPole-v1", DQN, replay_ratio=value)
+
+    for agent in [AgentRandom, DRQN, "dqn", None]:
+        with pytest.raises(TypeError):
+            DistributedTrainer("CartPole-v1", agent)
+
+    with pytest.raises(ValueError):
+        DistributedTrainer(None, DQN)
+
+    trainer = DistributedTrainer("CartPole-v1", DoubleDQN, num_actors=3)
+    assert isinstance(trainer.agent, DoubleDQN) and isinstance(trainer.agent.memory, PrioritizedReplay)
+    assert len(trainer.epsilons) == 3
+
+    env = gym.make("CartPole-v1")
+    agent = DQN(env.observation_space, env.action_space)
+    assert DistributedTrainer(env, agent).agent is agent
+
+
+def test_get_epsilons():
+    assert DistributedTrainer.get_epsilons(1, 0.4) == [0.4]
+
+    epsilons = DistributedTrainer.get_epsilons(4, 0.4, 7.)
+    assert epsilons[0] == 0.4 and abs(epsilons[-1] - 0.4 ** 8) < 1e-12
+    assert all(e1 > e2 for e1, e2 in zip(epsilons, epsilons[1:]))
+
+
+def test_do_message():
+    trainer = DistributedTrainer("CartPole-v1", DQN)
+    env = gym.make("CartPole-v1")
+
+    observations = [env.observation_space.sample() for _ in range(3)]
+    assert 0 == trainer.do_message(("transitions", 1, [observations, [0, 1, 0], [1., 1., 1.], observations,
+                                                       [False, False, True], [1., 2., 3.]], 100.))
+    assert trainer.agent.step == 3 and trainer.steps_per_second == [0., 100.]
+
+    assert 0 == trainer.do_message(("episode", 0, [1., 1.], None))
+    assert len(trainer.logger.episodes) == 1 and len(trainer.logger.episodes[0]) == 2
+
+    assert 1 == trainer.do_message(("done", 0, None, None))
+
+
+def test_run_actor():
+    env = gym.make("CartPole-v1")
+    agent = DQN(env.observation_space, env.action_space)
+    transitions = queue.Queue()
+    episodes = mp.Value("i", 0)
+
+    num_threads = torch.get_num_threads()
+    _run_actor(3, "CartPole-v1", agent.get_policy(), 0.1, 0, transitions, agent.state_dict(), mp.Value("i", 1),
+               threading.Lock(), episodes, 2, 10)
+    torch.set_num_threads(num_threads)
+
+    messages = []
+    while not transitions.empty():
+        messages.append(transitions.get())
+    assert episodes.value == 2
+    assert [m[0] for m in messages].count("episode") == 2 and messages[-1] == ("done", 3, None, None)
+
+    steps = sum(len(m[2]) for m in messages if m[0] == "episode")
+    assert steps == sum(len(m[2][4]) for m in messages if m[0] == "transitions")
+    for kind, actor_id, values, steps_per_second in messages:
+        if kind == "transitions":
+            assert len(values) == 6 and len(values[5]) == len(values[4]) <= 10 and steps_per_second > 0
+
+
+def test_train():
+    for agent in [DQN, DoubleDQN]:
+        trainer = DistributedTrainer("CartPole-v1", agent, num_actors=2, send_steps=10, weights_update=2, seed=0)
+        trainer.train(max_episode=4, progress_bar=False)
+
+        assert len(trainer.logger.episodes) >= 4
+        assert trainer.agent.step == sum(len(episode) for episode in trainer.logger.episodes)
+        assert all(steps_per_second > 0 for steps_per_second in trainer.steps_per_second)
+        assert trainer.agent.updates <= trainer.agent.step
+
+    trainer = DistributedTrainer("CartPole-v1", DQN, num_actors=2, send_steps=10, replay_ratio=0.25, seed=0)
+    trainer.train(max_episode=4, progress_bar=False)
+    assert trainer.agent.updates <= trainer.agent.step * 0.25
@@ -0,0 +1,73 @@
+import gym
+import pytest
+
+from blobrl import Logger
+from blobrl.agents import AgentRandom, DQN
+from blobrl.evaluator import AsyncEvaluator, _init_worker, _evaluate_episode
+
+
+class CountLogger(Logger):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def add_evaluation(self, steps, step):
+        super().add_evaluation(steps, step)
+        self.calls.append((len(steps), step))
+
+
+def test_init():
+    env = gym.make("CartPole-v1")
+    agent = AgentRandom(observation_space=env.observation_space, action_space=env.action_space)
+
+    list_fail = [0, -1, 1.5, None, "2"]
+    for value in list_fail:
+        with pytest.raises(ValueError):
+            AsyncEvaluator("CartPole-v1", agent, num_workers=value)
+        with pytest.raises(ValueError):
+            AsyncEvaluator("CartPole-v1", agent, num_episodes=value)
+
+
+def test_evaluate_episode():
+    env = gym.make("CartPole-v1")
+    agent = DQN(observation_space=env.observation_space, action_space=env.action_space)
+
+    _init_worker("CartPole-v1", agent.get_policy())
+    rewards = _evaluate_episode(agent.state_dict())
+    assert len(rewards) > 0 and sum(rewards) == len(rewards)
+
+
+def test_submit():
+    env = gym.make("CartPole-v1")
+    for agent in [AgentRandom(observation_space=env.observation_space, action_space=env.action_space),
+                  DQN(observation_space=env.observation_space, action_space=env.action_space)]:
+        logger = CountLogger()
+        evaluator = AsyncEvaluator("CartPole-v1", agent, num_workers=2, num_episodes=3)
+
+        evaluator.submit(agent, logger, 4)
+        for result in evaluator.results:
+            result.wait()
+        assert len(logger.calls) == 0
+        evaluator.log_finished()
+        assert len(logger.calls) == 3
+
+        evaluator.submit(agent, logger, 8)
+        evaluator.wait()
+        assert len(logger.calls) == 6
+        assert sorted(step for _, step in logger.calls) == [4, 4, 4, 8, 8, 8]
+        assert all(length > 0 for length, _ in logger.calls)
+        assert len(logger.episodes) == 0
+
+        evaluator.close()
+
+
+def test_error():
+    env = gym.make("CartPole-v1")
+    agent = DQN(observation_space=env.observation_space, action_space=env.action_space)
+    evaluator = AsyncEvaluator("CartPole-v1", agent, num_workers=1, num_episodes=1)
+
+    evaluator.submit(AgentRandom(observation_space=env.observation_space, action_space=env.action_space),
+                     CountLogger(), 0)
+    with pytest.raises(Exception):
+        evaluator.wait()
+    evaluator.close()
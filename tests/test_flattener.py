@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from gym.spaces import Discrete, MultiDiscrete, MultiBinary, Box, Tuple, Dict, flatten, flatdim
+
+from blobrl.flattener import Flattener, split_batch
+
+list_work = [
+    Discrete(3),
+    Discrete(1),
+    MultiDiscrete([3, 3]),
+    MultiDiscrete([[100, 3], [3, 5]]),
+    MultiBinary(3),
+    Box(low=0, high=10, shape=[1]),
+    Box(low=0, high=10, shape=[2, 2, 2]),
+    Box(low=0, high=255, shape=[4, 4, 3], dtype=np.uint8),
+    Tuple([Discrete(1), MultiDiscrete([1, 1])]),
+    Dict({"first": Discrete(4), "second": MultiDiscrete([2, 3])}),
+    Dict({"image": Box(low=0, high=255, shape=[2, 2], dtype=np.uint8),
+          "state": Tuple([Discrete(5), Box(low=-1, high=1, shape=[3]), MultiBinary(2)])}),
+]
+
+
+def test_flatten():
+    for space in list_work:
+        flattener = Flattener(space)
+        assert flattener.flatdim == flatdim(space)
+
+        buffer = np.empty(flattener.flatdim, dtype=flattener.dtype)
+        for i in range(10):
+            x = space.sample()
+            assert np.allclose(flattener.flatten(x), flatten(space, x))
+            assert flattener.flatten(x, out=buffer) is buffer
+            assert np.allclose(buffer, flatten(space, x))
+
+
+def test_flatten_batch():
+    for space in list_work:
+        flattener = Flattener(space)
+        observations = [space.sample() for _ in range(7)]
+        expected = np.stack([flatten(space, x) for x in observations])
+
+        assert np.allclose(flattener.flatten_batch(observations), expected)
+
+        buffer = np.empty((7, flattener.flatdim), dtype=flattener.dtype)
+        assert flattener.flatten_batch(observations, out=buffer) is buffer
+        assert np.allclose(buffer, expected)
+
+
+def test_flatten_batched_structure():
+    space = Dict({"first": Discrete(4), "second": Tuple([Box(low=0, high=1, shape=[2]), MultiDiscrete([2, 3])])})
+    observations = [space.sample() for _ in range(5)]
+    batched = {"first": np.array([x["first"] for x in observations]),
+               "second": (np.stack([x["second"][0] for x in observations]),
+                          np.stack([x["second"][1] for x in observations]))}
+
+    flattener = Flattener(space)
+    assert np.allclose(flattener.flatten_batch(batched), flattener.flatten_batch(observations))
+
+    flattener = Flattener(Box(low=0, high=1, shape=[2, 3]))
+    observations = np.random.rand(4, 2, 3)
+    assert np.allclose(flattener.flatten_batch(observations), observations.reshape(4, 6))
+
+
+def test_split_batch():
+    space = Dict({"first": Discrete(4), "second": Tuple([Box(low=0, high=1, shape=[2]), MultiDiscrete([2, 3])])})
+    observations = [space.sample() for _ in range(5)]
+    batched = {"first": np.array([x["first"] for x in observations]),
+               "second": (np.stack([x["second"][0] for x in observations]),
+                          np.stack([x["second"][1] for x in observations]))}
+
+    split = split_batch(space, batched)
+    assert len(split) == 5
+    for x, y in zip(split, observations):
+        assert x["first"] == y["first"]
+        assert np.allclose(x["second"][0], y["second"][0])
+        assert np.allclose(x["second"][1], y["second"][1])
+
+    assert split_batch(space, observations) is observations
+    assert len(split_batch(Discrete(3), np.array([0, 1, 2]))) == 3
+
+
+def test_dtype():
+    assert Flattener(Box(low=0, high=255, shape=[2, 2], dtype=np.uint8)).dtype == np.uint8
+    assert Flattener(Discrete(3)).dtype == np.float32
+    assert Flattener(Tuple([Discrete(3), MultiDiscrete([2, 2])])).dtype == np.float32
+    assert Flattener(Discrete(3), dtype=np.float64).dtype == np.float64
+
+
+def test_index():
+    space = Tuple([Discrete(3), MultiDiscrete([4, 2]), Dict({"a": Discrete(5)})])
+    flattener = Flattener(space, one_hot=False)
+
+    assert flattener.flatdim == 4 and flattener.dtype == np.int32
+    assert flattener.flatten((2, [3, 1], {"a": 4})).tolist() == [2, 3, 1, 4]
+    assert flattener.flatten_batch([(2, [3, 1], {"a": 4}), (0, [0, 0], {"a": 1})]).tolist() == [[2, 3, 1, 4],
+                                                                                                [0, 0, 0, 1]]
+
+
+def test_not_supported():
+    with pytest.raises(NotImplementedError):
+        Flattener(object())
+
+
+def test_str_():
+    flattener = Flattener(Discrete(3))
+
+    assert flattener.__str__() == 'Flattener-' + str(Discrete(3)) + '-True-float32'
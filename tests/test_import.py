@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+import pytest
+
+import blobrl
+import blobrl.agents
+
+# maximum seconds to import agents once torch, numpy and gym are imported
+MAX_AGENTS_SECONDS = 0.3
+
+HEAVY_MODULES = ["matplotlib", "IPython", "torch.utils.tensorboard", "blobrl.trainer", "blobrl.logger"]
+
+
+def run(code):
+    return subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout.split()
+
+
+def test_import_blobrl():
+    loaded = run("import sys\n"
+                 "import blobrl\n"
+                 "print(' '.join(m for m in ['torch', 'gym'] + " + repr(HEAVY_MODULES) + " if m in sys.modules))")
+    assert loaded == []
+
+
+def test_import_agents():
+    output = run("import sys, time\n"
+                 "import numpy, torch, gym.spaces\n"
+                 "start = time.perf_counter()\n"
+                 "from blobrl.agents import AgentRandom, DQN, DoubleDQN, CategoricalDQN, DRQN\n"
+                 "print(time.perf_counter() - start)\n"
+                 "print(' '.join(m for m in " + repr(HEAVY_MODULES) + " if m in sys.modules))")
+    assert float(output[0]) < MAX_AGENTS_SECONDS, "import of blobrl.agents take " + output[0] + " seconds"
+    assert output[1:] == []
+
+
+def test_getattr():
+    assert "Trainer" in dir(blobrl) and "DQN" in dir(blobrl.agents)
+    assert blobrl.Trainer is blobrl.trainer.Trainer
+    with pytest.raises(AttributeError):
+        blobrl.NotDefined
+    with pytest.raises(ImportError):
+        from blobrl.agents import NotDefined
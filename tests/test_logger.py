@@ -1,7 +1,9 @@
+import numpy as np
 import pytest
 from torch.utils.tensorboard import SummaryWriter
 
 from blobrl import Record, Logger
+from blobrl.logger import Statistics, EpisodeHistory
 
 
 class FakeSummaryWriter(SummaryWriter):
@@ -26,6 +28,10 @@ def test_record_init():
         record = Record(value=value)
         assert record.value == value
 
+    for value in [np.float32(1.5), np.float64(-2.), np.int64(3), np.int32(0)]:
+        record = Record(value=value)
+        assert record.value == value and type(record.value) in (int, float)
+
 
 def test_avg_records():
     list_records = [[Record(1), Record(1), Record(1), Record(1)],
@@ -117,11 +123,11 @@ def test_sum_records():
 
 def test_logger_init():
     logger = Logger()
-    assert not logger.episodes and not logger.current_steps
+    assert not logger.episodes and not logger.current and logger.num_episodes == 0
     assert isinstance(logger.summary_writer, SummaryWriter)
 
     logger = Logger(log_dir="des")
-    assert not logger.episodes and not logger.current_steps
+    assert not logger.episodes and not logger.current and logger.num_episodes == 0
     assert isinstance(logger.summary_writer, SummaryWriter)
     assert logger.summary_writer.log_dir == "des"
 
@@ -131,8 +137,12 @@ def test_add_step():
     list_records = [Record(1.0), Record(1.0), Record(1.0), Record(1.0)]
     for ite, record in enumerate(list_records):
         logger.add_steps(record)
-        assert ite + 1 == len(logger.current_steps)
-        assert record == logger.current_steps[-1]
+        assert ite + 1 == len(logger.current)
+        assert ite + 1 == logger.current.sum
+    logger.add_steps(np.float32(2.))
+    assert 5 == len(logger.current) and 6 == logger.current.sum and 2 == logger.current.max
+    with pytest.raises(TypeError):
+        logger.add_steps("1")
 
 
 def test_add_episode():
@@ -146,8 +156,8 @@ def test_add_episode():
                      [Record(-10), Record(-15), Record(-20), Record(-15)]]
     for ite, episode in enumerate(list_episodes):
         logger.add_episode(episode)
-        assert ite + 1 == len(logger.episodes)
-        assert episode == logger.episodes[-1]
+        assert ite + 1 == len(logger.episodes) == logger.num_episodes
+        assert Statistics.from_records(episode) == logger.episodes[-1]
 
 
 def test_end_episode():
@@ -161,10 +171,26 @@ def test_end_episode():
                   [Record(-10), Record(-15), Record(-20), Record(-15)]]
 
     for ite, steps in enumerate(list_steps):
-        logger.current_steps = steps
+        for record in steps:
+            logger.add_steps(record)
         logger.end_episode()
         assert ite + 1 == len(logger.episodes)
-        assert steps == logger.episodes[-1]
+        assert Statistics.from_records(steps) == logger.episodes[-1]
+        assert not logger.current
+    assert [Record.sum_records(steps) for steps in list_steps] == logger.episodes.sums.tolist()
+
+
+def test_start_episode():
+    logger = Logger(start_episode=10)
+    logger.summary_writer = FakeSummaryWriter()
+    logger.add_steps(Record(1))
+    logger.end_episode()
+    assert 10 == logger.summary_writer.add_scalar_call[-1][2]
+
+    logger.add_steps(Record(2))
+    logger.evaluate()
+    assert 11 == logger.summary_writer.add_scalar_call[-1][2]
+    assert [2] == logger.evaluations
 
 
 def test_evaluate():
@@ -178,9 +204,30 @@ def test_evaluate():
                   [Record(-10), Record(-15), Record(-20), Record(-15)]]
 
     for ite, steps in enumerate(list_steps):
-        logger.current_steps = steps
+        for record in steps:
+            logger.add_steps(record)
         logger.evaluate()
         assert 0 == len(logger.episodes)
+        assert Record.sum_records(steps) == logger.evaluations[-1]
+    assert len(list_steps) == len(logger.evaluations)
+
+
+def test_add_evaluation():
+    logger = Logger()
+    logger.summary_writer = FakeSummaryWriter()
+    logger.add_steps(Record(5))
+    current = logger.current
+    list_steps = [[Record(1), Record(1), Record(1), Record(1)],
+                  [Record(1), Record(2), Record(3), Record(4)],
+                  [Record(-10), Record(-15), Record(-20), Record(-15)]]
+
+    for ite, steps in enumerate(list_steps):
+        logger.add_evaluation(steps, ite)
+        assert 0 == len(logger.episodes)
+        assert current is logger.current and 1 == len(logger.current)
+        assert "Evaluate/Reward" in logger.summary_writer.add_scalar_call[-1][0]
+        assert ite == logger.summary_writer.add_scalar_call[-1][2]
+        assert Record.sum_records(steps) == logger.evaluations[-1]
 
 
 def test_log_episode():
@@ -210,3 +257,52 @@ def test_write_log():
 
     for ite, records in enumerate(list_steps):
         Logger.write_log("./runs", records, ite)
+
+
+def test_statistics():
+    values = [3, -1.5, 10, 0.25, 4, 4]
+    statistics = Statistics()
+    assert (0, 0, 0.0, 0.0, 0.0, 0.0) == (len(statistics), statistics.sum, statistics.min, statistics.max,
+                                         statistics.avg(), statistics.std())
+    for value in values:
+        statistics.add(value)
+    assert len(values) == len(statistics)
+    assert sum(values) == statistics.sum and min(values) == statistics.min and max(values) == statistics.max
+    assert np.mean(values) == pytest.approx(statistics.avg()) == pytest.approx(statistics.mean)
+    assert np.var(values) == pytest.approx(statistics.var())
+    assert np.std(values) == pytest.approx(statistics.std())
+    assert str(statistics).startswith("Statistics-6-")
+
+    assert Statistics.from_records([Record(value) for value in values]) == statistics
+    assert Statistics.from_records(statistics) is statistics
+    with pytest.raises(TypeError):
+        Statistics.from_records((Record(1),))
+    with pytest.raises(TypeError):
+        Statistics.from_records([1, 2])
+
+
+def test_episode_history():
+    for max_size in [0, -1, "10"]:
+        with pytest.raises(ValueError):
+            EpisodeHistory(max_size=max_size)
+
+    history = EpisodeHistory(max_size=1500)
+    for i in range(2000):
+        history.append([Record(i), Record(i + 1)])
+    assert 1500 == len(history) == len(history.arrays["count"])
+    assert [2 * i + 1 for i in range(500, 2000)] == history.sums.tolist()
+    assert [2] * 1500 == history.counts.tolist()
+    assert 500 == history[0].min and 1999 == history[-1].min and 2000 == history[1499].max
+    assert 1500 == len(list(history)) and history[-1] == list(history)[-1]
+    assert 3000 == sum(len(episode) for episode in history)
+    with pytest.raises(IndexError):
+        history[1500]
+    with pytest.raises(TypeError):
+        history["0"]
+
+    logger = Logger(max_history=3)
+    for i in range(5):
+        logger.add_steps(i)
+        logger.end_episode()
+    assert 3 == len(logger.episodes) and 5 == logger.num_episodes
+    assert [2, 3, 4] == logger.episodes.sums.tolist()
@@ -0,0 +1,117 @@
+import os
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from blobrl import Recorder, Trainer
+from blobrl.agents import AgentRandom
+
+
+class FrameEnv:
+    def __init__(self):
+        self.render_done = 0
+
+    def render(self, mode="human"):
+        self.render_done += 1
+        return np.full((8, 12, 3), self.render_done, dtype=np.uint8)
+
+
+class SlowRecorder(Recorder):
+    def process(self, frame):
+        time.sleep(0.01)
+        super().process(frame)
+
+    def write(self, file_name, frames, fps):
+        self.written = frames
+
+
+class CountRecorder(Recorder):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.display_done = 0
+
+    def display(self, frame):
+        self.display_done += 1
+
+
+def test_init():
+    for name in ["frame_skip", "buffer_size", "downsample", "fps"]:
+        for value in [0, -1, 1.5, None]:
+            with pytest.raises(ValueError):
+                Recorder(**{name: value})
+    for value in [-1, None, "2"]:
+        with pytest.raises(ValueError):
+            Recorder(display_fps=value)
+
+    assert str(Recorder("a.gif", frame_skip=2)) == "Recorder-a.gif-2-64-1-30-0"
+
+
+def test_record(tmp_path):
+    file_name = str(tmp_path / "record" / "episode.gif")
+    recorder = Recorder(file_name=file_name, frame_skip=3, downsample=2)
+    env = FrameEnv()
+    for _ in range(10):
+        recorder.record(env)
+    assert env.render_done == 4
+
+    assert recorder.close() == file_name
+    assert recorder.thread is None and not recorder.frames
+    with Image.open(file_name) as image:
+        assert image.n_frames == 4
+        assert image.size == (6, 4)
+
+    recorder.record(env)
+    assert recorder.close() == file_name
+    with Image.open(file_name) as image:
+        assert image.n_frames == 1
+
+    assert recorder.close() is None
+    assert Recorder().close() is None
+
+
+def test_buffer():
+    recorder = SlowRecorder(file_name="unused.gif", buffer_size=2)
+    for i in range(20):
+        recorder.add(np.zeros((2, 2, 3)))
+    assert recorder.close() == "unused.gif"
+    assert recorder.dropped > 0
+    assert len(recorder.written) + recorder.dropped == 20
+
+
+def test_display():
+    recorder = CountRecorder(display_fps=1000)
+    for i in range(5):
+        recorder.process(np.zeros((2, 2, 3)))
+        time.sleep(0.002)
+    assert recorder.display_done == 5
+
+    recorder = CountRecorder(display_fps=1)
+    for i in range(5):
+        recorder.process(np.zeros((2, 2, 3)))
+    assert recorder.display_done == 1
+    assert not recorder.frames
+
+    recorder = Recorder(display_fps=1)
+    recorder.process(np.zeros((2, 2, 3)))
+    recorder.process(np.zeros((2, 2, 3)))
+    recorder.last_display = 0
+    recorder.process(np.ones((2, 2, 3)))
+    assert recorder.img is not None
+
+
+def test_trainer(tmp_path):
+    with pytest.raises(TypeError):
+        Trainer(environment="CartPole-v1", agent=AgentRandom, recorder="record.gif")
+
+    file_name = str(tmp_path / "train.gif")
+    recorder = Recorder(file_name=file_name)
+    trainer = Trainer(environment="CartPole-v1", agent=AgentRandom, recorder=recorder)
+    env = FrameEnv()
+    trainer.environment.render = env.render
+    trainer.train(max_episode=2, nb_evaluation=1, render=True)
+    assert env.render_done > 0
+    assert os.path.exists(file_name)
+    with Image.open(file_name) as image:
+        assert image.n_frames == env.render_done
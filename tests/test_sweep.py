@@ -0,0 +1,180 @@
+import json
+import os
+
+import gym
+import pytest
+import torch
+from torch import optim
+
+from blobrl import Sweep
+from blobrl.agents import DQN, DoubleDQN
+from blobrl.explorations import EpsilonGreedy
+from blobrl.memories import ExperienceReplay
+from blobrl.networks import SimpleNetwork, SimpleDuelingNetwork
+from blobrl.sweep import mzip, dict_mzip, get_agent, read_summary, run_job, write_json
+
+grid = [{"agent": {"class": [DQN, DoubleDQN],
+                   "param": {"step_train": [1, 4],
+                             "batch_size": [8],
+                             "greedy_exploration": [EpsilonGreedy(0.1)]}},
+         "network": {"class": [SimpleNetwork],
+                     "param": {}},
+         "optimizer": {"class": [optim.Adam],
+                       "param": {"lr": [0.01]}},
+         "memory": {"class": [ExperienceReplay],
+                    "param": {"max_size": [64]}},
+         "dueling": True}]
+
+
+def test_mzip():
+    assert list(mzip([1, 2], ["a", "b"])) == [[1, "a"], [1, "b"], [2, "a"], [2, "b"]]
+    assert list(dict_mzip({})) == [{}]
+    assert list(dict_mzip({"x": [1, 2], "y": [3]})) == [{"x": 1, "y": 3}, {"x": 2, "y": 3}]
+
+
+def test_init():
+    for value in [0, -1, 1.5]:
+        with pytest.raises(ValueError):
+            Sweep(grid, "CartPole-v1", num_threads=value)
+    for value in [-1, 1.5]:
+        with pytest.raises(ValueError):
+            Sweep(grid, "CartPole-v1", num_workers=value)
+
+    sweep = Sweep(grid, "CartPole-v1", max_episode=20)
+    assert sweep.num_workers >= 1
+    assert sweep.nb_evaluation == 2
+
+
+def test_expand_grid():
+    jobs = Sweep.expand_grid(grid, "sweep")
+    assert len(jobs) == 2 * 2 * 2
+    assert len(set(job["name"] for job in jobs)) == len(jobs)
+
+    job = jobs[0]
+    assert job["agent"]["class"] is DQN and not job["dueling"]
+    assert job["name"] == "DQN/1_8_EpsilonGreedy-0.1_SimpleNetwork__Adam_0.01_ExperienceReplay_64"
+    assert job["log_dir"] == os.path.join("sweep", job["name"])
+    assert "SimpleDuelingNetwork" in jobs[1]["name"]
+
+    assert len(Sweep.expand_grid([dict(grid[0], dueling=False)])) == 4
+
+
+def test_estimate_cost():
+    jobs = Sweep.expand_grid(grid)
+    costs = [Sweep.estimate_cost(job) for job in jobs]
+    assert costs[0] == 8 and costs[2] == 2
+    assert Sweep.estimate_cost(dict(jobs[0], agent={"class": DQN, "param": {}})) == 32
+
+
+def test_get_agent():
+    env = gym.make("CartPole-v1")
+    for job in Sweep.expand_grid(grid):
+        agent = get_agent(job, env.observation_space, env.action_space)
+        assert isinstance(agent, job["agent"]["class"])
+        assert isinstance(agent.network, SimpleDuelingNetwork) == job["dueling"]
+        assert agent.greedy_exploration is not job["agent"]["param"]["greedy_exploration"]
+
+
+def test_write_json(tmp_path):
+    file_name = str(tmp_path / "a.json")
+    write_json(file_name, {"a": 1})
+    write_json(file_name, [1, 2])
+    with open(file_name) as file:
+        assert json.load(file) == [1, 2]
+    assert os.listdir(str(tmp_path)) == ["a.json"]
+
+    with pytest.raises(TypeError):
+        write_json(file_name, {"a": torch})
+    assert os.listdir(str(tmp_path)) == ["a.json"]
+
+
+def test_get_rungs():
+    assert Sweep(grid, "CartPole-v1", max_episode=20).get_rungs() == [20]
+    assert Sweep(grid, "CartPole-v1", max_episode=20, min_episode=2).get_rungs() == [2, 6, 18, 20]
+    assert Sweep(grid, "CartPole-v1", max_episode=18, min_episode=2, reduction_factor=3).get_rungs() == [2, 6, 18]
+    assert Sweep(grid, "CartPole-v1", max_episode=20, min_episode=5, reduction_factor=2).get_rungs() == [5, 10, 20]
+
+    for value in [0, 21, 1.5]:
+        with pytest.raises(ValueError):
+            Sweep(grid, "CartPole-v1", max_episode=20, min_episode=value)
+    for value in [1, 0, 2.5]:
+        with pytest.raises(ValueError):
+            Sweep(grid, "CartPole-v1", reduction_factor=value)
+
+
+def test_promote():
+    sweep = Sweep(grid, "CartPole-v1", max_episode=20, min_episode=2, reduction_factor=3)
+    summaries = {job["name"]: {"scores": {"2": float(i)}} for i, job in enumerate(sweep.jobs)}
+    promoted = sweep.promote(sweep.jobs, summaries, 2)
+    assert promoted == [sweep.jobs[-1], sweep.jobs[-2]]
+    assert sweep.promote(sweep.jobs[:2], summaries, 2) == [sweep.jobs[1]]
+
+
+def test_run_job(tmp_path):
+    job = Sweep.expand_grid(grid, str(tmp_path))[0]
+    os.makedirs(job["log_dir"])
+    open(os.path.join(job["log_dir"], "partial"), "w").close()
+
+    summary = run_job(job, "CartPole-v1", 3, 1)
+    assert summary["name"] == job["name"] and summary["episodes"] == 3
+    assert summary["network"] == "SimpleNetwork" and summary["param"]["optimizer"] == {"lr": "0.01"}
+    assert summary["evaluation"] is not None and summary["scores"] == {"3": summary["evaluation"]}
+    assert not os.path.exists(os.path.join(job["log_dir"], "partial"))
+    for name in ["save.p", Sweep.marker, summary["checkpoint"], summary["replay"]]:
+        assert os.path.exists(os.path.join(job["log_dir"], name))
+    assert read_summary(job["log_dir"]) == summary
+    assert run_job(job, "CartPole-v1", 3, 1) == summary
+
+    summary_continued = run_job(job, "CartPole-v1", 5, 0)
+    assert summary_continued["episodes"] == 5 and summary_continued["evaluation"] is None
+    assert summary_continued["scores"]["3"] == summary["evaluation"]
+    assert summary_continued["scores"]["5"] == summary_continued["reward"]
+    assert summary_continued["seconds"] >= summary["seconds"]
+    assert not os.path.exists(os.path.join(job["log_dir"], summary["checkpoint"]))
+    assert os.path.exists(os.path.join(job["log_dir"], summary_continued["checkpoint"]))
+
+    env = gym.make("CartPole-v1")
+    agent = get_agent(job, env.observation_space, env.action_space)
+    agent.load_checkpoint(summary_continued["checkpoint"], job["log_dir"])
+    assert agent.step > 0
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_run(tmp_path, num_workers):
+    log_dir = str(tmp_path)
+    sweep = Sweep(grid[:1], "CartPole-v1", log_dir=log_dir, max_episode=2, nb_evaluation=1, num_workers=num_workers)
+    sweep.jobs = sweep.jobs[:3]
+    done = sweep.jobs[0]
+    marker = run_job(done, "CartPole-v1", 2, 1)
+
+    summaries = sweep.run()
+    assert [summary["name"] for summary in summaries] == sorted(job["name"] for job in sweep.jobs)
+    assert all(read_summary(job["log_dir"])["episodes"] == 2 for job in sweep.jobs)
+    assert read_summary(done["log_dir"]) == marker
+
+    with open(os.path.join(log_dir, Sweep.index)) as file:
+        index = json.load(file)
+    assert sorted(summary["name"] for summary in index) == sorted(job["name"] for job in sweep.jobs)
+    rewards = [summary["scores"]["2"] for summary in index]
+    assert rewards == sorted(rewards, reverse=True)
+
+
+def test_run_successive_halving(tmp_path):
+    log_dir = str(tmp_path)
+    sweep = Sweep(grid, "CartPole-v1", log_dir=log_dir, max_episode=4, nb_evaluation=2, num_workers=0,
+                  min_episode=1, reduction_factor=2)
+    assert sweep.get_rungs() == [1, 2, 4]
+
+    summaries = sweep.run()
+    episodes = sorted(summary["episodes"] for summary in summaries)
+    assert episodes == [1] * 4 + [2] * 2 + [4] * 2
+
+    for summary in summaries:
+        assert sorted(summary["scores"].keys(), key=int) == [str(e) for e in [1, 2, 4] if e <= summary["episodes"]]
+
+    with open(os.path.join(log_dir, Sweep.index)) as file:
+        index = json.load(file)
+    assert [summary["episodes"] for summary in index] == sorted(episodes, reverse=True)
+
+    assert Sweep(grid, "CartPole-v1", log_dir=log_dir, max_episode=4, nb_evaluation=2, num_workers=0,
+                 min_episode=1, reduction_factor=2).run() == summaries
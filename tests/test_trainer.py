@@ -1,4 +1,7 @@
+import queue
 import sys
+import threading
+import time
 from shutil import rmtree
 
 import gym
@@ -10,13 +13,13 @@ from ipykernel import iostream
 from gym.spaces import Discrete
 
 from blobrl import Trainer, Logger
-from blobrl.agents import AgentInterface
+from blobrl.agents import AgentInterface, AgentRandom, DQN, DRQN
 from blobrl.trainer import arg_to_agent
 
 
 def test_arg_to_agent():
     fail_list = ["dzdzqd", None, 123, 123.123, [], {}, object]
-    work_list = ["agent_random", "dqn", "double_dqn", "categorical_dqn"]
+    work_list = ["agent_random", "dqn", "double_dqn", "categorical_dqn", "drqn"]
 
     for agent in fail_list:
         with pytest.raises(ValueError):
@@ -326,3 +329,184 @@ def test_close():
     assert fake_env.step_done == 0 and fake_env.reset_done == 0 and fake_env.render_done == 0
     assert fake_env.close_done == 2
     assert not hasattr(trainer, 'img')
+
+
+class CountLogger(Logger):
+    def __init__(self):
+        super().__init__()
+        self.steps = 0
+
+    def add_steps(self, steps):
+        super().add_steps(steps)
+        self.steps += 1
+
+
+def test_vector_trainer():
+    with pytest.raises(ValueError):
+        Trainer(environment="CartPole-v1", agent=FakeAgent, num_envs=0)
+
+    for agent in [AgentRandom, DQN]:
+        for asynchronous in [False, True]:
+            trainer = Trainer(environment="CartPole-v1", agent=agent, num_envs=3, asynchronous=asynchronous)
+            assert trainer.vector_environment.num_envs == 3
+            trainer.logger = CountLogger()
+
+            trainer.train(max_episode=6, nb_evaluation=0, render=False)
+            assert trainer.vector_environment.closed
+            assert len(trainer.logger.episodes) >= 6
+            assert trainer.logger.steps == sum(len(episode) for episode in trainer.logger.episodes)
+
+            trainer.train(max_episode=2, nb_evaluation=2, render=False)
+            assert len(trainer.logger.episodes) >= 8
+
+    trainer = Trainer(environment=gym.make("CartPole-v1"), agent=DQN, num_envs=2)
+    trainer.train(max_episode=2, nb_evaluation=0, render=False)
+    assert trainer.agent.step > 0
+
+
+def test_do_vector_step():
+    trainer = Trainer(environment="CartPole-v1", agent=AgentRandom, num_envs=2)
+    logger = FakeLogger()
+
+    observations = trainer.vector_environment.reset()
+    finished = 0
+    while finished == 0:
+        observations, finished = trainer.do_vector_step(observations, logger=logger)
+    assert logger.end_episode_call == finished
+    assert logger.add_steps_call >= 8 * finished
+    trainer.close()
+
+
+def test_evaluation_workers():
+    with pytest.raises(ValueError):
+        Trainer(environment="CartPole-v1", agent=FakeAgent, evaluation_workers=-1)
+
+    trainer = Trainer(environment="CartPole-v1", agent=DQN, evaluation_workers=1, evaluation_episodes=2)
+    trainer.train(max_episode=4, nb_evaluation=2, render=False)
+    assert trainer.evaluator is None
+    assert len(trainer.logger.episodes) == 4
+
+
+class FakeAgentRaise(FakeAgent):
+    def update(self):
+        raise RuntimeError
+
+
+def test_actor_learner():
+    with pytest.raises(ValueError):
+        Trainer(environment="CartPole-v1", agent=FakeAgent, actor_learner=True, num_envs=2)
+    for value in [0, -1, 1.5]:
+        with pytest.raises(ValueError):
+            Trainer(environment="CartPole-v1", agent=FakeAgent, actor_learner=True, policy_update=value)
+        with pytest.raises(ValueError):
+            Trainer(environment="CartPole-v1", agent=FakeAgent, actor_learner=True, queue_size=value)
+    for value in [0, -1, "1"]:
+        with pytest.raises(ValueError):
+            Trainer(environment="CartPole-v1", agent=FakeAgent, actor_learner=True, replay_ratio=value)
+
+    for agent in [AgentRandom, DQN, DRQN]:
+        trainer = Trainer(environment="CartPole-v1", agent=agent, actor_learner=True, policy_update=1)
+        trainer.train(max_episode=6, nb_evaluation=2, render=False)
+        assert len(trainer.logger.episodes) == 6
+        if agent is not AgentRandom:
+            assert trainer.agent.step == sum(len(episode) for episode in trainer.logger.episodes)
+            assert trainer.policy_loaded is not None
+
+    for replay_ratio, step_train in [(1., 1), (0.5, 1), (2., 4)]:
+        environment = gym.make("CartPole-v1")
+        agent = DQN(observation_space=environment.observation_space, action_space=environment.action_space,
+                    step_train=step_train, batch_size=8)
+        trainer = Trainer(environment="CartPole-v1", agent=agent, actor_learner=True, replay_ratio=replay_ratio)
+        trainer.train(max_episode=4, nb_evaluation=0, render=False)
+        assert 0 < agent.updates <= trainer.steps * replay_ratio / step_train
+
+    fake_env = FakeEnv()
+    fake_agent = FakeAgent(observation_space=None, action_space=None)
+    trainer = Trainer(environment=fake_env, agent=fake_agent, actor_learner=True)
+    trainer.train(max_episode=10, nb_evaluation=0, render=False)
+    assert fake_agent.learn_done == 10 and fake_env.step_done == 10
+
+    trainer = Trainer(environment=FakeEnv(), agent=FakeAgentRaise(observation_space=None, action_space=None),
+                      actor_learner=True)
+    with pytest.raises(RuntimeError):
+        trainer.train(max_episode=10, nb_evaluation=0, render=False)
+
+
+def test_learner_replay_ratio():
+    environment = gym.make("CartPole-v1")
+    for replay_ratio, expected in [(1., 20), (0.5, 10)]:
+        agent = DQN(observation_space=environment.observation_space, action_space=environment.action_space,
+                    batch_size=8)
+        trainer = Trainer(environment="CartPole-v1", agent=agent, actor_learner=True, replay_ratio=replay_ratio)
+        transitions = queue.Queue()
+        for _ in range(20):
+            transitions.put((environment.observation_space.sample(), 0, 1., environment.observation_space.sample(),
+                             False))
+        stop = threading.Event()
+        learner = threading.Thread(target=trainer.do_learner, args=(agent, transitions, stop), daemon=True)
+        learner.start()
+        start = time.time()
+        while agent.updates < expected and time.time() - start < 10:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        stop.set()
+        learner.join()
+        assert trainer.learner_error is None
+        assert agent.step == 20 and agent.updates == expected
+
+
+def test_budgets():
+    for name in ["max_steps", "max_seconds", "evaluation_steps"]:
+        for value in [0, -1, "1"]:
+            with pytest.raises(ValueError):
+                Trainer(environment=FakeEnv(), agent=FakeAgent).train(max_episode=10, **{name: value})
+
+    fake_env = FakeEnv()
+    fake_agent = FakeAgent(observation_space=None, action_space=None)
+    trainer = Trainer(environment=fake_env, agent=fake_agent)
+    trainer.train(max_episode=100, nb_evaluation=4, max_steps=10, render=False)
+    assert fake_agent.learn_done == 10 and trainer.steps == 10
+    assert fake_env.step_done == 10 + 2
+
+    trainer.train(max_episode=100, max_steps=10, evaluation_steps=3, render=False)
+    assert fake_agent.learn_done == 20 and trainer.steps == 20
+    assert fake_env.step_done == 12 + 10 + 4
+
+    trainer.train(max_episode=5, max_steps=10, evaluation_steps=3, render=False)
+    assert fake_agent.learn_done == 25 and fake_env.step_done == 26 + 5 + 1
+
+    trainer = Trainer(environment="CartPole-v1", agent=AgentRandom)
+    start = time.time()
+    trainer.train(max_episode=10 ** 6, nb_evaluation=0, render=False, max_seconds=0.5)
+    assert time.time() - start < 5
+    assert 0 < len(trainer.logger.episodes) < 10 ** 6
+
+    for arguments in [{}, {"actor_learner": True}]:
+        trainer = Trainer(environment="CartPole-v1", agent=DQN, **arguments)
+        trainer.train(max_episode=100, nb_evaluation=0, render=False, max_steps=5)
+        assert trainer.steps == 5 and len(trainer.logger.episodes) == 1
+        assert len(trainer.logger.current) == 0
+        trainer.do_episode(render=False)
+        assert trainer.steps > 5
+
+    trainer = Trainer(environment="CartPole-v1", agent=DQN, num_envs=3)
+    trainer.train(max_episode=100, nb_evaluation=0, render=False, max_steps=5)
+    assert 5 <= trainer.steps <= 7
+
+
+def test_throughput():
+    trainer = Trainer(environment="CartPole-v1", agent=DQN)
+    trainer.train(max_episode=100, nb_evaluation=0, render=False, max_steps=100)
+    assert 100 <= trainer.steps < 100 + 500
+    assert set(trainer.throughput.keys()) == {"steps_per_second", "updates_per_second", "samples_per_second"}
+    assert trainer.throughput["steps_per_second"] > 0 and trainer.throughput["updates_per_second"] > 0
+    assert trainer.throughput["samples_per_second"] == trainer.throughput["updates_per_second"] * 32
+
+    trainer = Trainer(environment="CartPole-v1", agent=DQN, num_envs=2)
+    trainer.train(max_episode=100, nb_evaluation=0, render=False, max_steps=50, evaluation_steps=20)
+    assert 50 <= trainer.steps <= 51
+    assert len(trainer.logger.evaluations) == 3
+
+    trainer = Trainer(environment="CartPole-v1", agent=DQN, actor_learner=True)
+    trainer.train(max_episode=100, nb_evaluation=2, render=False, max_steps=50)
+    assert trainer.steps >= 50 and len(trainer.logger.evaluations) == 2
@@ -0,0 +1,142 @@
+import gym
+import numpy as np
+import pytest
+import torch
+from gym.spaces import Box, Discrete
+
+from blobrl import Trainer
+from blobrl.agents import DQN, AgentRandom
+from blobrl.memories import PrioritizedReplay
+from blobrl.networks import ConvNetwork
+from blobrl.wrappers import ActionRepeat, GrayResize, LazyFrames, FrameStack
+
+
+class ImageEnv(gym.Env):
+    def __init__(self, length=10):
+        self.observation_space = Box(low=0, high=255, shape=(8, 6, 3), dtype=np.uint8)
+        self.action_space = Discrete(2)
+        self.length = length
+        self.step_done = 0
+
+    def frame(self):
+        frame = np.zeros((8, 6, 3), dtype=np.uint8)
+        frame[self.step_done % 8] = 10 * self.step_done
+        return frame
+
+    def step(self, action):
+        self.step_done += 1
+        return self.frame(), 1., self.step_done % self.length == 0, {}
+
+    def reset(self):
+        return self.frame()
+
+    def render(self, mode='human'):
+        pass
+
+
+def test_action_repeat():
+    for repeat in [0, "2"]:
+        with pytest.raises(ValueError):
+            ActionRepeat(ImageEnv(), repeat=repeat)
+
+    env = ActionRepeat(ImageEnv(), repeat=4)
+    env.reset()
+    observation, reward, done, info = env.step(0)
+    assert reward == 4. and not done and env.env.step_done == 4
+    assert (observation[3] == 30).all() and (observation[4] == 40).all() and observation[:3].sum() == 0
+
+    observation, reward, done, info = env.step(0)
+    observation, reward, done, info = env.step(0)
+    assert reward == 2. and done and env.env.step_done == 10
+    assert (observation[2] == 100).all() and observation.sum() == 100 * 6 * 3
+
+    env = ActionRepeat(ImageEnv(), repeat=3, max_pool=False)
+    observation, reward, done, info = env.step(0)
+    assert reward == 3. and (observation[3] == 30).all() and observation.sum() == 30 * 6 * 3
+
+
+def test_gray_resize():
+    with pytest.raises(TypeError):
+        GrayResize(gym.make("CartPole-v1"))
+    with pytest.raises(ValueError):
+        GrayResize(ImageEnv(), shape=(4, 0))
+
+    env = GrayResize(ImageEnv(), shape=(4, 3))
+    assert env.observation_space.shape == (4, 3) and env.observation_space.dtype == np.uint8
+    env.reset()
+    observation, reward, done, info = env.step(0)
+    assert observation.shape == (4, 3) and observation.dtype == np.uint8
+    assert (observation[0] == 5).all() and observation[1:].sum() == 0
+
+    env = GrayResize(ImageEnv(), shape=None, grayscale=False)
+    observation, reward, done, info = env.step(0)
+    assert observation.shape == (8, 6, 3) and np.array_equal(observation, env.env.frame())
+
+
+def test_frame_stack():
+    with pytest.raises(ValueError):
+        FrameStack(ImageEnv(), num_stack=0)
+    with pytest.raises(TypeError):
+        FrameStack(gym.make("FrozenLake-v0"))
+
+    env = FrameStack(GrayResize(ImageEnv(), shape=(4, 3)), num_stack=3)
+    assert env.observation_space.shape == (4, 3, 3)
+    observation = env.reset()
+    assert isinstance(observation, LazyFrames) and observation.shape == (4, 3, 3) and len(observation) == 3
+    assert np.asarray(observation).sum() == 0
+
+    next_observation, reward, done, info = env.step(0)
+    assert next_observation.frames[0] is observation.frames[1]
+    array = np.asarray(next_observation)
+    assert array.shape == (4, 3, 3) and array.dtype == np.uint8
+    assert array[..., :2].sum() == 0 and (array[0, :, 2] == 5).all()
+    assert np.asarray(next_observation, dtype=np.float32).dtype == np.float32
+    assert next_observation[0, 0, 2] == 5
+
+
+def test_trainer_wrappers():
+    with pytest.raises(TypeError):
+        Trainer(environment=ImageEnv(), agent=AgentRandom, wrappers=[1])
+
+    wrappers = [lambda env: ActionRepeat(env, repeat=2), lambda env: GrayResize(env, shape=(4, 3)), FrameStack]
+    trainer = Trainer(environment=ImageEnv(), agent=AgentRandom, wrappers=wrappers)
+    assert trainer.agent.observation_space.shape == (4, 3, 4)
+    assert isinstance(trainer.environment, FrameStack)
+    trainer.train(max_episode=2, nb_evaluation=0, render=False, progress_bar=False)
+    assert trainer.steps == 10 and trainer.environment.unwrapped.step_done == 20
+
+    trainer = Trainer(environment=ImageEnv(), agent=AgentRandom, wrappers=wrappers, num_envs=2)
+    trainer.train(max_episode=2, nb_evaluation=1, render=False, progress_bar=False)
+
+    environment = FrameStack(GrayResize(ImageEnv(), shape=(4, 3)), num_stack=2)
+    agent = DQN(observation_space=environment.observation_space, action_space=environment.action_space,
+                network=ConvNetwork(environment.observation_space, environment.action_space,
+                                    conv_layers=[(4, 2, 1)]), batch_size=4)
+    trainer = Trainer(environment=environment, agent=agent)
+    trainer.train(max_episode=2, nb_evaluation=1, render=False, progress_bar=False)
+    assert agent.step == 20
+
+
+def test_replay_shares_frames():
+    environment = FrameStack(GrayResize(ImageEnv(), shape=(4, 3)), num_stack=4)
+    agent = DQN(observation_space=environment.observation_space, action_space=environment.action_space,
+                network=ConvNetwork(environment.observation_space, environment.action_space,
+                                    conv_layers=[(4, 2, 1)]), batch_size=4)
+    observation = environment.reset()
+    for i in range(6):
+        next_observation, reward, done, info = environment.step(0)
+        agent.learn(observation, 0, reward, next_observation, done)
+        observation = next_observation
+
+    buffer = agent.memory.buffer
+    assert isinstance(buffer[1][0][0], LazyFrames)
+    assert buffer[1][0][0] is buffer[0][3][0]
+    assert buffer[1][0][0].frames[0] is buffer[0][0][0].frames[1]
+
+    observations, actions, rewards, next_observations, dones = agent.memory.sample(4, device=agent.device)
+    assert observations.shape == (4, 1, 4, 3, 4) and observations.dtype == torch.uint8
+
+    agent = DQN(observation_space=environment.observation_space, action_space=environment.action_space,
+                memory=PrioritizedReplay(max_size=10))
+    agent.learn(observation, 0, 1., environment.step(0)[0], False)
+    assert agent.memory.observations[0].shape == (1, 4 * 3 * 4)
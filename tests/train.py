@@ -1,4 +1,4 @@
-from blobrl import Trainer, Record
+from blobrl import Trainer
 from blobrl.agents import CategoricalDQN, DQN, DoubleDQN
 
 import gym
@@ -14,7 +14,7 @@ if __name__ == "__main__":
         for i in range(100):
 
             trainer.train(max_episode=50, render=False, nb_evaluation=0)
-            m = max([Record.sum_records(e) for e in trainer.logger.episodes])
+            m = max(trainer.logger.episodes.sums)
             print(agent.__name__, i, m)
             if m > 200:
                 break